@@ -6,11 +6,20 @@ import os
 import json
 import threading
 import queue
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 
 from . import rules
 from . import service as svc
-from .adapter import compute_best_move
-from .explain import build_explanation
+from . import store as game_store
+from . import events
+from . import asgi
+from .adapter import compute_best_move, compute_best_moves, stream_best_move
+from .config import (
+    AI_ASYNC, BATCH_BUDGET_MS, BATCH_MAX_POSITIONS, SPECTATOR_KEYFRAME_EVERY, SPECTATOR_WORKERS, SSE_ASYNC_PORT,
+)
+from .engine import BEST_MOVE_TT
+from .explain import EXPLAIN_CACHE, EXPLAIN_MODES, cached_explanation, defer_explanation, resolve_explanation
 
 bp = Blueprint("react", __name__, url_prefix="/api/tictactoe")
 log = logging.getLogger(__name__)
@@ -26,11 +35,144 @@ def json_error(code: str, message: str, status: int, meta: dict | None = None):
     return jsonify(payload), status
 
 
+@bp.record_once
+def _start_async_sse(_state) -> None:
+    # TTT_SSE_ASYNC_PORT: diváci se připojují na asyncio server (asgi.py) místo WSGI workeru
+    if SSE_ASYNC_PORT:
+        asgi.start_background()
+
+
+@bp.errorhandler(game_store.StaleWriteError)
+def _stale_write(e: game_store.StaleWriteError):
+    # hru mezitím uložil jiný požadavek/worker → klient si má načíst aktuální stav
+    return json_error("Conflict", "Game was modified concurrently, reload state", 409,
+                      meta={"gameId": e.game_id})
+
+
+def _as_bool(v, default: bool) -> bool:
+    if v is None:
+        return default
+    if isinstance(v, str):
+        return v.strip().lower() in ("1", "true", "yes", "on")
+    return bool(v)
+
+
+def _conditional_game_response(g) -> Response:
+    """Stav hry pro polling: slabý ETag podle verze hry, při shodě If-None-Match 304 bez těla."""
+    # hra čeká na tah AI, který tu nikdo nepočítá (restart procesu) → naplánuj ho
+    svc.ensure_ai_move(g)
+    etag, body = svc.cached_response(g)
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, status=200, mimetype="application/json")
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+class _InvalidPosition(Exception):
+    """Nevalidní stateless pozice → json_error(code, zpráva, status, meta)."""
+
+    def __init__(self, code: str, message: str, status: int = 400, meta: dict | None = None):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+        self.meta = meta
+
+
+def _parse_position(data: dict) -> tuple[list, int, int, str, str]:
+    """Validace {board, size, kToWin, player, difficulty} pro stateless /best-move(/batch)."""
+    board = data.get("board")
+    try:
+        size = int(data.get("size", 0) or 0)
+        k = int(data.get("kToWin", 0) or 0)
+    except (TypeError, ValueError):
+        raise _InvalidPosition("InvalidInput", "size and kToWin must be integers")
+    player = (data.get("player") or "X").strip().upper()
+    diff = _norm_difficulty(data.get("difficulty"))
+
+    if not (SIZE_MIN <= size <= SIZE_MAX):
+        raise _InvalidPosition("InvalidInput", f"size must be between {SIZE_MIN} and {SIZE_MAX}")
+    if not (K_MIN <= k <= K_MAX) or k > size:
+        raise _InvalidPosition("InvalidInput", "kToWin out of range or larger than size")
+    if player not in ("X", "O"):
+        raise _InvalidPosition("InvalidInput", "player must be X or O")
+    if not isinstance(board, list) or len(board) != size or any(len(r) != size for r in board):
+        raise _InvalidPosition("InvalidInput", "board shape mismatch")
+
+    term = rules.check_winner(board, k)
+    if term is not None:
+        status = "win" if term in ("X", "O") else "draw"
+        meta = {"status": status}
+        if status == "win":
+            meta["winner"] = term
+        raise _InvalidPosition("GameOver", "Position is terminal", 409, meta=meta)
+    return board, size, k, player, diff
+
+
+def _explain_mode(data: dict) -> str:
+    """Pole "explain" požadavku: full (default) | lazy | none."""
+    mode = str(data.get("explain") or "full").strip().lower()
+    return mode if mode in EXPLAIN_MODES else "full"
+
+
+def _rich_fields(mode: str, board, move, player: str, size: int, k: int, threats=None) -> dict:
+    """
+    explainRich podle režimu: full → z cache vysvětlení, lazy → jen klíč
+    (a URL) pro GET /explain/<key>, none → nic (klient ho nezobrazuje).
+    """
+    if mode == "none":
+        return {}
+    if mode == "lazy":
+        key = defer_explanation(board, move, player, size, k)
+        return {"explainKey": key, "explainUrl": f"{bp.url_prefix}/explain/{key}"}
+    return {"explainRich": cached_explanation(board, move, player, size, k, threats=threats)}
+
+
+def _best_move_payload(board, player: str, size: int, k: int, diff: str, engine: dict, elapsed_ms: int,
+                       explain_mode: str = "full") -> dict:
+    """Odpověď stateless /best-move: bezpečný tah (win/block/legalita) nad výsledkem enginu + vysvětlení."""
+    human = "O" if player == "X" else "X"
+    engine_move = engine.get("move") if isinstance(engine.get("move"), (list, tuple)) else None
+    r, c = svc._pick_ai_move_safe(board, ai_mark=player, human_mark=human,
+                                  size=size, k=k, difficulty=diff,
+                                  precomputed_engine_move=engine_move)
+    safe_move = [int(r), int(c)]
+
+    stats = (engine.get("stats") or {}).copy() if isinstance(engine.get("stats"), dict) else {}
+    stats.setdefault("elapsedMs", elapsed_ms)
+    explain = _mk_explain(stats, player, size, k, diff)
+
+    resp = {
+        "move": safe_move,
+        "score": engine.get("score", 0.0),
+        "stats": stats,
+        "version": engine.get("version", "py-omega-1.2.0"),
+        "analysis": _mk_analysis(player, size, k, diff, explain=explain),
+        "explain": explain,
+        **_rich_fields(explain_mode, board, safe_move, player, size, k),
+        "meta": {"difficulty": diff, "elapsedMs": elapsed_ms},
+    }
+    if engine_move is None or list(engine_move) != safe_move:
+        resp["safetyOverride"] = True
+    if "solve" in engine:
+        resp["solve"] = engine["solve"]
+    if "meta" in engine:
+        resp["engineMeta"] = engine["meta"]
+    return resp
+
+
 def _norm_difficulty(d: str | None) -> str:
     d2 = (d or "easy").strip().lower()
     return d2 if d2 in ("easy", "medium", "hard") else "easy"
 
 
+def _norm_engine(e: str | None) -> str:
+    e2 = (e or "auto").strip().lower() if isinstance(e, str) else "auto"
+    return e2 if e2 in ("auto", "mcts", "solver") else "auto"
+
+
 def _mk_analysis(player: str, size: int, k: int, difficulty: str, explain: str | None = None) -> dict:
     a = {"player": player, "size": size, "kToWin": k, "difficulty": difficulty}
     if explain is not None:
@@ -39,186 +181,327 @@ def _mk_analysis(player: str, size: int, k: int, difficulty: str, explain: str |
 
 
 def _mk_explain(bm_stats: dict, player: str, size: int, k: int, difficulty: str) -> str:
-    rolls = 0
+    rolls = rps = tree = 0
     if isinstance(bm_stats, dict):
         rolls = int(bm_stats.get("rollouts", 0) or 0)
-    return f"MCTS rollouts={rolls}; size={size}; k={k}; player={player}; difficulty={difficulty}"
+        rps = int(bm_stats.get("rolloutsPerSec", 0) or 0)
+        tree = int(bm_stats.get("treeSize", 0) or 0)
+    return (
+        f"MCTS rollouts={rolls}; rps={rps}; tree={tree}; "
+        f"size={size}; k={k}; player={player}; difficulty={difficulty}"
+    )
+
+
+def _format_event(event: str, data_obj: dict) -> str:
+    """Jedna SSE zpráva (event + JSON data)."""
+    return events.format_event(event, data_obj)
+
+
+_SSE_HEADERS = {
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    # CORS is managed globally by app CORS config
+}
 
 
 # ───────────────────────── Spectator driver (AI vs AI) ─────────────────────────
 
 class _SpectatorGame:
-    __slots__ = ("game_id", "thread", "stop", "subs", "lock", "delay_ms", "difficulty")
+    __slots__ = ("game_id", "stop", "lock", "delay_ms", "difficulty", "explain", "ended")
 
-    def __init__(self, game_id: str, delay_ms: int, difficulty: str):
+    def __init__(self, game_id: str, delay_ms: int, difficulty: str, explain: str = "full"):
         self.game_id = game_id
         self.stop = threading.Event()
-        self.thread: threading.Thread | None = None
-        self.subs: set[queue.Queue] = set()
         self.lock = threading.Lock()
         self.delay_ms = int(max(0, delay_ms))
         self.difficulty = difficulty
+        self.explain = explain
+        self.ended = False  # `end` už odeslán
 
 
 _SPECTATOR_REG: dict[str, _SpectatorGame] = {}
 _SPECTATOR_REG_LOCK = threading.Lock()
 
 
-def _notify(game_id: str, event_type: str, data: dict):
-    with _SPECTATOR_REG_LOCK:
-        sg = _SPECTATOR_REG.get(game_id)
-        if not sg:
-            log.debug("SSE notify dropped: game %s not registered", game_id)
-            return
-        targets = list(sg.subs)
+def _notify(game_id: str, event_type: str, data: dict, delta: tuple[str, dict] | None = None):
+    """Událost do logu hry (events.EventLog) – odběratelé si ji přečtou vlastním kurzorem."""
+    seq = events.publish(game_id, event_type, data, delta)
+    log.info("SSE notify → game=%s type=%s seq=%d payload=%s", game_id, event_type, seq, data)
 
-    payload = {"type": event_type, "data": data}
 
-    log.info(
-        "SSE notify → game=%s type=%s subs=%d payload=%s",
-        game_id, event_type, len(targets), data,
-    )
+def _terminal_of(g) -> str | None:
+    """
+    Výsledek hry ze stavu, který průběžně udržuje svc.apply_move
+    (kontrola po tahu) – bez opakovaného skenu celé desky.
+    """
+    st = getattr(g, "status", "running")
+    if st == "win":
+        return getattr(g, "winner", None)
+    if st == "draw":
+        return "draw"
+    return None
 
-    for q in targets:
-        try:
-            q.put_nowait(payload)
-        except Exception:
-            log.exception("SSE notify: failed to enqueue for game %s", game_id)
-            # drop silently
-            pass
 
+def _spectator_keyframe(g) -> dict:
+    """
+    Celý stav pro formát "delta": deska jako jeden řetězec n*n znaků ('.', 'X', 'O',
+    index r*n+c), `ply` = počet odehraných tahů, `next` = kdo je na tahu.
+    """
+    return {
+        "gameId": g.id,
+        "size": g.size,
+        "kToWin": g.k_to_win,
+        "ply": len(g.history),
+        "board": g.board.to_string(),
+        "next": g.player,
+        "status": g.status,
+        "winner": g.winner,
+    }
+
+
+def _spectator_end_payload(g) -> dict | None:
+    """Hra skončila → uloží koncový stav a vrátí payload `end`; jinak None."""
+    term = _terminal_of(g)
+    if term is None and getattr(g, "status", "running") == "running":
+        return None
+    status = "win" if term in ("X", "O") else ("draw" if term == "draw" else getattr(g, "status", "running"))
+    try:
+        g.status = status
+        if status == "win":
+            setattr(g, "winner", term)
+        svc.save_game(g)
+    except Exception:
+        log.exception("Failed to persist spectator end-state for game %s", g.id)
+    return {
+        "status": status,
+        "winner": term if status == "win" else None,
+        "winningSequence": svc._winning_sequence_for(g),  # type: ignore[attr-defined]
+    }
 
-def _start_driver(game_id: str, delay_ms: int, difficulty: str):
-    sg = _SpectatorGame(game_id, delay_ms, difficulty)
-    with _SPECTATOR_REG_LOCK:
-        _SPECTATOR_REG[game_id] = sg
 
-    def _run():
+def _spectator_step(sg: _SpectatorGame) -> bool:
+    """
+    Jeden tah AI vs AI; False = konec, další tah se neplánuje.
+
+    Zámek hry se drží jen na čtení a na zápis: pod ním se vezme kopie desky
+    a ThreatIndexu, engine hledá bez zámku (/state, nápovědy a SSE snímky
+    nečekají) a tah se pak pod zámkem provede jen, pokud se hra mezitím
+    nezměnila (CAS nad version) – jinak se krok zopakuje nad novým stavem.
+    """
+    game_id = sg.game_id
+    with svc.game_lock(game_id):
+        g = svc.get_game(game_id)
+        if not g:
+            return False
+        end_payload = _spectator_end_payload(g)
+        if end_payload is not None:
+            _notify(game_id, "end", end_payload)
+            sg.ended = True
+            return False
+        version = g.version
+        ai_mark = g.player
+        size, k = g.size, g.k_to_win
+        board = g.board.copy()
+        threats = svc.threat_index(g).copy()
+
+    # compute move for current player (AI vs AI) – bez zámku nad kopiemi
+    human_mark = "O" if ai_mark == "X" else "X"
+    try:
+        r, c = svc._pick_ai_move_safe(  # type: ignore[attr-defined]
+            board, ai_mark, human_mark, size, k, sg.difficulty,
+            threats=threats,
+        )
+    except Exception:
+        # fallback: pick first legal
+        free = [(rr, cc) for rr in range(size) for cc in range(size) if board[rr][cc] == "."]
+        r, c = free[0] if free else (-1, -1)
+
+    rich_fields: dict = {}
+    if r >= 0:
         try:
-            while not sg.stop.is_set():
-                g = svc.get_game(game_id)
-                if not g:
-                    break
-                term = rules.check_winner(g.board, g.k_to_win)
-                if term is not None or getattr(g, "status", "running") != "running":
-                    status = "win" if term in ("X", "O") else ("draw" if term == "draw" else getattr(g, "status", "running"))
+            rich_fields = _rich_fields(sg.explain, board, (int(r), int(c)), ai_mark,
+                                       size, k, threats=threats)
+        except Exception:
+            rich_fields = {"explainRich": {
+                "summary": "",
+                "reasons": [],
+                "winningSequence": [],
+                "hints": {},
+            }}
+    rich = rich_fields.get("explainRich") or {}
+
+    with svc.game_lock(game_id):
+        g = svc.get_game(game_id)
+        if not g:
+            return False
+        if g.version != version:
+            return True  # hru mezitím změnil někdo jiný → spočítat znovu v dalším kroku
+        if r < 0:
+            # no legal move → draw
+            g.status = "draw"
+            svc.save_game(g)
+            return True
 
-                    try:
-                        g.status = status
-                        if status == "win":
-                            setattr(g, "winner", term)
-                        svc.save_game(g)
-                    except Exception:
-                        log.exception("Failed to persist spectator end-state for game %s", game_id)
-
-                    end_payload = {
-                        "status": status,
-                        "winner": term if status == "win" else None,
-                        "winningSequence": svc._winning_sequence_for(g),
-                    }
-                    _notify(game_id, "end", end_payload)
-                    break
-
-                # compute move for current player (AI vs AI)
-                ai_mark = g.player
-                human_mark = "O" if ai_mark == "X" else "X"
-                try:
-                    r, c = svc._pick_ai_move_safe(  # type: ignore[attr-defined]
-                        g.board, ai_mark, human_mark, g.size, g.k_to_win, sg.difficulty
-                    )
-                except Exception:
-                    # fallback: pick first legal
-                    found = False
-                    for rr in range(g.size):
-                        for cc in range(g.size):
-                            if g.board[rr][cc] == ".":
-                                r, c = rr, cc
-                                found = True
-                                break
-                        if found: break
-                    if not found:
-                        # no legal move → draw
-                        g.status = "draw"
-                        svc.save_game(g)
-                        continue
+        try:
+            g2 = svc.apply_move(g, int(r), int(c))
+        except Exception:
+            return False
+
+        move_payload = {
+            "player": ai_mark,
+            "row": int(r),
+            "col": int(c),
+            "board": svc._board_lists(g2.board),
+            "moves": len(g2.history),
+            "explain": rich.get("summary"),
+            **rich_fields,
+            "stats": {
+                "origin": "spectator",
+                **(rich.get("hints") or {}),
+            },
+        }
+        # delta: jen položený kámen (+ vysvětlení podle režimu hry); každý
+        # SPECTATOR_KEYFRAME_EVERY-tý tah jako keyframe s celou deskou
+        delta = {"ply": len(g2.history), "player": ai_mark, "row": int(r), "col": int(c), **rich_fields}
+        if len(g2.history) % SPECTATOR_KEYFRAME_EVERY == 0:
+            delta_event = ("keyframe", {**_spectator_keyframe(g2), **delta})
+        else:
+            delta_event = ("move", delta)
+        _notify(game_id, "move", move_payload, delta_event)
+    return True
+
+
+def _spectator_finish(sg: _SpectatorGame) -> None:
+    """Konec driveru (konec hry / stop / chyba): `end`, pokud ještě neodešel, a úklid registru."""
+    try:
+        if not sg.ended:
+            with svc.game_lock(sg.game_id):
+                g = svc.get_game(sg.game_id)
+                end_payload = _spectator_end_payload(g) if g else None
+                if end_payload is not None:
+                    _notify(sg.game_id, "end", end_payload)
+    except Exception:
+        log.exception("Failed to finish spectator game %s", sg.game_id)
+    finally:
+        with _SPECTATOR_REG_LOCK:
+            if _SPECTATOR_REG.get(sg.game_id) is sg:
+                _SPECTATOR_REG.pop(sg.game_id, None)
+
+
+class _SpectatorScheduler:
+    """
+    Jeden plánovač pro všechny divácké hry: halda časů „další tah“ a jedno
+    časovací vlákno, které splatné hry předává omezenému poolu workerů.
+    Hra je v haldě nejvýš jednou a znovu se naplánuje (za delay_ms) až po
+    dokončení svého tahu, takže tahy jedné hry se nikdy nepřekrývají. Počet
+    vláken je konstantní (1 + SPECTATOR_WORKERS) bez ohledu na počet her.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, int(workers))
+        self._heap: list[tuple[float, int, _SpectatorGame]] = []
+        self._seq = 0
+        self._cv = threading.Condition()
+        self._pool: ThreadPoolExecutor | None = None
+        self._timer: threading.Thread | None = None
+
+    def schedule(self, sg: _SpectatorGame, delay_s: float = 0.0) -> None:
+        with self._cv:
+            if self._timer is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ttt-spectator")
+                self._timer = threading.Thread(target=self._run, name="ttt-spectator-timer", daemon=True)
+                self._timer.start()
+            self._seq += 1
+            heapq.heappush(self._heap, (time.monotonic() + max(0.0, delay_s), self._seq, sg))
+            self._cv.notify()
+
+    def pending(self) -> int:
+        with self._cv:
+            return len(self._heap)
+
+    def _run(self) -> None:
+        while True:
+            with self._cv:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cv.wait(None if not self._heap else self._heap[0][0] - time.monotonic())
+                _, _, sg = heapq.heappop(self._heap)
+            try:
+                self._pool.submit(self._tick, sg)  # type: ignore[union-attr]
+            except RuntimeError:
+                return  # pool se vypíná (konec procesu)
+
+    def _tick(self, sg: _SpectatorGame) -> None:
+        try:
+            if not sg.stop.is_set() and _spectator_step(sg) and not sg.stop.is_set():
+                # prodleva mezi tahy = čekání v haldě, ne spící vlákno
+                self.schedule(sg, max(0, int(sg.delay_ms)) / 1000.0)
+                return
+        except Exception:
+            log.exception("Spectator step failed for game %s", sg.game_id)
+        _spectator_finish(sg)
 
-                try:
-                    rich = build_explanation(
-                        g.board,
-                        (int(r), int(c)),
-                        ai_mark,
-                        g.size,
-                        g.k_to_win,
-                    )
-                except Exception:
-                    rich = {
-                        "summary": "",
-                        "reasons": [],
-                        "winningSequence": [],
-                        "hints": {},
-                    }
 
-                try:
-                    g2 = svc.apply_move(g, int(r), int(c))
-                except Exception:
-                    break
-
-                move_payload = {
-                    "player": ai_mark,
-                    "row": int(r),
-                    "col": int(c),
-                    "board": g2.board,
-                    "moves": len(g2.history),
-                    "explain": rich.get("summary"),
-                    "explainRich": rich,
-                    "stats": {
-                        "origin": "spectator",
-                        **(rich.get("hints") or {}),
-                    },
-                }
-                _notify(game_id, "move", move_payload)
-
-                # small sleep between moves
-                delay = max(0, int(sg.delay_ms))
-                time.sleep(delay / 1000.0 if delay > 0 else 0)
-
-            # ensure end event once when loop exits due to status
-            g = svc.get_game(game_id)
-            if g:
-                term = rules.check_winner(g.board, g.k_to_win)
-                if term is not None or getattr(g, "status", "running") != "running":
-                    status = "win" if term in ("X", "O") else (
-                        "draw" if term == "draw" else getattr(g, "status", "running")
-                    )
+_SPECTATOR_SCHED = _SpectatorScheduler(SPECTATOR_WORKERS)
 
-                    try:
-                        g.status = status
-                        if status == "win":
-                            setattr(g, "winner", term)
-                        svc.save_game(g)
-                    except Exception:
-                        log.exception(
-                            "Failed to persist spectator end-state (post-loop) for game %s",
-                            game_id,
-                        )
-
-                    end_payload = {
-                        "status": status,
-                        "winner": term if status == "win" else None,
-                        "winningSequence": svc._winning_sequence_for(g),  # type: ignore[attr-defined]
-                    }
-                    _notify(game_id, "end", end_payload)
-        finally:
-            # cleanup registry entry
-            with _SPECTATOR_REG_LOCK:
-                _SPECTATOR_REG.pop(game_id, None)
 
-    t = threading.Thread(target=_run, name=f"ttt-spectator-{game_id}", daemon=True)
-    sg.thread = t
-    t.start()
+def _start_driver(game_id: str, delay_ms: int, difficulty: str, explain: str = "full",
+                  *, if_missing: bool = False):
+    sg = _SpectatorGame(game_id, delay_ms, difficulty, explain)
+    with _SPECTATOR_REG_LOCK:
+        if if_missing and game_id in _SPECTATOR_REG:
+            return _SPECTATOR_REG[game_id]
+        _SPECTATOR_REG[game_id] = sg
+    # první tah hned, další vždy delay_ms po dokončení předchozího
+    _SPECTATOR_SCHED.schedule(sg)
     return sg
 
 
+def _ensure_spectator_driver(g) -> None:
+    # ensure driver exists (could be re-attached) – start a gentle driver with default parameters if missing
+    if getattr(g, "status", "running") != "running":
+        return  # dohraná hra: stream jen přehraje log a `end` (_spectator_replay)
+    _start_driver(g.id, delay_ms=2000, difficulty=getattr(g, "difficulty", "easy") or "easy", if_missing=True)
+
+
+def _spectator_snapshot(game_id: str, ev_log: events.EventLog, fmt: str = "full") -> tuple[int, str | None]:
+    """Událost `state` (u formátu delta `keyframe`) se seq logu; (seq, None), pokud hra mezitím zmizela."""
+    # pod zámkem hry: driver publikuje tahy také pod ním → snímek odpovídá přesně seq
+    with svc.game_lock(game_id):
+        gg = svc.get_game(game_id)
+        seq = ev_log.last_seq
+        if not gg:
+            return seq, None
+        if fmt == "delta":
+            return seq, events.format_event("keyframe", _spectator_keyframe(gg), seq)
+        return seq, events.format_event("state", svc.to_response(gg), seq)
+
+
+def _spectator_replay(g, ev_log: events.EventLog, cursor: int | None, fmt: str = "full") -> list[str]:
+    """
+    Stream dohrané hry (bez driveru): zbytek logu za kurzorem, bez kurzoru nebo
+    při mezeře snímek, a `end` – z logu, nebo ze stavu hry, když v logu už není.
+    """
+    frames: list[str] = []
+    items, gap = ev_log.read_after(cursor, fmt) if cursor is not None else ([], True)
+    if gap:
+        items = []
+        _, frame = _spectator_snapshot(g.id, ev_log, fmt)
+        if frame is None:
+            return [events.format_event("end", {"status": "timeout"})]
+        frames.append(frame)
+    for _, event, frame in items:
+        frames.append(frame)
+        if event == "end":
+            return frames
+    frames.append(events.format_event("end", {
+        "status": g.status,
+        "winner": g.winner if g.status == "win" else None,
+        "winningSequence": svc._winning_sequence_for(g),  # type: ignore[attr-defined]
+    }))
+    return frames
+
+
 @bp.get("/meta")
 def api_meta():
     return jsonify({
@@ -229,6 +512,26 @@ def api_meta():
     }), 200
 
 
+@bp.get("/engine/stats")
+def api_engine_stats():
+    """Provozní statistiky enginu (transpoziční cache apod.) a úložiště her."""
+    return jsonify({
+        "transposition": BEST_MOVE_TT.stats(),
+        "responseCache": svc.RESPONSE_CACHE.stats(),
+        "explainCache": EXPLAIN_CACHE.stats(),
+        "eventLogs": events.stats(),
+        "asyncSse": asgi.stats(),
+        "aiJobs": svc.ai_jobs_stats(),
+        "spectator": {
+            "games": len(_SPECTATOR_REG),
+            "scheduled": _SPECTATOR_SCHED.pending(),
+            "workers": _SPECTATOR_SCHED.workers,
+        },
+        "ponder": svc.ponder_stats(),
+        "store": game_store.get_store().stats(),
+    }), 200
+
+
 @bp.post("/new")
 def api_new():
     data = request.get_json(silent=True) or {}
@@ -258,7 +561,7 @@ def api_status(game_id: str):
     g = svc.get_game(game_id)
     if not g:
         return json_error("NotFound", "Game not found", 404)
-    return jsonify(svc.to_response(g)), 200
+    return _conditional_game_response(g)
 
 
 @bp.get("/state")
@@ -269,7 +572,7 @@ def api_state():
     g = svc.get_game(game_id)
     if not g:
         return json_error("NotFound", "Game not found", 404)
-    return jsonify(svc.to_response(g)), 200
+    return _conditional_game_response(g)
 
 
 @bp.post("/play")
@@ -284,28 +587,82 @@ def api_play():
     if not (isinstance(row, int) and isinstance(col, int)):
         return json_error("BadRequest", "row/col required", 400)
 
-    g = svc.get_game(gid)
-    if not g:
-        return json_error("NotFound", "Game not found", 404)
+    # dvojklik / retry: druhý požadavek počká a uvidí už obsazené pole
+    with svc.game_lock(gid):
+        g = svc.get_game(gid)
+        if not g:
+            return json_error("NotFound", "Game not found", 404)
 
-    if g.status != "running":
-        return json_error("GameOver", "Game already finished", 409)
+        if g.status != "running":
+            return json_error("GameOver", "Game already finished", 409)
+        if g.ai_pending:
+            return json_error("AiPending", "AI move is still being computed", 409,
+                              meta={"gameId": gid})
 
-    if not (0 <= row < g.size and 0 <= col < g.size):
-        return json_error("InvalidMove", "Out of range", 400)
-    if g.board[row][col] != ".":
-        return json_error("InvalidMove", "Cell occupied", 400)
+        if not (0 <= row < g.size and 0 <= col < g.size):
+            return json_error("InvalidMove", "Out of range", 400)
+        if g.board[row][col] != ".":
+            return json_error("InvalidMove", "Cell occupied", 400)
 
-    try:
-        g = svc.apply_move(g, row, col)
-    except Exception as e:
-        log.exception("apply_move failed")
-        return json_error("Internal", str(e), 500)
+        try:
+            g = svc.apply_move(g, row, col)
+        except game_store.StaleWriteError:
+            raise
+        except Exception as e:
+            log.exception("apply_move failed")
+            return json_error("Internal", str(e), 500)
+
+        if g.mode == "pve":
+            # async: odpověď hned s aiPending, tah AI dorazí přes /status (ETag) nebo /ai/events;
+            # při plné frontě se táhne synchronně jako dřív
+            if not (_as_bool(data.get("async"), AI_ASYNC) and svc.request_ai_move(g)):
+                g = svc.maybe_ai_autoplay(g, difficulty=g.difficulty)
+
+        return jsonify(svc.to_response(g)), 200
 
-    if g.mode == "pve":
-        g = svc.maybe_ai_autoplay(g, difficulty=g.difficulty)
 
-    return jsonify(svc.to_response(g)), 200
+@bp.get("/ai/events")
+def api_ai_events():
+    """
+    SSE pro async /play: počká na tah AI a pošle `ai` (celá odpověď jako z /play),
+    pak stream skončí. Pokud hra na AI nečeká, pošle rovnou `state`.
+    """
+    game_id = request.args.get("gameId")
+    if not game_id:
+        return json_error("BadRequest", "gameId required", 400)
+    g = svc.get_game(game_id)
+    if not g:
+        return json_error("NotFound", "Game not found", 404)
+
+    client_q: queue.Queue = queue.Queue(maxsize=4)
+    svc.add_ai_listener(game_id, client_q)
+
+    @stream_with_context
+    def _stream():
+        try:
+            # stav čteme až po registraci posluchače → tah nemůže proklouznout mezi
+            gg = svc.get_game(game_id)
+            if not gg or not gg.ai_pending:
+                yield _format_event("state", svc.to_response(gg) if gg else {"status": "timeout"})
+                return
+            svc.ensure_ai_move(gg)
+            while True:
+                try:
+                    yield _format_event("ai", client_q.get(timeout=15.0))
+                    return
+                except queue.Empty:
+                    gg = svc.get_game(game_id)
+                    if not gg or not gg.ai_pending:
+                        # výsledek jsme minuli (jiný proces, restart, timeout-lose)
+                        yield _format_event("state", svc.to_response(gg) if gg else {"status": "timeout"})
+                        return
+                    # job mohl skončit bez zápisu (fronta, restart) → zařadit znovu
+                    svc.ensure_ai_move(gg)
+                    yield ": ping\n\n"
+        finally:
+            svc.remove_ai_listener(game_id, client_q)
+
+    return Response(_stream(), status=200, headers=_SSE_HEADERS)
 
 
 @bp.post("/best-move")
@@ -315,39 +672,52 @@ def api_best_move():
     # === stateful poradna (gameId) ===
     gid = data.get("gameId")
     if isinstance(gid, str):
-        g = svc.get_game(gid)
-        if not g:
-            return json_error("NotFound", "Game not found", 404)
-        if g.status != "running":
-            return json_error("GameOver", "Game is terminal", 409)
+        # snímek pozice pod zámkem (jako _ai_job): hledání pak běží bez zámku jen nad kopiemi
+        with svc.game_lock(gid):
+            g = svc.get_game(gid)
+            if not g:
+                return json_error("NotFound", "Game not found", 404)
+            if g.status != "running":
+                return json_error("GameOver", "Game is terminal", 409)
+            board = g.board.copy()
+            player, size, k = g.player, g.size, g.k_to_win
+            threats = svc.threat_index(g).copy()
 
         diff = "hard"
         t0 = time.perf_counter()
         engine = {}
         try:
-            engine = compute_best_move(g.board, g.player, g.size, g.k_to_win, difficulty=diff) or {}
+            engine = compute_best_move(board, player, size, k, difficulty=diff,
+                                       engine=_norm_engine(data.get("engine"))) or {}
         except Exception as e:
             engine = {"engineError": str(e)}
         elapsed_ms = int((time.perf_counter() - t0) * 1000)
 
-        human = "O" if g.player == "X" else "X"
-        r, c = svc._pick_ai_move_safe(g.board, ai_mark=g.player, human_mark=human,
-                                      size=g.size, k=g.k_to_win, difficulty=diff)
-        safe_move = [int(r), int(c)]
+        human = "O" if player == "X" else "X"
         engine_move = engine.get("move") if isinstance(engine.get("move"), (list, tuple)) else None
+        # engine už běžel → předej jeho tah, ať se hledání nespouští podruhé
+        r, c = svc._pick_ai_move_safe(board, ai_mark=player, human_mark=human,
+                                      size=size, k=k, difficulty=diff,
+                                      precomputed_engine_move=engine_move, threats=threats)
+        safe_move = [int(r), int(c)]
         safety_override = (engine_move is None) or (engine_move != safe_move)
 
         stats = (engine.get("stats") or {}).copy() if isinstance(engine.get("stats"), dict) else {}
         stats.setdefault("elapsedMs", elapsed_ms)
-        explain = _mk_explain(stats, g.player, g.size, g.k_to_win, diff)
-        analysis = _mk_analysis(g.player, g.size, g.k_to_win, diff, explain=explain)
-        rich = build_explanation(g.board, safe_move, g.player, g.size, g.k_to_win)
-
-        try:
-            g.hints_used = int(getattr(g, "hints_used", 0)) + 1
-        except Exception:
-            pass
-        svc.save_game(g)
+        explain = _mk_explain(stats, player, size, k, diff)
+        analysis = _mk_analysis(player, size, k, diff, explain=explain)
+        rich_fields = _rich_fields(_explain_mode(data), board, safe_move, player, size, k,
+                                   threats=threats)
+
+        # hledání běželo bez zámku → počítadlo zvyšujeme na čerstvě načtené hře
+        with svc.game_lock(gid):
+            gg = svc.get_game(gid)
+            if gg is not None:  # hra mezitím vypršela → nápověda platí, počítadlo není kam uložit
+                try:
+                    gg.hints_used = int(getattr(gg, "hints_used", 0)) + 1
+                except Exception:
+                    pass
+                svc.save_game(gg)
 
         resp = {
             "move": safe_move,
@@ -356,77 +726,181 @@ def api_best_move():
             "version": engine.get("version", "py-omega-1.2.0"),
             "analysis": analysis,
             "explain": explain,
-            "explainRich": rich,
+            **rich_fields,
             "meta": {"difficulty": diff, "elapsedMs": elapsed_ms},
         }
         if safety_override:
             resp["safetyOverride"] = True
+        if "solve" in engine:
+            resp["solve"] = engine["solve"]
         if "meta" in engine:
             resp["engineMeta"] = engine["meta"]
         return jsonify(resp), 200
 
     # === stateless kalkul ===
-    board = data.get("board")
-    size = int(data.get("size", 0) or 0)
-    k = int(data.get("kToWin", 0) or 0)
-    player = (data.get("player") or "X").strip().upper()
-    diff = _norm_difficulty(data.get("difficulty"))
-
-    if not (SIZE_MIN <= size <= SIZE_MAX):
-        return json_error("InvalidInput", f"size must be between {SIZE_MIN} and {SIZE_MAX}", 400)
-    if not (K_MIN <= k <= K_MAX) or k > size:
-        return json_error("InvalidInput", "kToWin out of range or larger than size", 400)
-    if player not in ("X", "O"):
-        return json_error("InvalidInput", "player must be X or O", 400)
-    if not isinstance(board, list) or len(board) != size or any(len(r) != size for r in board):
-        return json_error("InvalidInput", "board shape mismatch", 400)
-
-    term = rules.check_winner(board, k)
-    if term is not None:
-        status = "win" if term in ("X", "O") else "draw"
-        meta = {"status": status}
-        if status == "win":
-            meta["winner"] = term
-        return json_error("GameOver", "Position is terminal", 409, meta=meta)
+    try:
+        board, size, k, player, diff = _parse_position(data)
+    except _InvalidPosition as e:
+        return json_error(e.code, str(e), e.status, meta=e.meta)
 
     t0 = time.perf_counter()
     engine = {}
     try:
-        engine = compute_best_move(board, player, size, k, difficulty=diff) or {}
+        engine = compute_best_move(board, player, size, k, difficulty=diff,
+                                   engine=_norm_engine(data.get("engine"))) or {}
     except Exception as e:
         engine = {"engineError": str(e)}
     elapsed_ms = int((time.perf_counter() - t0) * 1000)
 
-    # bezpečný tah
+    return jsonify(_best_move_payload(board, player, size, k, diff, engine, elapsed_ms,
+                                      _explain_mode(data))), 200
+
+
+@bp.post("/best-move/batch")
+def api_best_move_batch():
+    """
+    Více stateless pozic jedním požadavkem:
+    {"positions": [{board, player, size, kToWin, difficulty}, …], "timeBudgetMs"?, "engine"?}
+    (nebo rovnou pole pozic). Výsledky ve stejném pořadí; nevalidní pozice
+    má místo výsledku {"error": {...}}, ostatní se spočítají.
+    """
+    data = request.get_json(silent=True)
+    items = data if isinstance(data, list) else (data or {}).get("positions")
+    opts = data if isinstance(data, dict) else {}
+    if not isinstance(items, list) or not items:
+        return json_error("BadRequest", "positions must be a non-empty array", 400)
+    if len(items) > BATCH_MAX_POSITIONS:
+        return json_error("InvalidInput", f"at most {BATCH_MAX_POSITIONS} positions per batch", 400,
+                          meta={"max": BATCH_MAX_POSITIONS})
+    try:
+        budget_ms = int(opts.get("timeBudgetMs", BATCH_BUDGET_MS) or BATCH_BUDGET_MS)
+    except (TypeError, ValueError):
+        return json_error("InvalidInput", "timeBudgetMs must be an integer", 400)
+    budget_ms = max(50, min(budget_ms, BATCH_BUDGET_MS))
+
+    explain_mode = _explain_mode(opts)
+
+    results: list = [None] * len(items)
+    valid: list[int] = []
+    positions: list[dict] = []
+    for i, item in enumerate(items):
+        try:
+            board, size, k, player, diff = _parse_position(item if isinstance(item, dict) else {})
+        except _InvalidPosition as e:
+            err = {"code": e.code, "message": str(e)}
+            if e.meta is not None:
+                err["meta"] = e.meta
+            results[i] = {"error": err}
+            continue
+        valid.append(i)
+        positions.append({"board": board, "player": player, "size": size, "kToWin": k, "difficulty": diff})
+
+    meta = {"count": len(items), "unique": 0, "budgetMs": budget_ms}
+    if positions:
+        engines, meta = compute_best_moves(positions, time_budget_ms=budget_ms,
+                                           engine=_norm_engine(opts.get("engine")))
+        meta["count"] = len(items)
+        payloads: dict[int, dict] = {}
+        for j, (i, p, engine) in enumerate(zip(valid, positions, engines)):
+            stats = engine.get("stats") or {}
+            if stats.get("dedupe") == "identical" and stats.get("dedupeOf") in payloads:
+                # stejná deska → celá odpověď vzoru (jen s vlastními statistikami)
+                out = {**payloads[stats["dedupeOf"]], "stats": {**stats}}
+            else:
+                out = _best_move_payload(p["board"], p["player"], p["size"], p["kToWin"], p["difficulty"],
+                                         engine, int(engine.get("elapsedMs", 0) or 0), explain_mode)
+            payloads[j] = out
+            results[i] = out
+
+    return jsonify({"results": results, "meta": meta}), 200
+
+
+@bp.route("/best-move/stream", methods=["GET", "POST"])
+def api_best_move_stream():
+    """
+    Anytime nápověda přes SSE: `progress` každých intervalMs (průběžný tah,
+    skóre, rollouty), nakonec `done` se stejnými poli jako /best-move.
+    GET (EventSource) bere parametry z query, POST z JSON těla; stateful
+    přes gameId (obtížnost hard jako /best-move), jinak board/size/kToWin/player.
+    Zavřením spojení se hledání ukončí.
+    """
+    data = dict(request.args.items())
+    data.update(request.get_json(silent=True) or {})
+    try:
+        interval_ms = min(2000, max(50, int(data.get("intervalMs", 250) or 250)))
+    except (TypeError, ValueError):
+        return json_error("InvalidInput", "intervalMs must be an integer", 400)
+    explain_mode = _explain_mode(data)
+
+    gid = data.get("gameId")
+    g = None
+    if isinstance(gid, str) and gid:
+        g = svc.get_game(gid)
+        if not g:
+            return json_error("NotFound", "Game not found", 404)
+        if g.status != "running":
+            return json_error("GameOver", "Game is terminal", 409)
+        board, size, k, player, diff = g.board, g.size, g.k_to_win, g.player, "hard"
+    else:
+        board = data.get("board")
+        if isinstance(board, str):
+            try:
+                board = json.loads(board)
+            except ValueError:
+                return json_error("InvalidInput", "board must be a JSON array", 400)
+        try:
+            board, size, k, player, diff = _parse_position({**data, "board": board})
+        except _InvalidPosition as e:
+            return json_error(e.code, str(e), e.status, meta=e.meta)
+
+    board = [list(row) for row in board]
     human = "O" if player == "X" else "X"
-    r, c = svc._pick_ai_move_safe(board, ai_mark=player, human_mark=human,
-                                  size=size, k=k, difficulty=diff)
-    safe_move = [int(r), int(c)]
-    engine_move = engine.get("move") if isinstance(engine.get("move"), (list, tuple)) else None
-    safety_override = (engine_move is None) or (engine_move != safe_move)
 
-    stats = (engine.get("stats") or {}).copy() if isinstance(engine.get("stats"), dict) else {}
-    stats.setdefault("elapsedMs", elapsed_ms)
-    explain = _mk_explain(stats, player, size, k, diff)
-    analysis = _mk_analysis(player, size, k, diff, explain=explain)
-    rich = build_explanation(board, safe_move, player, size, k)
+    @stream_with_context
+    def _stream():
+        t0 = time.perf_counter()
+        # vynucený tah (výhra / blok / VCF) nepotřebuje žádné hledání
+        forced = svc._forced_ai_move(board, player, human, k, diff)
+        if forced is not None:
+            engine = {"move": list(forced), "stats": {"rollouts": 0, "forced": True}}
+        else:
+            engine = {}
+            gen = stream_best_move(board, player, size, k, difficulty=diff, interval_ms=interval_ms)
+            try:
+                for ev in gen:
+                    if ev.get("final"):
+                        engine = ev
+                        break
+                    yield _format_event("progress", ev)
+            except Exception as e:
+                log.warning("best-move stream engine error: %s", e)
+                engine = {"engineError": str(e)}
+            finally:
+                gen.close()
+        elapsed_ms = int((time.perf_counter() - t0) * 1000)
+        resp = _best_move_payload(board, player, size, k, diff, engine, elapsed_ms, explain_mode)
+        if g is not None:
+            # hra se mohla během hledání změnit → načti čerstvou a jen zvyš počítadlo
+            with svc.game_lock(g.id):
+                gg = svc.get_game(g.id)
+                if gg is not None:
+                    try:
+                        gg.hints_used = int(getattr(gg, "hints_used", 0)) + 1
+                        svc.save_game(gg)
+                    except Exception:
+                        pass
+        yield _format_event("done", resp)
+
+    return Response(_stream(), status=200, headers=_SSE_HEADERS)
 
-    resp = {
-        "move": safe_move,
-        "score": engine.get("score", 0.0),
-        "stats": stats,
-        "version": engine.get("version", "py-omega-1.2.0"),
-        "analysis": analysis,
-        "explain": explain,
-        "explainRich": rich,
-        "meta": {"difficulty": diff, "elapsedMs": elapsed_ms},
-    }
-    if safety_override:
-        resp["safetyOverride"] = True
-    if "meta" in engine:
-        resp["engineMeta"] = engine["meta"]
 
-    return jsonify(resp), 200
+@bp.get("/explain/<key>")
+def api_explain(key: str):
+    """explainRich odložený režimem explain=lazy (klíč z explainKey / explainUrl)."""
+    rich = resolve_explanation(key)
+    if rich is None:
+        return json_error("NotFound", "Explanation expired or unknown", 404)
+    return jsonify({"key": key, "explainRich": rich}), 200
 
 
 @bp.post("/best-move-safe")
@@ -525,28 +999,32 @@ def api_timeout_lose():
     if not isinstance(gid, str):
         return json_error("BadRequest", "gameId required", 400)
 
-    g = svc.get_game(gid)
-    if not g:
-        return json_error("NotFound", "Game not found", 404)
+    with svc.game_lock(gid):
+        g = svc.get_game(gid)
+        if not g:
+            return json_error("NotFound", "Game not found", 404)
 
-    if getattr(g, "status", "running") != "running":
-        return json_error("GameOver", "Game already finished", 409)
+        if getattr(g, "status", "running") != "running":
+            return json_error("GameOver", "Game already finished", 409)
 
-    cur = (getattr(g, "player", "X") or "X").strip().upper()
-    if cur not in ("X", "O"):
-        cur = "X"
-    winner = "O" if cur == "X" else "X"
+        cur = (getattr(g, "player", "X") or "X").strip().upper()
+        if cur not in ("X", "O"):
+            cur = "X"
+        winner = "O" if cur == "X" else "X"
 
-    g.status = "timeout"
-    setattr(g, "winner", winner)
+        g.status = "timeout"
+        setattr(g, "winner", winner)
+        g.ai_pending = False
 
-    try:
-        svc.save_game(g)
-    except Exception as e:
-        log.exception("Failed to persist timeout-lose for game %s", gid)
-        return json_error("Internal", str(e), 500)
+        try:
+            svc.save_game(g)
+        except game_store.StaleWriteError:
+            raise
+        except Exception as e:
+            log.exception("Failed to persist timeout-lose for game %s", gid)
+            return json_error("Internal", str(e), 500)
 
-    return jsonify(svc.to_response(g)), 200
+        return jsonify(svc.to_response(g)), 200
 
 
 @bp.get("/static/<path:filename>")
@@ -599,7 +1077,7 @@ def api_spectator_new():
         log.exception("Failed to create spectator game")
         return json_error("Internal", str(e), 500)
 
-    _start_driver(g.id, delay_ms=delay_ms, difficulty=difficulty)
+    _start_driver(g.id, delay_ms=delay_ms, difficulty=difficulty, explain=_explain_mode(data))
 
     return jsonify({
         "gameId": g.id,
@@ -615,76 +1093,72 @@ def api_spectator_state():
     g = svc.get_game(game_id)
     if not g:
         return json_error("NotFound", "Game not found", 404)
-    return jsonify(svc.to_response(g)), 200
+    return _conditional_game_response(g)
 
 
 @bp.get("/spectator/events")
 def api_spectator_events():
+    """
+    SSE diváka: `state` (snímek), pak `move`… a `end` z logu hry (events.EventLog).
+    Každá událost nese `id:`; po reconnectu s hlavičkou Last-Event-ID (nebo
+    ?lastEventId=) stream pokračuje přesně za ní. Pokud zmeškané události
+    už z ring bufferu vypadly, přijde místo nich čerstvý `state`.
+    ?format=delta: místo `state` a plných `move` jde `keyframe` (celá deska
+    jako řetězec) a `move` jen s položeným kamenem; každý N-tý tah je keyframe.
+    """
     game_id = request.args.get("gameId")
     if not game_id:
         return json_error("BadRequest", "gameId required", 400)
+    fmt = (request.args.get("format") or "full").strip().lower()
+    if fmt not in events.FORMATS:
+        return json_error("BadRequest", f"format must be one of {', '.join(events.FORMATS)}", 400)
     g = svc.get_game(game_id)
     if not g:
         return json_error("NotFound", "Game not found", 404)
 
-    # ensure driver exists (could be re-attached)
-    with _SPECTATOR_REG_LOCK:
-        if game_id not in _SPECTATOR_REG:
-            # start a gentle driver with default parameters if missing
-            _start_driver(game_id, delay_ms=2000, difficulty=getattr(g, "difficulty", "easy") or "easy")
-
-    client_q: queue.Queue = queue.Queue(maxsize=128)
-    with _SPECTATOR_REG_LOCK:
-        sg = _SPECTATOR_REG.get(game_id)
-        if sg:
-            sg.subs.add(client_q)
+    ev_log = events.get_log(game_id)
+    cursor = events.parse_last_event_id(request.headers.get("Last-Event-ID") or request.args.get("lastEventId"))
+    if g.status != "running":
+        return Response(_spectator_replay(g, ev_log, cursor, fmt), status=200, headers=_SSE_HEADERS)
+    _ensure_spectator_driver(g)
 
-    def _format_event(event: str, data_obj: dict) -> str:
-        return f"event: {event}\n" + "data: " + json.dumps(data_obj, ensure_ascii=False) + "\n\n"
+    def _snapshot() -> tuple[int, str | None]:
+        return _spectator_snapshot(game_id, ev_log, fmt)
 
     @stream_with_context
     def _stream():
-        try:
-            # initial full snapshot
-            yield _format_event("state", svc.to_response(g))
-            last_ping = time.time()
-            while True:
-                try:
-                    item = client_q.get(timeout=15.0)
-                    if not isinstance(item, dict):
-                        continue
-                    t = item.get("type")
-                    d = item.get("data")
-                    if t == "move":
-                        yield _format_event("move", d)
-                    elif t == "end":
-                        yield _format_event("end", d)
-                        break
-                    elif t == "state":
-                        yield _format_event("state", d)
-                except queue.Empty:
-                    # heartbeat
-                    yield ": ping\n\n"
-                    # also re-ping every ~15s
-                    now = time.time()
-                    if now - last_ping > 30:
-                        last_ping = now
-                        # recheck game status and send state if ended silently
-                        gg = svc.get_game(game_id)
-                        if not gg:
-                            yield _format_event("end", {"status": "timeout"})
-                            break
-        finally:
-            # cleanup subscriber
-            with _SPECTATOR_REG_LOCK:
-                sg2 = _SPECTATOR_REG.get(game_id)
-                if sg2 and client_q in sg2.subs:
-                    sg2.subs.discard(client_q)
-
-    headers = {
-        "Content-Type": "text/event-stream",
-        "Cache-Control": "no-cache",
-        "Connection": "keep-alive",
-        # CORS is managed globally by app CORS config
-    }
-    return Response(_stream(), status=200, headers=headers)
+        cur = cursor
+        if cur is None:
+            cur, frame = _snapshot()
+            if frame is None:
+                yield _format_event("end", {"status": "timeout"})
+                return
+            yield frame
+        last_ping = time.time()
+        while True:
+            items, gap = ev_log.wait_after(cur, timeout=15.0, fmt=fmt)
+            if gap:
+                # kurzor je mimo buffer (nebo z jiného logu) → znovu celý stav
+                cur, frame = _snapshot()
+                if frame is None:
+                    yield _format_event("end", {"status": "timeout"})
+                    return
+                yield frame
+                continue
+            for seq, event, frame in items:
+                cur = seq
+                yield frame
+                if event == "end":
+                    return
+            if not items:
+                # heartbeat
+                yield ": ping\n\n"
+                now = time.time()
+                if now - last_ping > 30:
+                    last_ping = now
+                    # recheck game status and send state if ended silently
+                    if not svc.get_game(game_id):
+                        yield _format_event("end", {"status": "timeout"})
+                        return
+
+    return Response(_stream(), status=200, headers=_SSE_HEADERS)
@@ -1,8 +1,23 @@
 # src/Backend/react/adapter.py
 from __future__ import annotations
+import math
+import random
 import time
-from typing import List, Tuple, Optional
-from .config import difficulty_params, TIMEOUT_MS, ENGINE_VERSION
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, Iterator, List, Tuple, Optional
+from .config import (
+    difficulty_params, TIMEOUT_MS, ENGINE_VERSION, UCT_C, PARALLEL_DIFFICULTIES,
+    SOLVER_DIFFICULTIES, SOLVER_MAX_EMPTY, PLAYOUT_BATCH, PLAYOUT_BATCH_MIN_SIZE,
+    PONDER_REPLIES,
+)
+from .bitboard import BitBoard
+from .engine import (
+    MCTS, SearchResult, mcts_search, root_parallel_search, solve, SolveResult, book_lookup,
+    BEST_MOVE_TT, canonicalize, to_canonical_move, from_canonical_move, get_pool, worker_count,
+)
+
+_RNG = random.Random()
 
 class EngineTimeout(Exception):
     pass
@@ -46,6 +61,45 @@ def _centerish(board: List[List[str]]) -> Optional[Tuple[int, int]]:
                     best = (r, c)
     return best
 
+def _use_solver(bb: BitBoard, difficulty: str, engine: str) -> bool:
+    if engine == "solver":
+        return True
+    if engine != "auto":
+        return False
+    return (
+        (difficulty or "").strip().lower() in SOLVER_DIFFICULTIES
+        and bb.empty().bit_count() <= SOLVER_MAX_EMPTY
+    )
+
+
+def _solver_response(sr: SolveResult, move: Tuple[int, int], *, size: int, k_to_win: int,
+                     player: str, difficulty: str, time_cap: int, elapsed: int) -> dict:
+    score = {"win": 1.0, "loss": -1.0}.get(sr.result, 0.0)
+    return {
+        "move": [int(move[0]), int(move[1])],
+        "score": score,
+        "explain": (
+            f"solver result={sr.result}; distance={sr.distance}; depth={sr.depth}; nodes={sr.nodes}; "
+            f"size={size}; k={k_to_win}; player={player}; diff={difficulty}; capMs={time_cap}"
+        ),
+        "solve": {
+            "result": sr.result,
+            "distance": sr.distance,
+            "depth": sr.depth,
+            "exact": sr.exact,
+        },
+        "stats": {
+            "elapsedMs": elapsed,
+            "rollouts": 0,
+            "rolloutsPerSec": 0,
+            "treeSize": 0,
+            "nodes": int(sr.nodes),
+            "timedOut": bool(sr.timed_out),
+        },
+        "version": ENGINE_VERSION,
+    }
+
+
 def compute_best_move(
     board: List[List[str]],
     player: str,
@@ -53,29 +107,428 @@ def compute_best_move(
     k_to_win: int,
     *,
     difficulty: str = "easy",
-    time_cap_ms: int | None = None
+    time_cap_ms: int | None = None,
+    engine: str = "auto",
 ) -> dict:
+    """
+    Nejlepší tah v limitu `time_cap_ms` (default TIMEOUT_MS).
+
+    engine:
+      - "mcts"   – MCTS s rozpočtem rolloutů z config.difficulty_params
+      - "solver" – přesný alpha-beta solver (win/draw/loss + vzdálenost)
+      - "auto"   – nejdřív opening book (engine/book.py), pak solver pro malé
+                   pozice (SOLVER_MAX_EMPTY volných polí, obtížnosti
+                   SOLVER_DIFFICULTIES), jinak MCTS; když solver nedořeší
+                   pozici v polovině limitu, dohledá MCTS.
+
+    Při vypršení limitu vrací nejlepší dosavadní tah (stats.timedOut=True);
+    pokud nestihl doběhnout ani jeden rollout, hází EngineTimeout.
+    """
     # plán z konfigurace obtížností
     plan = difficulty_params(difficulty)
     time_cap = int(time_cap_ms) if (time_cap_ms is not None) else TIMEOUT_MS
+    engine = (engine or "auto").strip().lower()
 
     t0 = time.perf_counter()
+    deadline = t0 + max(0, time_cap) / 1000.0
+
+    bb = BitBoard.from_lists(board, k_to_win)
+
+    # „greedy“ složka obtížnosti: občas rychlý heuristický tah místo hledání
+    if engine == "auto" and plan.greedy > 0 and _RNG.random() < plan.greedy:
+        move = _centerish(board) or _first_empty(board) or (0, 0)
+        elapsed = int((time.perf_counter() - t0) * 1000)
+        return {
+            "move": [int(move[0]), int(move[1])],
+            "score": 0.0,
+            "explain": f"greedy=centerish; size={size}; k={k_to_win}; player={player}; diff={difficulty}; greedy={plan.greedy}",
+            "stats": {"elapsedMs": elapsed, "rollouts": 0, "rolloutsPerSec": 0, "treeSize": 0, "timedOut": False},
+            "version": ENGINE_VERSION,
+        }
+
+    # opening book: předpočítaná zahájení (mmap, binární půlení) – bez práce enginu
+    if engine == "auto":
+        entry = book_lookup(bb, player)
+        if entry is not None:
+            move = from_engine_coords(*entry.move)
+            return {
+                "move": [int(move[0]), int(move[1])],
+                "score": entry.score,
+                "explain": (
+                    f"book result={entry.result}; distance={entry.distance}; "
+                    f"size={size}; k={k_to_win}; player={player}; diff={difficulty}"
+                ),
+                "stats": {
+                    "elapsedMs": int((time.perf_counter() - t0) * 1000),
+                    "rollouts": 0,
+                    "rolloutsPerSec": 0,
+                    "treeSize": 0,
+                    "timedOut": False,
+                    "book": True,
+                },
+                "version": ENGINE_VERSION,
+            }
+
+    use_solver = bool(bb.empty()) and _use_solver(bb, difficulty, engine)
+
+    # transpoziční cache: rotace/zrcadlení už spočtené pozice = jen lookup
+    cx, co, t = canonicalize(bb)
+    tt_key = (bb.n, bb.k, player, "solver" if use_solver else plan.rollouts, cx, co)
+    hit = BEST_MOVE_TT.get(tt_key)
+    if hit is not None:
+        move = from_engine_coords(*from_canonical_move(bb.n, t, hit["move"]))
+        out = {
+            "move": [int(move[0]), int(move[1])],
+            "score": hit["score"],
+            "explain": hit["explain"] + "; cached=symmetry",
+            "stats": {
+                **hit["stats"],
+                "elapsedMs": int((time.perf_counter() - t0) * 1000),
+                "cached": True,
+            },
+            "version": ENGINE_VERSION,
+        }
+        if "solve" in hit:
+            out["solve"] = dict(hit["solve"])
+        return out
+
+    if use_solver:
+        # v auto režimu solver dostane polovinu limitu, zbytek případně MCTS
+        s_deadline = deadline if engine == "solver" else t0 + (deadline - t0) / 2.0
+        sr = solve(bb, player, deadline=s_deadline)
+        if sr.move is not None and (sr.exact or engine == "solver"):
+            out = _solver_response(
+                sr, from_engine_coords(*sr.move), size=size, k_to_win=k_to_win, player=player,
+                difficulty=difficulty, time_cap=time_cap,
+                elapsed=int((time.perf_counter() - t0) * 1000),
+            )
+            if sr.exact:
+                BEST_MOVE_TT.put(tt_key, {
+                    "move": to_canonical_move(bb.n, t, *sr.move),
+                    "score": out["score"],
+                    "explain": out["explain"],
+                    "solve": out["solve"],
+                    "stats": {k: v for k, v in out["stats"].items() if k != "elapsedMs"},
+                })
+            return out
+        if engine == "solver":
+            raise EngineTimeout(f"Solver did not finish a single iteration within {time_cap} ms")
+        tt_key = (bb.n, bb.k, player, plan.rollouts, cx, co)
+
+    # velké desky: listy se hodnotí dávkou vektorizovaných playoutů
+    batch = PLAYOUT_BATCH if size >= PLAYOUT_BATCH_MIN_SIZE else 0
+    if (difficulty or "").strip().lower() in PARALLEL_DIFFICULTIES:
+        # hard: rozpočet rozdělený mezi procesy (bez poolu = jednovláknově)
+        res = root_parallel_search(bb, player, rollouts=plan.rollouts, deadline=deadline, c=UCT_C,
+                                   playout_batch=batch)
+    else:
+        res = mcts_search(bb, player, rollouts=plan.rollouts, deadline=deadline, rng=_RNG, c=UCT_C,
+                          playout_batch=batch)
+    return _mcts_response(res, bb, t, tt_key, size=size, k_to_win=k_to_win, player=player,
+                          difficulty=difficulty, time_cap=time_cap, rollouts=plan.rollouts,
+                          batch=batch, t0=t0)
 
-    # TODO: napojení na „těžký“ engine (MCTS apod.)
-    # try:
-    #     move, score, used_rollouts = heavy_solve(..., rollouts=plan.rollouts, limit_ms=time_cap)
-    #     ...
-    # except TimeoutError as ex:
-    #     raise EngineTimeout(str(ex))
 
-    # Fallback: rychlá deterministická heuristika
-    move = _centerish(board) or _first_empty(board) or (0, 0)
+def _mcts_response(res: SearchResult, bb: BitBoard, t: int, tt_key: tuple, *, size: int, k_to_win: int,
+                   player: str, difficulty: str, time_cap: int, rollouts: int, batch: int,
+                   t0: float) -> dict:
+    if res.move is None:
+        if bb.empty():
+            raise EngineTimeout(f"No rollout finished within {time_cap} ms; try lower difficulty / smaller size")
+        # plná deska – není co hrát
+        move = (0, 0)
+    else:
+        move = from_engine_coords(*res.move)
+
     elapsed = int((time.perf_counter() - t0) * 1000)
+    rps = int(res.rollouts / res.elapsed_s) if res.elapsed_s > 0 else 0
 
-    return {
+    out = {
         "move": [int(move[0]), int(move[1])],
-        "score": 0.0,
-        "explain": f"fallback=centerish; size={size}; k={k_to_win}; player={player}; diff={difficulty}; rollouts={plan.rollouts}; greedy={plan.greedy}; capMs={time_cap}",
-        "stats": {"elapsedMs": elapsed, "rollouts": int(plan.rollouts)},
+        "score": round(float(res.score), 4),
+        "explain": f"mcts iterations={res.iterations}/{rollouts}; rollouts={res.rollouts}; size={size}; k={k_to_win}; player={player}; diff={difficulty}; capMs={time_cap}",
+        "stats": {
+            "elapsedMs": elapsed,
+            "rollouts": int(res.rollouts),
+            "iterations": int(res.iterations),
+            "rolloutsPerSec": rps,
+            "treeSize": int(res.nodes),
+            "timedOut": bool(res.timed_out),
+            "playoutBatch": batch,
+        },
         "version": ENGINE_VERSION,
     }
+    # do cache jen dokončená hledání (useknutý výsledek by byl horší než nový)
+    if res.move is not None and not res.timed_out:
+        BEST_MOVE_TT.put(tt_key, {
+            "move": to_canonical_move(bb.n, t, *res.move),
+            "score": out["score"],
+            "explain": out["explain"],
+            "stats": {k: v for k, v in out["stats"].items() if k != "elapsedMs"},
+        })
+    return out
+
+
+def stream_best_move(
+    board: List[List[str]],
+    player: str,
+    size: int,
+    k_to_win: int,
+    *,
+    difficulty: str = "hard",
+    time_cap_ms: int | None = None,
+    interval_ms: int = 250,
+) -> Iterator[dict]:
+    """
+    Anytime varianta compute_best_move (engine "auto").
+
+    Každých `interval_ms` vydá průběžný nejlepší tah MCTS
+    {"final": False, "move", "score", "rollouts", "elapsedMs"}; nakonec
+    výsledek ve tvaru compute_best_move s "final": True. Strom běží v tomto
+    procesu (bez root-parallel), aby šel průběžně číst. Knihovna, cache
+    a solver odpoví rovnou jedním finálním výsledkem. Zavřením generátoru
+    (klient odešel / přijal nápovědu) hledání okamžitě končí.
+    """
+    plan = difficulty_params(difficulty)
+    time_cap = int(time_cap_ms) if (time_cap_ms is not None) else TIMEOUT_MS
+    t0 = time.perf_counter()
+    deadline = t0 + max(0, time_cap) / 1000.0
+    bb = BitBoard.from_lists(board, k_to_win)
+
+    cx, co, t = canonicalize(bb)
+    tt_key = (bb.n, bb.k, player, plan.rollouts, cx, co)
+    if (not bb.empty() or book_lookup(bb, player) is not None or _use_solver(bb, difficulty, "auto")
+            or tt_key in BEST_MOVE_TT):
+        yield {**compute_best_move(board, player, size, k_to_win, difficulty=difficulty,
+                                   time_cap_ms=time_cap), "final": True}
+        return
+
+    batch = PLAYOUT_BATCH if size >= PLAYOUT_BATCH_MIN_SIZE else 0
+    tree = MCTS(bb, player, rng=_RNG, c=UCT_C, playout_batch=batch)
+    step = max(10, int(interval_ms)) / 1000.0
+    timed_out = False
+    while tree.iterations < plan.rollouts:
+        tick = min(deadline, time.perf_counter() + step)
+        if tree.run(plan.rollouts - tree.iterations, tick) and time.perf_counter() >= deadline:
+            timed_out = True
+            break
+        move, score = tree.best()
+        if move is not None and tree.iterations < plan.rollouts:
+            r, c = from_engine_coords(*move)
+            yield {
+                "final": False,
+                "move": [int(r), int(c)],
+                "score": round(float(score), 4),
+                "rollouts": int(tree.rollouts),
+                "iterations": int(tree.iterations),
+                "elapsedMs": int((time.perf_counter() - t0) * 1000),
+            }
+
+    move, score = tree.best()
+    res = SearchResult(move, score, tree.rollouts, tree.nodes, time.perf_counter() - t0,
+                       timed_out, tree.root_visits(), tree.iterations)
+    yield {**_mcts_response(res, bb, t, tt_key, size=size, k_to_win=k_to_win, player=player,
+                            difficulty=difficulty, time_cap=time_cap, rollouts=plan.rollouts,
+                            batch=batch, t0=t0), "final": True}
+
+
+# ───────────────────────── pondering ─────────────────────────
+
+_PONDER_SLICE_S = 0.05
+
+
+def _run_cancellable(tree: MCTS, rollouts: int, deadline: float, cancel: threading.Event) -> bool:
+    """Dohledej strom po krátkých úsecích; True jen pokud doběhl celý rozpočet iterací."""
+    while tree.iterations < rollouts:
+        if cancel.is_set() or time.perf_counter() >= deadline:
+            return False
+        tree.run(rollouts - tree.iterations, min(deadline, time.perf_counter() + _PONDER_SLICE_S))
+        if not tree.root.children and not tree.root.untried:
+            return False
+    return True
+
+
+def ponder_replies(
+    board: List[List[str]],
+    human_mark: str,
+    ai_mark: str,
+    size: int,
+    k_to_win: int,
+    *,
+    difficulty: str,
+    cancel: threading.Event,
+    budget_ms: int,
+    replies: int = PONDER_REPLIES,
+) -> dict:
+    """
+    Spekulativní hledání, zatímco přemýšlí člověk: krátké MCTS za člověka
+    odhadne `replies` nejpravděpodobnějších odpovědí a pro každou výslednou
+    pozici se dopředu spočítá tah AI. Hotová hledání končí v BEST_MOVE_TT
+    pod stejným klíčem, jaký použije compute_best_move, takže skutečný
+    /play je pak jen lookup. Nastavení `cancel` (přišel skutečný tah)
+    hledání ukončí do ~50 ms; nedokončený strom se neukládá.
+    """
+    plan = difficulty_params(difficulty)
+    t0 = time.perf_counter()
+    deadline = t0 + max(0, int(budget_ms)) / 1000.0
+    bb = BitBoard.from_lists(board, k_to_win)
+    out = {"predicted": [], "searched": 0, "cached": 0, "cancelled": False, "elapsedMs": 0}
+
+    def _done() -> dict:
+        out["cancelled"] = cancel.is_set()
+        out["elapsedMs"] = int((time.perf_counter() - t0) * 1000)
+        return out
+
+    if not bb.empty() or bb.winner() is not None:
+        return _done()
+
+    # 1) odhad odpovědí člověka (pětina rozpočtu)
+    guess = MCTS(bb, human_mark, rng=_RNG, c=UCT_C)
+    _run_cancellable(guess, plan.rollouts, t0 + (deadline - t0) / 5.0, cancel)
+    ranked = sorted(guess.root_visits().items(), key=lambda kv: kv[1][0], reverse=True)
+
+    batch = PLAYOUT_BATCH if size >= PLAYOUT_BATCH_MIN_SIZE else 0
+    for idx, _ in ranked[:max(0, replies)]:
+        if cancel.is_set() or time.perf_counter() >= deadline:
+            break
+        r, c = divmod(idx, bb.n)
+        after = bb.copy()
+        after.play(r, c, human_mark)
+        out["predicted"].append([r, c])
+        if after.winner() is not None or not after.empty() or book_lookup(after, ai_mark) is not None:
+            continue  # konec hry / knihovna – není co předpočítat
+
+        if _use_solver(after, difficulty, "auto"):
+            # malé pozice: solver (nepřerušitelný, ale omezený zbytkem rozpočtu)
+            left_ms = int((deadline - time.perf_counter()) * 1000)
+            try:
+                compute_best_move(after.to_lists(), ai_mark, size, k_to_win,
+                                  difficulty=difficulty, time_cap_ms=left_ms)
+                out["searched"] += 1
+            except EngineTimeout:
+                pass
+            continue
+
+        cx, co, t = canonicalize(after)
+        tt_key = (after.n, after.k, ai_mark, plan.rollouts, cx, co)
+        if tt_key in BEST_MOVE_TT:
+            out["cached"] += 1
+            continue
+        t1 = time.perf_counter()
+        tree = MCTS(after, ai_mark, rng=_RNG, c=UCT_C, playout_batch=batch)
+        if not _run_cancellable(tree, plan.rollouts, deadline, cancel):
+            break
+        move, score = tree.best()
+        res = SearchResult(move, score, tree.rollouts, tree.nodes, time.perf_counter() - t1,
+                           False, tree.root_visits(), tree.iterations)
+        _mcts_response(res, after, t, tt_key, size=size, k_to_win=k_to_win, player=ai_mark,
+                       difficulty=difficulty, time_cap=TIMEOUT_MS, rollouts=plan.rollouts,
+                       batch=batch, t0=t1)
+        out["searched"] += 1
+    return _done()
+
+
+# ───────────────────────── dávka pozic ─────────────────────────
+
+def _batch_task(board: List[List[str]], player: str, size: int, k_to_win: int, difficulty: str,
+                engine: str, time_cap_ms: int) -> dict:
+    """Jedna pozice dávky (běží ve workeru poolu nebo přímo); chyby enginu se vrací, nehází."""
+    t0 = time.perf_counter()
+    try:
+        out = compute_best_move(board, player, size, k_to_win, difficulty=difficulty,
+                                time_cap_ms=time_cap_ms, engine=engine) or {}
+    except Exception as e:
+        out = {"engineError": str(e)}
+    out["elapsedMs"] = int((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def compute_best_moves(
+    positions: List[dict],
+    *,
+    time_budget_ms: int | None = None,
+    engine: str = "auto",
+) -> Tuple[List[dict], dict]:
+    """
+    Nejlepší tahy pro více pozic najednou pod jedním časovým rozpočtem.
+
+    positions: [{"board", "player", "size", "kToWin", "difficulty"}, …] (už zvalidované)
+
+    - pozice se deduplikují přes kanonický tvar (8 symetrií desky): počítá se
+      jen první výskyt, shodné/zrcadlené kopie dostanou jeho tah převedený
+      zpět do svých souřadnic (stats.dedupe = "identical" | "symmetric",
+      stats.dedupeOf = index vzoru)
+    - unikátní pozice běží paralelně ve sdíleném process poolu; rozpočet se
+      dělí na „vlny“ po počtu workerů, takže celá dávka se vejde do limitu
+    - nestihnutá pozice vrátí {"engineError": …} (volající dopočítá bezpečný tah)
+
+    Vrací (výsledky ve stejném pořadí jako vstup, meta).
+    """
+    t0 = time.perf_counter()
+    budget = max(1, int(time_budget_ms if time_budget_ms is not None else TIMEOUT_MS))
+
+    # deduplikace: (n, k, hráč, obtížnost, kanonická deska) → index vzoru
+    first: Dict[tuple, int] = {}
+    plan: List[Tuple[int, int]] = []        # pro každou pozici (index vzoru, transformace)
+    for i, p in enumerate(positions):
+        bb = BitBoard.from_lists(p["board"], p["kToWin"])
+        cx, co, t = canonicalize(bb)
+        key = (bb.n, bb.k, p["player"], p["difficulty"], cx, co)
+        plan.append((first.setdefault(key, i), t))
+    unique = sorted(set(first.values()))
+
+    pool = get_pool()
+    workers = worker_count() if pool is not None else 1
+    waves = max(1, math.ceil(len(unique) / workers))
+    cap_ms = min(TIMEOUT_MS, max(1, budget // waves))
+
+    results: Dict[int, dict] = {}
+    if pool is not None and len(unique) > 1:
+        futs = {
+            i: pool.submit(_batch_task, positions[i]["board"], positions[i]["player"], positions[i]["size"],
+                           positions[i]["kToWin"], positions[i]["difficulty"], engine, cap_ms)
+            for i in unique
+        }
+        deadline = t0 + budget / 1000.0
+        for i, fut in futs.items():
+            try:
+                # malá rezerva na přenos výsledku z workeru
+                results[i] = fut.result(timeout=max(0.0, deadline - time.perf_counter()) + 0.25)
+            except FutureTimeout:
+                fut.cancel()
+                results[i] = {"engineError": f"batch time budget {budget} ms exhausted"}
+            except Exception as e:
+                results[i] = {"engineError": str(e)}
+    else:
+        for n_done, i in enumerate(unique):
+            # jednovláknově: zbytek rozpočtu férově mezi zbývající pozice
+            left_ms = budget - int((time.perf_counter() - t0) * 1000)
+            share = min(TIMEOUT_MS, max(1, left_ms // (len(unique) - n_done)))
+            p = positions[i]
+            results[i] = _batch_task(p["board"], p["player"], p["size"], p["kToWin"], p["difficulty"],
+                                     engine, share)
+
+    out: List[dict] = []
+    for i, (rep, t) in enumerate(plan):
+        res = results[rep]
+        if rep != i:
+            t_rep = plan[rep][1]
+            res = {**res, "stats": {**(res.get("stats") or {}),
+                                    "dedupe": "identical" if t == t_rep else "symmetric",
+                                    "dedupeOf": rep}}
+            mv = res.get("move")
+            if isinstance(mv, (list, tuple)) and len(mv) == 2:
+                n = positions[i]["size"]
+                r, c = from_canonical_move(n, t, to_canonical_move(n, t_rep, int(mv[0]), int(mv[1])))
+                res["move"] = [r, c]
+        out.append(res)
+
+    meta = {
+        "count": len(positions),
+        "unique": len(unique),
+        "workers": workers,
+        "budgetMs": budget,
+        "perPositionCapMs": cap_ms,
+        "elapsedMs": int((time.perf_counter() - t0) * 1000),
+    }
+    return out, meta
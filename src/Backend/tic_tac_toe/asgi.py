@@ -0,0 +1,348 @@
+"""
+Asynchronní obsluha diváckých SSE (`GET /api/tictactoe/spectator/events`).
+
+WSGI verze endpointu drží po celou hru jedno vlákno workeru na diváka.
+Tady stream obsluhuje jedna asyncio smyčka: čekající divák je jen korutina
+a future v events.EventLog (probudí ji publish z vlákna driveru), tedy
+jednotky kB místo vlákna. Protokol je stejný jako u Flask endpointu
+(`state` → `move`… → `end`, `id:` + Last-Event-ID / ?lastEventId=,
+?format=delta).
+
+Dvě podoby:
+  - `app` / `make_app(fallback=...)` – čistá ASGI aplikace bez závislostí
+    (uvicorn, hypercorn…); ostatní cesty předá `fallback` (např. Flask přes
+    asgiref.wsgi.WsgiToAsgi), bez něj vrací 404
+  - `AsyncEventServer` – minimální HTTP/1.1 server nad asyncio (jen stdlib)
+    ve vlastním vlákně uvnitř Flask procesu; zapíná ho TTT_SSE_ASYNC_PORT.
+    Musí běžet ve stejném procesu jako driver divácké hry – logy událostí
+    jsou procesní.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import threading
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote
+
+from . import events
+from . import service as svc
+from .config import FRONTEND_ORIGIN, SSE_ASYNC_HOST, SSE_ASYNC_PORT
+
+log = logging.getLogger(__name__)
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[dict]]
+Send = Callable[[dict], Awaitable[None]]
+AsgiApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+EVENTS_PATH = "/api/tictactoe/spectator/events"
+HEARTBEAT_S = 15.0
+
+_SSE_HEADERS = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    (b"access-control-allow-origin", FRONTEND_ORIGIN.encode("latin-1")),
+]
+
+_CONNECTIONS = 0
+
+
+def stats() -> Dict[str, Any]:
+    srv = _BACKGROUND
+    return {
+        "connections": _CONNECTIONS,
+        "running": bool(srv and srv.port),
+        "port": srv.port if srv else None,
+    }
+
+
+# ───────────────────────── ASGI aplikace ─────────────────────────
+
+def make_app(fallback: Optional[AsgiApp] = None) -> AsgiApp:
+    """ASGI aplikace obsluhující spectator SSE; ostatní požadavky jdou do `fallback`."""
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            if fallback is not None:
+                return await fallback(scope, receive, send)
+            while True:
+                msg = await receive()
+                if msg["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif msg["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] == "http" and scope["path"] == EVENTS_PATH and scope["method"] in ("GET", "HEAD"):
+            return await _spectator_events(scope, receive, send)
+        if fallback is not None:
+            return await fallback(scope, receive, send)
+        if scope["type"] == "http":
+            await _json_error(send, "NotFound", "Not found", 404)
+
+    return app
+
+
+async def _json_error(send: Send, code: str, message: str, status: int) -> None:
+    body = json.dumps({"error": {"code": code, "message": message}}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"access-control-allow-origin", FRONTEND_ORIGIN.encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _until_disconnect(receive: Receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _spectator_events(scope: Scope, receive: Receive, send: Send) -> None:
+    # import až tady: blueprint (tic_tac_toe/__init__) importuje tento modul při startu
+    from . import _ensure_spectator_driver, _spectator_replay, _spectator_snapshot
+
+    global _CONNECTIONS
+    loop = asyncio.get_running_loop()
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    game_id = (query.get("gameId") or [""])[0]
+    if not game_id:
+        return await _json_error(send, "BadRequest", "gameId required", 400)
+    fmt = (query.get("format") or ["full"])[0].strip().lower()
+    if fmt not in events.FORMATS:
+        return await _json_error(send, "BadRequest", f"format must be one of {', '.join(events.FORMATS)}", 400)
+    # store / zámek hry můžou blokovat (Redis) → mimo smyčku
+    g = await loop.run_in_executor(None, svc.get_game, game_id)
+    if not g:
+        return await _json_error(send, "NotFound", "Game not found", 404)
+    await loop.run_in_executor(None, _ensure_spectator_driver, g)
+
+    headers = {k.lower(): v for k, v in scope.get("headers", [])}
+    raw_id = headers.get(b"last-event-id", b"").decode("latin-1") or (query.get("lastEventId") or [""])[0]
+    cursor = events.parse_last_event_id(raw_id)
+    ev_log = events.get_log(game_id)
+
+    await send({"type": "http.response.start", "status": 200, "headers": _SSE_HEADERS})
+    if scope["method"] == "HEAD":
+        return await send({"type": "http.response.body", "body": b""})
+
+    async def emit(text: str) -> None:
+        await send({"type": "http.response.body", "body": text.encode("utf-8"), "more_body": True})
+
+    async def snapshot() -> Tuple[int, Optional[str]]:
+        return await loop.run_in_executor(None, _spectator_snapshot, game_id, ev_log, fmt)
+
+    gone = asyncio.ensure_future(_until_disconnect(receive))
+    _CONNECTIONS += 1
+    try:
+        if g.status != "running":
+            # dohraná hra: driver se nespouští, jen zbytek logu a `end`
+            for frame in await loop.run_in_executor(None, _spectator_replay, g, ev_log, cursor, fmt):
+                await emit(frame)
+            return
+        if cursor is None:
+            cursor, frame = await snapshot()
+            if frame is None:
+                return await emit(events.format_event("end", {"status": "timeout"}))
+            await emit(frame)
+        idle = 0
+        while not gone.done():
+            fut = ev_log.watch(cursor, loop)
+            if fut is not None:
+                try:
+                    await asyncio.wait((fut, gone), timeout=HEARTBEAT_S, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    ev_log.unwatch(fut)
+                if gone.done():
+                    break
+            items, gap = ev_log.read_after(cursor, fmt)
+            if gap:
+                # kurzor je mimo buffer (nebo z jiného logu) → znovu celý stav
+                cursor, frame = await snapshot()
+                if frame is None:
+                    return await emit(events.format_event("end", {"status": "timeout"}))
+                await emit(frame)
+                continue
+            for seq, event, frame in items:
+                cursor = seq
+                await emit(frame)
+                if event == "end":
+                    return
+            if not items:
+                await emit(": ping\n\n")
+                idle += 1
+                if idle % 2 == 0 and not await loop.run_in_executor(None, svc.get_game, game_id):
+                    return await emit(events.format_event("end", {"status": "timeout"}))
+            else:
+                idle = 0
+    except OSError:
+        pass  # klient odešel uprostřed zápisu
+    finally:
+        _CONNECTIONS -= 1
+        gone.cancel()
+        try:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except OSError:
+            pass
+
+
+app = make_app()
+
+
+# ───────────────────────── vestavěný server (stdlib) ─────────────────────────
+
+class AsyncEventServer:
+    """
+    Minimální HTTP/1.1 server pro ASGI `app` (GET, odpověď streamem, Connection: close).
+    Běží ve vlastním vlákně s vlastní smyčkou; port 0 = náhodný volný.
+    """
+
+    def __init__(self, asgi_app: AsgiApp = app, host: str = "127.0.0.1", port: int = 0):
+        self.app = asgi_app
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "AsyncEventServer":
+        self._thread = threading.Thread(target=self._run, name="ttt-sse-async", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self) -> None:
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.port = 0
+
+    def __enter__(self) -> "AsyncEventServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            loop.close()
+            return
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+            loop.run_until_complete(asyncio.sleep(0))
+            loop.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10.0)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, OSError):
+            writer.close()
+            return
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _version = lines[0].split(" ", 2)
+        except ValueError:
+            writer.close()
+            return
+        headers: List[Tuple[bytes, bytes]] = []
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+        path, _, query = target.partition("?")
+        peer = writer.get_extra_info("peername") or ("", 0)
+        scope: Scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": "http",
+            "path": unquote(path),
+            "raw_path": path.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "root_path": "",
+            "headers": headers,
+            "client": (peer[0], peer[1]),
+            "server": (self.host, self.port),
+        }
+        request_sent = False
+
+        async def receive() -> dict:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # po GET klient nic dalšího neposílá → EOF = odpojení
+            try:
+                while await reader.read(1024):
+                    pass
+            except OSError:
+                pass
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                status = int(message["status"])
+                out = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n".encode("latin-1")]
+                for name, value in message.get("headers", []):
+                    out.append(name + b": " + value + b"\r\n")
+                out.append(b"connection: close\r\n\r\n")
+                writer.write(b"".join(out))
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                if body:
+                    writer.write(body)
+                await writer.drain()
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            log.exception("ASGI app failed for %s %s", method, path)
+        finally:
+            writer.close()
+
+
+_BACKGROUND: Optional[AsyncEventServer] = None
+_BACKGROUND_LOCK = threading.Lock()
+
+
+def start_background(host: str = SSE_ASYNC_HOST, port: int = SSE_ASYNC_PORT) -> Optional[AsyncEventServer]:
+    """Spustí AsyncEventServer v tomto procesu (jednou); chyba bindu se jen zaloguje."""
+    global _BACKGROUND
+    with _BACKGROUND_LOCK:
+        if _BACKGROUND is None:
+            try:
+                _BACKGROUND = AsyncEventServer(app, host, port).start()
+                log.info("Async spectator SSE listening on %s%s", _BACKGROUND.url, EVENTS_PATH)
+            except OSError:
+                log.exception("Async spectator SSE could not bind %s:%s", host, port)
+        return _BACKGROUND
@@ -0,0 +1,290 @@
+"""
+Bitboard reprezentace desky pro Tic-Tac-Toe / Connect-K.
+
+Každý hráč má jeden int, bit `i` odpovídá poli (i // n, i % n) (row-major).
+Masky všech linií délky k (→, ↓, ↘, ↙) se předpočítají jednou pro (size, k),
+takže výhra, remíza i „vyhraj/zablokuj hned“ jsou jen AND/porovnání nad inty.
+
+Funkce / třídy:
+- line_table(n, k) -> LineTable (cache per (n, k))
+- BitBoard.from_lists(board, k) / BitBoard.to_lists()
+- BitBoard.winner() -> "X" | "O" | "draw" | None
+- BitBoard.winning_sequence() -> [{"row": r, "col": c}, ...] | []
+- BitBoard.immediate_wins(mark) -> bitset polí, kterými `mark` hned vyhraje
+- ThreatIndex – inkrementální počty kamenů v oknech délky k; „vyhraj / zablokuj
+  hned“ jako lookup, tah přepočítá jen okna přes dané pole
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DIRECTIONS: Tuple[Tuple[int, int], ...] = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+@dataclass(frozen=True)
+class LineTable:
+    n: int
+    k: int
+    full: int                                       # maska všech n² polí
+    masks: Tuple[int, ...]                          # linie v pořadí (start r, start c, směr)
+    starts: Tuple[Tuple[int, int, int, int], ...]   # (r, c, dr, dc) ke každé masce
+    by_cell: Tuple[Tuple[int, ...], ...]            # masky linií procházejících polem i
+    lines_at: Tuple[Tuple[int, ...], ...]           # indexy (do masks) linií přes pole i
+
+
+@lru_cache(maxsize=None)
+def line_table(n: int, k: int) -> LineTable:
+    masks: List[int] = []
+    starts: List[Tuple[int, int, int, int]] = []
+    for r in range(n):
+        for c in range(n):
+            for dr, dc in DIRECTIONS:
+                er, ec = r + dr * (k - 1), c + dc * (k - 1)
+                if not (0 <= er < n and 0 <= ec < n):
+                    continue
+                m = 0
+                for i in range(k):
+                    m |= 1 << ((r + dr * i) * n + (c + dc * i))
+                masks.append(m)
+                starts.append((r, c, dr, dc))
+    lines_at = tuple(
+        tuple(j for j, m in enumerate(masks) if m >> i & 1)
+        for i in range(n * n)
+    )
+    by_cell = tuple(tuple(masks[j] for j in idx) for idx in lines_at)
+    return LineTable(
+        n=n, k=k, full=(1 << (n * n)) - 1,
+        masks=tuple(masks), starts=tuple(starts), by_cell=by_cell, lines_at=lines_at,
+    )
+
+
+def iter_cells(bits: int, n: int) -> Iterator[Tuple[int, int]]:
+    """Projde nastavené bity od nejnižšího (= row-major pořadí) jako (r, c)."""
+    while bits:
+        low = bits & -bits
+        idx = low.bit_length() - 1
+        yield divmod(idx, n)
+        bits ^= low
+
+
+def first_cell(bits: int, n: int) -> Optional[Tuple[int, int]]:
+    if not bits:
+        return None
+    return divmod((bits & -bits).bit_length() - 1, n)
+
+
+class BitBoard:
+    __slots__ = ("n", "k", "x", "o")
+
+    def __init__(self, n: int, k: int, x: int = 0, o: int = 0):
+        self.n = n
+        self.k = k
+        self.x = x
+        self.o = o
+
+    # ───────────────────────── konverze ─────────────────────────
+
+    @classmethod
+    def from_lists(cls, board: Sequence[Sequence[str]], k: int) -> "BitBoard":
+        n = len(board)
+        x = o = 0
+        for r, row in enumerate(board):
+            base = r * n
+            for c, v in enumerate(row):
+                if v == "X":
+                    x |= 1 << (base + c)
+                elif v == "O":
+                    o |= 1 << (base + c)
+        return cls(n, k, x, o)
+
+    def to_lists(self) -> List[List[str]]:
+        n = self.n
+        out = [["." for _ in range(n)] for _ in range(n)]
+        for r, c in iter_cells(self.x, n):
+            out[r][c] = "X"
+        for r, c in iter_cells(self.o, n):
+            out[r][c] = "O"
+        return out
+
+    def copy(self) -> "BitBoard":
+        return BitBoard(self.n, self.k, self.x, self.o)
+
+    # ───────────────────────── dotazy ─────────────────────────
+
+    @property
+    def table(self) -> LineTable:
+        return line_table(self.n, self.k)
+
+    def bits(self, mark: str) -> int:
+        return self.x if mark == "X" else self.o
+
+    def empty(self) -> int:
+        return self.table.full & ~(self.x | self.o)
+
+    def is_full(self) -> bool:
+        return (self.x | self.o) == self.table.full
+
+    def play(self, r: int, c: int, mark: str) -> None:
+        bit = 1 << (r * self.n + c)
+        if mark == "X":
+            self.x |= bit
+        else:
+            self.o |= bit
+
+    def _winning_line(self) -> Optional[Tuple[str, int]]:
+        x, o = self.x, self.o
+        for i, m in enumerate(self.table.masks):
+            if x & m == m:
+                return "X", i
+            if o & m == m:
+                return "O", i
+        return None
+
+    def winner(self) -> Optional[str]:
+        hit = self._winning_line()
+        if hit:
+            return hit[0]
+        return "draw" if self.is_full() else None
+
+    def winning_sequence(self) -> List[Dict[str, int]]:
+        """
+        Stejný kontrakt jako rules.find_winning_sequence: první linie v pořadí
+        (řádek, sloupec, směr) — to je i kanonický začátek delší souvislé řady.
+        """
+        hit = self._winning_line()
+        if not hit:
+            return []
+        r, c, dr, dc = self.table.starts[hit[1]]
+        return [{"row": r + dr * i, "col": c + dc * i} for i in range(self.k)]
+
+    def immediate_wins(self, mark: str) -> int:
+        """Bitset prázdných polí, kterými `mark` jedním tahem dokončí linii."""
+        mine = self.x if mark == "X" else self.o
+        other = self.o if mark == "X" else self.x
+        k1 = self.k - 1
+        wins = 0
+        for m in self.table.masks:
+            if other & m:
+                continue
+            if (mine & m).bit_count() == k1:
+                wins |= m & ~mine
+        return wins
+
+
+_EMPTY = ord(".")
+
+
+def _inc(d: Dict[int, int], i: int) -> None:
+    d[i] = d.get(i, 0) + 1
+
+
+def _dec(d: Dict[int, int], i: int) -> None:
+    v = d[i] - 1
+    if v:
+        d[i] = v
+    else:
+        del d[i]
+
+
+class ThreatIndex:
+    """
+    Index hrozeb jedné partie: pro každé okno délky k (linie z line_table)
+    počet kamenů X a O a pro oba hráče pole, kterými hned vyhraje
+    (okno s k-1 vlastními kameny bez soupeře → jeho jediné volné pole),
+    s počtem takových oken. play() upraví jen okna přes položené pole
+    (≤ 4k), dotazy „vyhraj / zablokuj hned“ jsou lookup v množině.
+
+    `cells` je zrcadlo desky ve stejném kódování jako PackedBoard.cells,
+    takže shodu indexu s deskou hry ověří jedno porovnání bytů.
+    """
+
+    __slots__ = ("n", "k", "table", "x", "o", "cells", "_cnt", "_wins")
+
+    def __init__(self, n: int, k: int):
+        self.n = n
+        self.k = k
+        self.table = line_table(n, k)
+        self.x = 0
+        self.o = 0
+        self.cells = bytearray([_EMPTY]) * (n * n)
+        w = len(self.table.masks)
+        self._cnt = (bytearray(w), bytearray(w))          # kameny X / O v okně
+        self._wins: Tuple[Dict[int, int], Dict[int, int]] = ({}, {})  # pole → počet oken
+
+    @classmethod
+    def from_board(cls, board: Sequence[Sequence[str]], k: int) -> "ThreatIndex":
+        ti = cls(len(board), k)
+        for r, row in enumerate(board):
+            for c, v in enumerate(row):
+                if v == "X" or v == "O":
+                    ti.play(r, c, v)
+        return ti
+
+    def copy(self) -> "ThreatIndex":
+        ti = ThreatIndex.__new__(ThreatIndex)
+        ti.n, ti.k, ti.table, ti.x, ti.o = self.n, self.k, self.table, self.x, self.o
+        ti.cells = bytearray(self.cells)
+        ti._cnt = (bytearray(self._cnt[0]), bytearray(self._cnt[1]))
+        ti._wins = (dict(self._wins[0]), dict(self._wins[1]))
+        return ti
+
+    def play(self, r: int, c: int, mark: str) -> None:
+        i = r * self.n + c
+        if self.cells[i] != _EMPTY:
+            raise ValueError("cell already occupied")
+        self.cells[i] = ord(mark)
+        side = 0 if mark == "X" else 1
+        if side:
+            self.o |= 1 << i
+        else:
+            self.x |= 1 << i
+        k1 = self.k - 1
+        mine, opp = self._cnt[side], self._cnt[side ^ 1]
+        my_wins, opp_wins = self._wins[side], self._wins[side ^ 1]
+        masks = self.table.masks
+        for w in self.table.lines_at[i]:
+            m, o = mine[w], opp[w]
+            # horké okno má jediné volné pole – právě i → hrozba zaniká
+            if o == k1 and m == 0:
+                _dec(opp_wins, i)
+            elif m == k1 and o == 0:
+                _dec(my_wins, i)
+            m += 1
+            mine[w] = m
+            if m == k1 and o == 0:
+                hole = masks[w] & ~(self.x | self.o)
+                _inc(my_wins, hole.bit_length() - 1)
+
+    # ───────────────────────── dotazy ─────────────────────────
+
+    def wins(self, mark: str):
+        """Indexy polí (r * n + c), kterými `mark` jedním tahem vyhraje."""
+        return self._wins[0 if mark == "X" else 1].keys()
+
+    def wins_bits(self, mark: str) -> int:
+        """Totéž jako BitBoard.immediate_wins(mark)."""
+        bits = 0
+        for i in self._wins[0 if mark == "X" else 1]:
+            bits |= 1 << i
+        return bits
+
+    def first_win(self, mark: str) -> Optional[Tuple[int, int]]:
+        """První výherní pole v row-major pořadí (jako first_cell(immediate_wins))."""
+        d = self._wins[0 if mark == "X" else 1]
+        return divmod(min(d), self.n) if d else None
+
+    def wins_after(self, r: int, c: int, mark: str) -> set:
+        """Výherní pole `mark` po jeho tahu na (r, c) – bez změny indexu, O(k)."""
+        i = r * self.n + c
+        side = 0 if mark == "X" else 1
+        out = set(self._wins[side])
+        out.discard(i)
+        mine, opp = self._cnt[side], self._cnt[side ^ 1]
+        k2 = self.k - 2
+        occupied = self.x | self.o | (1 << i)
+        masks = self.table.masks
+        for w in self.table.lines_at[i]:
+            if opp[w] == 0 and mine[w] == k2:
+                out.add((masks[w] & ~occupied).bit_length() - 1)
+        return out
@@ -0,0 +1,109 @@
+"""
+Kompaktní serializace Game pro sdílené úložiště (Redis a spol.).
+
+- verzovaný prefix b"G1" + JSON bez mezer s krátkými klíči
+- deska jako jeden řetězec n² znaků, historie jako indexy polí + řetězec značek
+- snapshoty se neukládají – jsou jednoznačně dané historií a Game si při
+  dekódování Timeline napojí na historii (ply 0 = prázdná deska)
+
+Typická hra 3×3 má ~200 B místo několika kB pickle/JSON s kopiemi desek.
+"""
+from __future__ import annotations
+import json
+from typing import Any, Dict, Optional
+
+from .models.game import Game
+from .models.board import PackedBoard
+from .models.move import MoveLog
+from .models.player import Player
+
+_MAGIC = b"G1"
+
+
+class CodecError(ValueError):
+    pass
+
+
+def encode_game(g: Game, *, version: Optional[int] = None) -> bytes:
+    """`version` přepíše g.version v zakódovaném záznamu (CAS v RedisStore)."""
+    n = g.size
+    payload: Dict[str, Any] = {
+        "i": g.id,
+        "n": n,
+        "k": g.k_to_win,
+        "b": g.board.to_string(),
+        "p": g.player,
+        "s": g.status,
+        "w": g.winner,
+        "h": [g.history.cell(i) for i in range(len(g.history))],
+        "hm": "".join(g.history.mark(i) for i in range(len(g.history))),
+        "m": g.mode,
+        "sm": g.start_mark,
+        "hu": g.human_mark,
+        "pl": {
+            mark: [p.id, p.nickname, p.kind]
+            for mark, p in (g.players or {}).items()
+        },
+        "tt": g.turn_timer_s,
+        "ca": g.created_at,
+        "ea": g.ended_at,
+        "hn": g.hints_used,
+        "d": g.difficulty,
+        "ap": 1 if g.ai_pending else 0,
+        "v": g.version if version is None else int(version),
+    }
+    if g._last_ai:
+        payload["la"] = g._last_ai  # meta posledního tahu AI (polling po async tahu)
+    return _MAGIC + json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def decode_game(blob: bytes) -> Game:
+    if not blob.startswith(_MAGIC):
+        raise CodecError("unknown game encoding")
+    try:
+        d = json.loads(blob[len(_MAGIC):].decode("utf-8"))
+    except ValueError as e:
+        raise CodecError(str(e)) from e
+
+    n = int(d["n"])
+    board = PackedBoard.from_string(n, d["b"])
+    history = MoveLog(n)
+    for idx, mark in zip(d["h"], d["hm"]):
+        history.record(idx // n, idx % n, mark)
+    players = {
+        mark: Player(id=pid, nickname=nick, kind=kind)
+        for mark, (pid, nick, kind) in (d.get("pl") or {}).items()
+    }
+    g = Game(
+        id=d["i"],
+        size=n,
+        k_to_win=int(d["k"]),
+        board=board,
+        player=d["p"],
+        status=d["s"],
+        winner=d.get("w"),
+        history=history,
+        mode=d.get("m", "pve"),
+        start_mark=d.get("sm", "X"),
+        human_mark=d.get("hu"),
+        players=players,
+        turn_timer_s=d.get("tt"),
+        created_at=float(d.get("ca") or 0.0),
+        ended_at=d.get("ea"),
+        hints_used=int(d.get("hn") or 0),
+        difficulty=d.get("d", "easy"),
+        ai_pending=bool(d.get("ap")),
+        version=int(d.get("v") or 0),
+    )
+    g._last_ai = d.get("la")
+    return g
+
+
+def peek_version(blob: bytes) -> int:
+    """Verze uložené hry bez rekonstrukce celého Game (jen JSON parse)."""
+    if not blob.startswith(_MAGIC):
+        raise CodecError("unknown game encoding")
+    try:
+        return int(json.loads(blob[len(_MAGIC):].decode("utf-8")).get("v") or 0)
+    except ValueError as e:
+        raise CodecError(str(e)) from e
@@ -8,9 +8,87 @@ K_MIN = 3
 K_MAX = int(os.getenv("TTT_K_MAX", "5"))
 
 
+# Úložiště her: memory:// (procesní, default) nebo redis://[:heslo@]host:port/db
+# (sdílené mezi gunicorn workery / hosty); TTL hry v sekundách
+STORE_URL = os.getenv("TTT_STORE_URL", "memory://")
+STORE_TTL_SEC = int(os.getenv("TTT_STORE_TTL", str(2 * 60 * 60)))
+# Počet shardů in-memory store a tabulky zámků her (hry v různých shardech nesoupeří o zámek)
+STORE_SHARDS = max(1, int(os.getenv("TTT_STORE_SHARDS", "16")))
+
 # Timeout pro /best-move (v ms)
 TIMEOUT_MS = int(os.getenv("CONNECTK_TIMEOUT_MS", "4000"))
 
+# /best-move/batch: max. počet pozic v jednom požadavku a výchozí společný časový rozpočet (ms)
+BATCH_MAX_POSITIONS = int(os.getenv("CONNECTK_BATCH_MAX", "64"))
+BATCH_BUDGET_MS = int(os.getenv("CONNECTK_BATCH_BUDGET_MS", str(TIMEOUT_MS)))
+
+# Asynchronní tah AI po /play: výchozí režim (požadavek ho může přepnout polem "async"),
+# počet vláken poolu a max. počet rozpracovaných her (nad limit se táhne synchronně)
+AI_ASYNC = os.getenv("TTT_AI_ASYNC", "0").strip().lower() in ("1", "true", "yes", "on")
+AI_WORKERS = int(os.getenv("TTT_AI_WORKERS", "4"))
+AI_QUEUE_MAX = int(os.getenv("TTT_AI_QUEUE_MAX", "256"))
+
+# Pondering: po tahu AI se na pozadí předpočítají tahy AI pro nejpravděpodobnější
+# odpovědi člověka (rozpočet ms na jedno přemýšlení, počet odpovědí, max. her najednou)
+PONDER = os.getenv("TTT_PONDER", "0").strip().lower() in ("1", "true", "yes", "on")
+PONDER_BUDGET_MS = int(os.getenv("TTT_PONDER_BUDGET_MS", "2000"))
+PONDER_REPLIES = int(os.getenv("TTT_PONDER_REPLIES", "3"))
+PONDER_MAX_GAMES = int(os.getenv("TTT_PONDER_MAX_GAMES", "8"))
+
+# MCTS: explorační konstanta UCT
+UCT_C = float(os.getenv("CONNECTK_UCT_C", "1.4"))
+
+# Dávkové (NumPy) playouty v listech MCTS: velikost dávky (0/1 = vypnuto)
+# a nejmenší deska, od které se použijí – na malých deskách převáží režie.
+PLAYOUT_BATCH = int(os.getenv("CONNECTK_PLAYOUT_BATCH", "0"))
+PLAYOUT_BATCH_MIN_SIZE = int(os.getenv("CONNECTK_PLAYOUT_BATCH_MIN_SIZE", "7"))
+
+# Root-parallel MCTS: počet procesů (0 = podle CPU, 1 = vypnuto) a obtížnosti, které ho používají
+ENGINE_WORKERS = int(os.getenv("CONNECTK_WORKERS", "0"))
+PARALLEL_DIFFICULTIES = frozenset(
+    d.strip().lower() for d in os.getenv("CONNECTK_PARALLEL_DIFFICULTIES", "hard").split(",") if d.strip()
+)
+
+# Přesný alpha-beta solver: použije se v režimu "auto" pro pozice s nejvýš
+# SOLVER_MAX_EMPTY volnými poli (3×3, 4×4, koncovky) u vyjmenovaných obtížností
+SOLVER_MAX_EMPTY = int(os.getenv("CONNECTK_SOLVER_MAX_EMPTY", "16"))
+SOLVER_DIFFICULTIES = frozenset(
+    d.strip().lower() for d in os.getenv("CONNECTK_SOLVER_DIFFICULTIES", "medium,hard").split(",") if d.strip()
+)
+
+# Threat-space search (VCF/VCT): limit uzlů, hloubka VCT (počet „trojek“)
+# a obtížnosti, u kterých běží jako předprůchod v _pick_ai_move_safe
+THREAT_NODE_BUDGET = int(os.getenv("CONNECTK_THREAT_NODES", "20000"))
+THREAT_VCT_DEPTH = int(os.getenv("CONNECTK_THREAT_VCT_DEPTH", "1"))
+THREAT_DIFFICULTIES = frozenset(
+    d.strip().lower() for d in os.getenv("CONNECTK_THREAT_DIFFICULTIES", "medium,hard").split(",") if d.strip()
+)
+
+# Opening book: adresář s book_{n}x{k}.bin (builder: python -m tic_tac_toe.engine.book build)
+# a největší deska, pro kterou builder knihovny staví
+BOOK_DIR = os.getenv("TTT_BOOK_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "books"))
+BOOK_MAX_SIZE = int(os.getenv("TTT_BOOK_MAX_SIZE", "6"))
+
+# Transpoziční cache best-move (počet kanonických pozic v LRU)
+TT_CAPACITY = int(os.getenv("CONNECTK_TT_SIZE", "50000"))
+
+# Cache serializovaných odpovědí /status a /state (klíč = id hry + verze)
+RESPONSE_CACHE_SIZE = int(os.getenv("TTT_RESPONSE_CACHE", "4096"))
+# Divácké hry (AI vs AI): počet workerů společného plánovače tahů
+SPECTATOR_WORKERS = int(os.getenv("TTT_SPECTATOR_WORKERS", "4"))
+# Kompaktní formát diváckých událostí (?format=delta): každý N-tý tah jde jako keyframe s celou deskou
+SPECTATOR_KEYFRAME_EVERY = max(1, int(os.getenv("TTT_SPECTATOR_KEYFRAME", "16")))
+# SSE log událostí: kolik posledních událostí hry drží ring buffer (pro Last-Event-ID)
+# a kolik logů her zůstává v paměti (LRU)
+EVENT_LOG_SIZE = int(os.getenv("TTT_EVENT_LOG_SIZE", "256"))
+EVENT_LOG_GAMES = int(os.getenv("TTT_EVENT_LOG_GAMES", "2048"))
+# Asynchronní SSE server diváků (asgi.py) uvnitř procesu aplikace: port (0 = vypnuto) a adresa
+SSE_ASYNC_PORT = int(os.getenv("TTT_SSE_ASYNC_PORT", "0"))
+SSE_ASYNC_HOST = os.getenv("TTT_SSE_ASYNC_HOST", "127.0.0.1")
+
+# Cache vysvětlení tahů (explainRich) – klíč = pozice + tah + hráč + k
+EXPLAIN_CACHE_SIZE = int(os.getenv("TTT_EXPLAIN_CACHE", "8192"))
+
 @dataclass(frozen=True)
 class DifficultyParams:
     rollouts: int
@@ -0,0 +1,18 @@
+# src/Backend/tic_tac_toe/engine/__init__.py
+from .book import BookEntry, OpeningBook, book_lookup, build_book, get_book, reset_books
+from .mcts import MCTS, SearchResult, search as mcts_search
+from .parallel import root_parallel_search, get_pool, shutdown_pool, worker_count
+from .solver import Solver, SolveResult, solve, zobrist_hash
+from .threats import ThreatResult, find_forced_win, forced_win_with
+from .transposition import (
+    BEST_MOVE_TT, TranspositionTable, canonicalize, to_canonical_move, from_canonical_move,
+)
+
+__all__ = [
+    "BookEntry", "OpeningBook", "book_lookup", "build_book", "get_book", "reset_books",
+    "MCTS", "SearchResult", "mcts_search",
+    "root_parallel_search", "get_pool", "shutdown_pool", "worker_count",
+    "Solver", "SolveResult", "solve", "zobrist_hash",
+    "ThreatResult", "find_forced_win", "forced_win_with",
+    "BEST_MOVE_TT", "TranspositionTable", "canonicalize", "to_canonical_move", "from_canonical_move",
+]
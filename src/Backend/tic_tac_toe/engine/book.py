@@ -0,0 +1,269 @@
+"""
+Předpočítaná knihovna zahájení (opening book) per (size, k).
+
+- builder prochází všechny kanonické pozice do N půltahů od prázdné desky
+  pro oba začínající (startMark X i O – AI může hrát za kteroukoli stranu)
+  a každou analyzuje:
+  přesným solverem, pokud je dost malá, jinak MCTS s rozpočtem hard
+- soubor `book_{n}x{k}.bin` = hlavička + seřazené záznamy pevné délky,
+  klíč = 64bit blake2b hash kanonické pozice + hráče na tahu
+  (viz transposition.canonicalize); stejné kameny s jiným hráčem na tahu
+  jsou jiná pozice
+- za běhu se soubor jen namapuje (mmap) a hledá se binárním půlením –
+  žádné načítání do paměti, dotaz trvá mikrosekundy
+
+CLI:
+    python -m tic_tac_toe.engine.book build --plies 4 [--sizes 3,4,5,6] [--out DIR]
+    python -m tic_tac_toe.engine.book info [--out DIR]
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..bitboard import BitBoard
+from ..config import BOOK_DIR, BOOK_MAX_SIZE, K_MAX, K_MIN, SIZE_MIN, SOLVER_MAX_EMPTY, UCT_C, difficulty_params
+from .mcts import search as mcts_search
+from .solver import solve
+from .transposition import canonicalize, from_canonical_move
+
+_MAGIC = b"TTTB"
+_VERSION = 2                            # v2: klíč obsahuje hráče na tahu
+_HEADER = struct.Struct("<4sBBBBI")     # magic, verze, n, k, plies, počet záznamů
+_RECORD = struct.Struct("<QBbbB")       # klíč, kanonický tah, výsledek, skóre ×100, vzdálenost
+
+# výsledek v záznamu
+_RESULTS = {"win": 1, "draw": 0, "loss": -1, "unknown": 2}
+_RESULT_NAMES = {v: k for k, v in _RESULTS.items()}
+_NO_DISTANCE = 255
+
+
+@dataclass(frozen=True)
+class BookEntry:
+    move: Tuple[int, int]
+    result: str                 # "win" | "draw" | "loss" | "unknown" (MCTS odhad)
+    score: float                # -1..1 pro hráče na tahu
+    distance: Optional[int]
+
+
+def position_key(n: int, k: int, cx: int, co: int, player: str) -> int:
+    """64bit klíč kanonické pozice s hráčem na tahu (stabilní mezi procesy i verzemi Pythonu)."""
+    nbytes = (n * n + 7) // 8
+    h = hashlib.blake2b(digest_size=8, person=b"ttt-book")
+    h.update(bytes((n, k)))
+    h.update(player.encode("ascii"))
+    h.update(cx.to_bytes(nbytes, "little"))
+    h.update(co.to_bytes(nbytes, "little"))
+    return int.from_bytes(h.digest(), "little")
+
+
+def book_path(n: int, k: int, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or BOOK_DIR, f"book_{n}x{k}.bin")
+
+
+# ───────────────────────── čtení (mmap) ─────────────────────────
+
+class OpeningBook:
+    """Read-only pohled na jeden soubor knihovny; záznamy hledá binárním půlením."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.n, self.k, self.plies, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: not an opening book (v{_VERSION})")
+        if len(self._mm) < _HEADER.size + self.count * _RECORD.size:
+            self._mm.close()
+            raise ValueError(f"{path}: truncated opening book")
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _key_at(self, i: int) -> int:
+        return struct.unpack_from("<Q", self._mm, _HEADER.size + i * _RECORD.size)[0]
+
+    def lookup(self, bb: BitBoard, player: str) -> Optional[BookEntry]:
+        """Záznam pro pozici `bb` s hráčem `player` na tahu, nebo None."""
+        if bb.n != self.n or bb.k != self.k:
+            return None
+        cx, co, t = canonicalize(bb)
+        key = position_key(bb.n, bb.k, cx, co, player)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo >= self.count or self._key_at(lo) != key:
+            return None
+        _, cmove, result, score, dist = _RECORD.unpack_from(self._mm, _HEADER.size + lo * _RECORD.size)
+        r, c = from_canonical_move(bb.n, t, cmove)
+        if (bb.x | bb.o) >> (r * bb.n + c) & 1:
+            # kolize hashe – raději žádná odpověď než nelegální tah
+            return None
+        return BookEntry(
+            move=(r, c),
+            result=_RESULT_NAMES.get(result, "unknown"),
+            score=score / 100.0,
+            distance=None if dist == _NO_DISTANCE else dist,
+        )
+
+
+_BOOKS: Dict[Tuple[int, int], Optional[OpeningBook]] = {}
+_BOOKS_LOCK = threading.Lock()
+_book_dir = BOOK_DIR
+
+
+def get_book(n: int, k: int) -> Optional[OpeningBook]:
+    """Knihovna pro (n, k) – otevře se líně při prvním dotazu; None, pokud soubor není."""
+    key = (n, k)
+    book = _BOOKS.get(key, False)
+    if book is not False:
+        return book  # type: ignore[return-value]
+    with _BOOKS_LOCK:
+        if key not in _BOOKS:
+            path = book_path(n, k, _book_dir)
+            try:
+                _BOOKS[key] = OpeningBook(path) if os.path.exists(path) else None
+            except (OSError, ValueError):
+                _BOOKS[key] = None
+        return _BOOKS[key]
+
+
+def reset_books(directory: Optional[str] = None) -> None:
+    """Zavře otevřené knihovny (a volitelně přepne adresář) – další dotaz je otevře znovu."""
+    global _book_dir
+    with _BOOKS_LOCK:
+        for book in _BOOKS.values():
+            if book is not None:
+                book.close()
+        _BOOKS.clear()
+        _book_dir = directory or BOOK_DIR
+
+
+def book_lookup(bb: BitBoard, player: str) -> Optional[BookEntry]:
+    book = get_book(bb.n, bb.k)
+    return book.lookup(bb, player) if book is not None else None
+
+
+# ───────────────────────── stavba ─────────────────────────
+
+def _analyse(bb: BitBoard, player: str, seed: int) -> Tuple[int, int, int, int]:
+    """(tah, výsledek, skóre×100, vzdálenost) – solver, pokud je pozice dost malá, jinak MCTS."""
+    if bb.empty().bit_count() <= SOLVER_MAX_EMPTY:
+        sr = solve(bb, player)
+        if sr.move is not None and sr.exact:
+            score = {"win": 100, "loss": -100}.get(sr.result, 0)
+            dist = sr.distance if sr.distance is not None else _NO_DISTANCE
+            return sr.move[0] * bb.n + sr.move[1], _RESULTS[sr.result], score, min(dist, 254)
+    res = mcts_search(bb, player, rollouts=difficulty_params("hard").rollouts,
+                      rng=random.Random(seed), c=UCT_C)
+    assert res.move is not None
+    return res.move[0] * bb.n + res.move[1], _RESULTS["unknown"], int(round(res.score * 100)), _NO_DISTANCE
+
+
+def _positions(n: int, k: int, plies: int) -> Iterator[Tuple[int, int, str]]:
+    """
+    Kanonické nekoncové pozice s méně než `plies` kameny (obě strany hrají vše)
+    pro oba začínající hráče – (x, o, hráč na tahu).
+    """
+    for starter in ("X", "O"):
+        other = "O" if starter == "X" else "X"
+        layer = {(0, 0)}
+        for ply in range(plies):
+            player = starter if ply % 2 == 0 else other
+            nxt = set()
+            for x, o in sorted(layer):
+                yield x, o, player
+                if ply + 1 >= plies:
+                    continue
+                bb = BitBoard(n, k, x, o)
+                free = bb.empty()
+                while free:
+                    low = free & -free
+                    free ^= low
+                    child = bb.copy()
+                    i = low.bit_length() - 1
+                    child.play(i // n, i % n, player)
+                    if child.winner() is not None or not child.empty():
+                        continue
+                    cx, co, _ = canonicalize(child)
+                    nxt.add((cx, co))
+            layer = nxt
+
+
+def build_book(n: int, k: int, plies: int, directory: Optional[str] = None, *, log=None) -> str:
+    """Spočítej knihovnu pro (n, k) a atomicky ji zapiš; vrací cestu k souboru."""
+    records: List[Tuple[int, int, int, int, int]] = []
+    t0 = time.perf_counter()
+    for x, o, player in _positions(n, k, plies):
+        key = position_key(n, k, x, o, player)
+        move, result, score, dist = _analyse(BitBoard(n, k, x, o), player, key)
+        records.append((key, move, result, score, dist))
+    records.sort()
+
+    path = book_path(n, k, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, n, k, plies, len(records)))
+        for rec in records:
+            f.write(_RECORD.pack(*rec))
+    os.replace(tmp, path)
+    if log:
+        log(f"book {n}x{n} k={k}: {len(records)} positions, plies={plies}, {time.perf_counter() - t0:.1f}s -> {path}")
+    return path
+
+
+def _supported(sizes: Optional[List[int]]) -> Iterator[Tuple[int, int]]:
+    for n in sizes or range(SIZE_MIN, BOOK_MAX_SIZE + 1):
+        for k in range(K_MIN, min(n, K_MAX) + 1):
+            yield n, k
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m tic_tac_toe.engine.book", description="Opening book builder")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="build books for supported (size, k)")
+    b.add_argument("--plies", type=int, default=4)
+    b.add_argument("--sizes", type=str, default="", help="comma separated board sizes (default: all up to TTT_BOOK_MAX_SIZE)")
+    b.add_argument("--out", type=str, default=None)
+    i = sub.add_parser("info", help="list books in a directory")
+    i.add_argument("--out", type=str, default=None)
+    args = ap.parse_args(argv)
+
+    def log(msg: str) -> None:
+        print(msg, file=sys.stderr, flush=True)
+
+    if args.cmd == "build":
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()] or None
+        for n, k in _supported(sizes):
+            build_book(n, k, args.plies, args.out, log=log)
+        return 0
+
+    directory = args.out or BOOK_DIR
+    for n, k in _supported(None):
+        path = book_path(n, k, directory)
+        if os.path.exists(path):
+            book = OpeningBook(path)
+            log(f"{os.path.basename(path)}: {len(book)} positions, plies={book.plies}")
+            book.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,250 @@
+"""
+Monte-Carlo tree search (UCT) nad bitboardem pro Connect-K.
+
+- stav = (x, o, kdo je na tahu) jako inty, linie z bitboard.line_table
+- výběr UCT, expanze po jednom tahu, náhodný playout, backprop
+- rozpočet: počet iterací stromu + wall-clock deadline (kontrola po dávkách)
+- volitelně dávkové playouty v listu (playout_batch > 1): jeden list se
+  ohodnotí celou dávkou vektorizovaných doher (engine/playout_np.py); rozpočet
+  se i tak počítá v iteracích → strom je stejně velký, playouty (rollouts)
+  se hlásí zvlášť
+"""
+from __future__ import annotations
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..bitboard import BitBoard, LineTable, line_table
+from .playout_np import batch_playouts
+
+# Jak často (v iteracích) kontrolovat hodiny – time.perf_counter není zadarmo.
+_CLOCK_EVERY = 16
+
+X, O = 0, 1
+
+
+def _mark_to_side(mark: str) -> int:
+    return X if mark == "X" else O
+
+
+class Node:
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "side", "terminal")
+
+    def __init__(self, move: int, parent: Optional["Node"], side: int, untried: List[int], terminal: Optional[int]):
+        self.move = move            # index pole (r * n + c), -1 pro kořen
+        self.parent = parent
+        self.children: List[Node] = []
+        self.untried = untried      # ještě neexpandované tahy
+        self.visits = 0
+        self.wins = 0.0             # z pohledu hráče `side`, který táhl `move`
+        self.side = side
+        self.terminal = terminal    # None = běží, X/O = výhra, -1 = remíza
+
+
+@dataclass
+class SearchResult:
+    move: Optional[Tuple[int, int]]
+    score: float                      # -1..1 z pohledu hráče na tahu
+    rollouts: int                     # odehrané playouty (s dávkami až iterations × dávka)
+    nodes: int
+    elapsed_s: float
+    timed_out: bool
+    visits: Dict[int, Tuple[int, float]] = field(default_factory=dict)   # idx -> (visits, wins)
+    iterations: int = 0               # iterace stromu (select/expand/backprop) – proti rozpočtu
+
+
+def _empties(table: LineTable, x: int, o: int) -> List[int]:
+    free = table.full & ~(x | o)
+    out: List[int] = []
+    while free:
+        low = free & -free
+        out.append(low.bit_length() - 1)
+        free ^= low
+    return out
+
+
+def playout(table: LineTable, x: int, o: int, side: int, empties: List[int], rng: random.Random) -> int:
+    """Náhodná dohra. Vrací X/O (vítěz) nebo -1 (remíza)."""
+    by_cell = table.by_cell
+    bits = [x, o]
+    for idx in rng.sample(empties, len(empties)):
+        b = bits[side] | (1 << idx)
+        bits[side] = b
+        for m in by_cell[idx]:
+            if b & m == m:
+                return side
+        side ^= 1
+    return -1
+
+
+class MCTS:
+    def __init__(
+        self,
+        bb: BitBoard,
+        player: str,
+        *,
+        rng: Optional[random.Random] = None,
+        c: float = 1.4,
+        playout_batch: int = 0,
+    ):
+        self.n = bb.n
+        self.k = bb.k
+        self.table = line_table(bb.n, bb.k)
+        self.x0, self.o0 = bb.x, bb.o
+        self.side0 = _mark_to_side(player)
+        self.rng = rng or random.Random()
+        self.c = c
+        self.playout_batch = playout_batch if playout_batch > 1 else 0
+        self.np_rng = np.random.default_rng(self.rng.getrandbits(64)) if self.playout_batch else None
+        # kořen „táhl“ soupeř – wins kořene se nepoužívají
+        self.root = Node(-1, None, self.side0 ^ 1, _empties(self.table, bb.x, bb.o), None)
+        self.rollouts = 0
+        self.iterations = 0
+        self.nodes = 1
+
+    # ───────────────────────── jedna iterace ─────────────────────────
+
+    def _select_child(self, node: Node) -> Node:
+        log_n = math.log(node.visits)
+        c = self.c
+        best = None
+        best_val = -1.0
+        for ch in node.children:
+            val = ch.wins / ch.visits + c * math.sqrt(log_n / ch.visits)
+            if val > best_val:
+                best_val = val
+                best = ch
+        return best  # type: ignore[return-value]
+
+    def _iterate(self) -> None:
+        table = self.table
+        by_cell = table.by_cell
+        node = self.root
+        bits = [self.x0, self.o0]
+        self.iterations += 1
+
+        # 1) selection
+        while not node.untried and node.children and node.terminal is None:
+            node = self._select_child(node)
+            bits[node.side] |= 1 << node.move
+
+        # 2) expansion
+        if node.terminal is None and node.untried:
+            untried = node.untried
+            i = self.rng.randrange(len(untried))
+            untried[i], untried[-1] = untried[-1], untried[i]
+            move = untried.pop()
+            side = node.side ^ 1
+            b = bits[side] | (1 << move)
+            bits[side] = b
+            terminal: Optional[int] = None
+            for m in by_cell[move]:
+                if b & m == m:
+                    terminal = side
+                    break
+            free = _empties(table, bits[X], bits[O])
+            if terminal is None and not free:
+                terminal = -1
+            child = Node(move, node, side, [] if terminal is not None else free, terminal)
+            node.children.append(child)
+            self.nodes += 1
+            node = child
+
+        # 3) simulation
+        if node.terminal is None and self.playout_batch:
+            self._simulate_batch(node, bits)
+            return
+        if node.terminal is not None:
+            result = node.terminal
+        else:
+            result = playout(table, bits[X], bits[O], node.side ^ 1, node.untried, self.rng)
+        # jistý výsledek koncového uzlu váží v dávkovém režimu jako celá dávka
+        w = self.playout_batch or 1
+        self.rollouts += w
+
+        # 4) backpropagation
+        while node is not None:
+            node.visits += w
+            if result == node.side:
+                node.wins += w
+            elif result == -1:
+                node.wins += 0.5 * w
+            node = node.parent  # type: ignore[assignment]
+
+    def _simulate_batch(self, node: Node, bits: List[int]) -> None:
+        """Ohodnoť list dávkou doher a propaguj součty (visits += dávka)."""
+        res = batch_playouts(self.n, self.k, bits[X], bits[O], node.side ^ 1, node.untried,
+                             self.playout_batch, self.np_rng)  # type: ignore[arg-type]
+        b = len(res)
+        won = (int(np.count_nonzero(res == X)), int(np.count_nonzero(res == O)))
+        draws = b - won[X] - won[O]
+        self.rollouts += b
+        while node is not None:
+            node.visits += b
+            node.wins += won[node.side] + 0.5 * draws
+            node = node.parent  # type: ignore[assignment]
+
+    # ───────────────────────── rozpočet ─────────────────────────
+
+    def run(self, iterations: int, deadline: Optional[float] = None) -> bool:
+        """
+        Proveď až `iterations` iterací stromu (bez dávek = playoutů); vrací True,
+        pokud vypršel deadline dřív. Lze volat opakovaně (anytime) – strom se zachovává.
+        """
+        if not self.root.untried and not self.root.children:
+            return False
+        # s dávkovými playouty je jedna iterace drahá → hodiny po každé
+        every = 1 if self.playout_batch else _CLOCK_EVERY
+        target = self.iterations + iterations
+        while self.iterations < target:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return True
+            for _ in range(every):
+                self._iterate()
+                if self.iterations >= target:
+                    break
+        return False
+
+    # ───────────────────────── výsledek ─────────────────────────
+
+    def best(self) -> Tuple[Optional[Tuple[int, int]], float]:
+        """Nejnavštěvovanější tah kořene + skóre -1..1 pro hráče na tahu."""
+        kids = self.root.children
+        if not kids:
+            return None, 0.0
+        ch = max(kids, key=lambda n: (n.visits, n.wins))
+        q = ch.wins / ch.visits if ch.visits else 0.5
+        return divmod(ch.move, self.n), 2.0 * q - 1.0
+
+    def root_visits(self) -> Dict[int, Tuple[int, float]]:
+        return {ch.move: (ch.visits, ch.wins) for ch in self.root.children}
+
+
+def search(
+    bb: BitBoard,
+    player: str,
+    *,
+    rollouts: int,
+    deadline: Optional[float] = None,
+    rng: Optional[random.Random] = None,
+    c: float = 1.4,
+    playout_batch: int = 0,
+) -> SearchResult:
+    t0 = time.perf_counter()
+    tree = MCTS(bb, player, rng=rng, c=c, playout_batch=playout_batch)
+    timed_out = tree.run(max(1, int(rollouts)), deadline)
+    move, score = tree.best()
+    return SearchResult(
+        move=move,
+        score=score,
+        rollouts=tree.rollouts,
+        nodes=tree.nodes,
+        elapsed_s=time.perf_counter() - t0,
+        timed_out=timed_out,
+        visits=tree.root_visits(),
+        iterations=tree.iterations,
+    )
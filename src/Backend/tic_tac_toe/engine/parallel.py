@@ -0,0 +1,152 @@
+"""
+Root-parallel MCTS přes ProcessPoolExecutor.
+
+Každý worker postaví vlastní strom ze stejného kořene s částí rozpočtu
+rolloutů a jiným seedem; výsledky se sloučí sečtením návštěv / výher
+dětí kořene. Obchází GIL – hard preset škáluje zhruba s počtem jader.
+
+Pool je sdílený pro proces, vzniká líně při prvním použití a hned se
+„zahřeje“ (workery naimportují engine), další volání už jen posílají práci.
+"""
+from __future__ import annotations
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from ..bitboard import BitBoard
+from ..config import ENGINE_WORKERS
+from .mcts import SearchResult, search
+
+log = logging.getLogger(__name__)
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+_IN_WORKER = False      # True v procesech poolu → žádné vnořené pooly
+
+
+def worker_count() -> int:
+    """Počet workerů z CONNECTK_WORKERS (0 = podle počtu CPU)."""
+    if ENGINE_WORKERS > 0:
+        return ENGINE_WORKERS
+    return max(1, os.cpu_count() or 1)
+
+
+def _warm() -> int:
+    return os.getpid()
+
+
+def _mark_worker() -> None:
+    global _IN_WORKER
+    _IN_WORKER = True
+
+
+def get_pool(workers: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """Sdílený pool (líně vytvořený a zahřátý); None pokud paralelismus nedává smysl."""
+    return _get_pool_sized(workers)[0]
+
+
+def _get_pool_sized(workers: Optional[int] = None) -> Tuple[Optional[ProcessPoolExecutor], int]:
+    """(pool, počet jeho workerů) – obojí přečtené pod zámkem, aby k sobě patřilo."""
+    global _POOL, _POOL_WORKERS
+    w = workers if workers is not None else worker_count()
+    if w <= 1 or _IN_WORKER:
+        return None, 0
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != w:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = ProcessPoolExecutor(max_workers=w, initializer=_mark_worker)
+            _POOL_WORKERS = w
+            # zahřátí: spusť všechny workery dřív, než přijde první hledání
+            wait([_POOL.submit(_warm) for _ in range(w)])
+        return _POOL, _POOL_WORKERS
+
+
+def shutdown_pool() -> None:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+        _POOL_WORKERS = 0
+
+
+atexit.register(shutdown_pool)
+
+
+def _worker_search(
+    n: int, k: int, x: int, o: int, player: str,
+    rollouts: int, budget_s: float, seed: int, c: float, playout_batch: int = 0,
+) -> Tuple[Dict[int, Tuple[int, float]], int, int, bool, int]:
+    """Běží ve workeru: jeden nezávislý strom, vrací jen statistiky kořene."""
+    deadline = time.perf_counter() + max(0.0, budget_s)
+    res = search(BitBoard(n, k, x, o), player, rollouts=rollouts, deadline=deadline,
+                 rng=random.Random(seed), c=c, playout_batch=playout_batch)
+    return res.visits, res.rollouts, res.nodes, res.timed_out, res.iterations
+
+
+def _merge(n: int, parts: List[Tuple[Dict[int, Tuple[int, float]], int, int, bool, int]], elapsed_s: float) -> SearchResult:
+    visits: Dict[int, Tuple[int, float]] = {}
+    rollouts = nodes = iterations = 0
+    timed_out = False
+    for v, r, nd, to, it in parts:
+        rollouts += r
+        nodes += nd
+        iterations += it
+        timed_out = timed_out or to
+        for move, (cnt, wins) in v.items():
+            pc, pw = visits.get(move, (0, 0.0))
+            visits[move] = (pc + cnt, pw + wins)
+    if not visits:
+        return SearchResult(None, 0.0, rollouts, nodes, elapsed_s, timed_out, {}, iterations)
+    move, (cnt, wins) = max(visits.items(), key=lambda kv: (kv[1][0], kv[1][1]))
+    q = wins / cnt if cnt else 0.5
+    return SearchResult(divmod(move, n), 2.0 * q - 1.0, rollouts, nodes, elapsed_s, timed_out, visits,
+                        iterations)
+
+
+def root_parallel_search(
+    bb: BitBoard,
+    player: str,
+    *,
+    rollouts: int,
+    deadline: Optional[float] = None,
+    workers: Optional[int] = None,
+    c: float = 1.4,
+    playout_batch: int = 0,
+) -> SearchResult:
+    """
+    Rozdělí rozpočet rolloutů mezi workery a sloučí návštěvy v kořeni.
+    Bez poolu (1 jádro / CONNECTK_WORKERS=1) nebo při chybě poolu spadne
+    na obyčejné jednovláknové hledání.
+    """
+    t0 = time.perf_counter()
+    # velikost bereme spolu s poolem: souběžný shutdown/resize by _POOL_WORKERS mezitím změnil
+    pool, w = _get_pool_sized(workers)
+    if pool is None:
+        return search(bb, player, rollouts=rollouts, deadline=deadline, c=c, playout_batch=playout_batch)
+
+    share, extra = divmod(max(1, int(rollouts)), w)
+    budget_s = (deadline - t0) if deadline is not None else 3600.0
+    seeds = random.SystemRandom()
+    try:
+        futs = [
+            pool.submit(_worker_search, bb.n, bb.k, bb.x, bb.o, player,
+                        share + (1 if i < extra else 0), budget_s, seeds.getrandbits(32), c, playout_batch)
+            for i in range(w)
+        ]
+        # malá rezerva na IPC nad rámec deadlinu workerů
+        done, _ = wait(futs, timeout=budget_s + 1.0)
+        parts = [f.result() for f in done]
+    except Exception:
+        log.exception("root-parallel search failed; falling back to single process")
+        shutdown_pool()
+        return search(bb, player, rollouts=rollouts, deadline=deadline, c=c, playout_batch=playout_batch)
+
+    return _merge(bb.n, parts, time.perf_counter() - t0)
@@ -0,0 +1,106 @@
+"""
+Vektorizované dávkové playouty (NumPy) pro MCTS.
+
+Místo jedné náhodné dohry v Pythonu se simuluje celá dávka her naráz:
+- každá hra = náhodná permutace volných polí (argsort náhodné matice)
+- deska (batch, n, n) int8: 0 = X, 1 = O, hodnota v čase tahu t
+- výhra = okno délky k ve 4 směrech, kde součet kamenů jednoho hráče == k;
+  kdo vyhrál dřív, rozhoduje maximum „času položení“ přes okno
+  (okno je kompletní až posledním kamenem) – minimum přes okna = první výhra
+
+Výsledek je pole (batch,) s hodnotami X / O / -1 (remíza), stejné jako
+mcts.playout, jen pro mnoho her najednou.
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+from ..bitboard import DIRECTIONS
+
+X, O = 0, 1
+
+# „nikdy“ – větší než libovolný čas tahu (max n² ≤ 32767)
+_NEVER = np.int16(np.iinfo(np.int16).max)
+
+
+@lru_cache(maxsize=None)
+def _windows(n: int, k: int) -> Tuple[np.ndarray, ...]:
+    """Pro každý ze 4 směrů pole (W, k) indexů polí všech oken délky k."""
+    out: List[np.ndarray] = []
+    for dr, dc in DIRECTIONS:
+        cells = []
+        for r in range(n):
+            for c in range(n):
+                er, ec = r + dr * (k - 1), c + dc * (k - 1)
+                if 0 <= er < n and 0 <= ec < n:
+                    cells.append([(r + dr * i) * n + (c + dc * i) for i in range(k)])
+        out.append(np.asarray(cells, dtype=np.intp).reshape(-1, k))
+    return tuple(out)
+
+
+def _bits_to_cells(bits: int) -> List[int]:
+    out = []
+    while bits:
+        low = bits & -bits
+        out.append(low.bit_length() - 1)
+        bits ^= low
+    return out
+
+
+def batch_playouts(
+    n: int,
+    k: int,
+    x: int,
+    o: int,
+    side: int,
+    empties: List[int],
+    batch: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    `batch` náhodných doher z pozice (x, o), na tahu `side`.
+    Vrací int8 pole výsledků: X / O = vítěz, -1 = remíza.
+    """
+    cells = n * n
+    e = len(empties)
+    result = np.full(batch, -1, dtype=np.int8)
+    if e == 0 or batch <= 0:
+        return result
+
+    # čas položení a vlastník každého pole; obsazená pole mají čas 0 (byla tam dřív)
+    owner = np.full((batch, cells), -1, dtype=np.int8)
+    when = np.zeros((batch, cells), dtype=np.int16)
+    owner[:, _bits_to_cells(x)] = X
+    owner[:, _bits_to_cells(o)] = O
+
+    # náhodné pořadí volných polí pro každou hru: order[b, t] = t-tý tah
+    order = np.argsort(rng.random((batch, e)), axis=1)
+    empties_arr = np.asarray(empties, dtype=np.intp)
+    moves = empties_arr[order]                                         # (batch, e)
+    t = np.arange(1, e + 1, dtype=np.int16)
+    movers = np.where(np.arange(e) % 2 == 0, side, side ^ 1).astype(np.int8)
+    rows = np.arange(batch)[:, None]
+    owner[rows, moves] = movers[None, :]
+    when[rows, moves] = t[None, :]
+
+    first = np.full(batch, _NEVER, dtype=np.int16)
+    first_owner = np.full(batch, -1, dtype=np.int8)
+    for win in _windows(n, k):
+        if not len(win):
+            continue
+        own = owner[:, win]                                            # (batch, W, k)
+        done = when[:, win].max(axis=2)                                # čas dokončení okna
+        for mark in (X, O):
+            full = (own == mark).sum(axis=2, dtype=np.int8) == k       # okno celé jednoho hráče
+            if not full.any():
+                continue
+            done_at = np.where(full, done, _NEVER).min(axis=1)
+            better = done_at < first
+            first = np.where(better, done_at, first)
+            first_owner = np.where(better, mark, first_owner)
+
+    hit = first < _NEVER
+    result[hit] = first_owner[hit]
+    return result
@@ -0,0 +1,225 @@
+"""
+Přesný solver (negamax + alpha-beta) pro malé desky (3×3, malé 4×4).
+
+- iterativní prohlubování do počtu volných polí (poslední iterace = úplné řešení)
+- řazení tahů: tah z TT, vynucené bloky, history heuristika, blízkost středu
+- transpoziční tabulka klíčovaná Zobrist hashem (XOR po tahu)
+- hodnoty: WIN - ply (výhra), -(WIN - ply) (prohra), 0 (remíza / neznámo)
+
+Výsledek je herně-teoretická hodnota z pohledu hráče na tahu (win/draw/loss)
++ vzdálenost v půltazích, nebo "unknown", pokud nestihl dokončit v limitu.
+"""
+from __future__ import annotations
+import random
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from ..bitboard import BitBoard, LineTable, line_table
+
+WIN = 1000
+_WIN_BOUND = WIN // 2
+_EXACT, _LOWER, _UPPER = 0, 1, 2
+_CLOCK_EVERY = 1024
+
+
+class _Timeout(Exception):
+    pass
+
+
+@dataclass
+class SolveResult:
+    move: Optional[Tuple[int, int]]
+    value: int
+    result: str                  # "win" | "draw" | "loss" | "unknown"
+    distance: Optional[int]      # půltahy do konce hry při optimální hře
+    depth: int                   # hloubka poslední dokončené iterace
+    exact: bool
+    nodes: int
+    elapsed_s: float
+    timed_out: bool
+
+
+@lru_cache(maxsize=None)
+def zobrist(n: int) -> Tuple[Tuple[int, ...], Tuple[int, ...], int]:
+    """Deterministické Zobrist klíče (X po polích, O po polích, strana na tahu)."""
+    rng = random.Random(0x5EED ^ n)
+    xs = tuple(rng.getrandbits(64) for _ in range(n * n))
+    os_ = tuple(rng.getrandbits(64) for _ in range(n * n))
+    return xs, os_, rng.getrandbits(64)
+
+
+def zobrist_hash(bb: BitBoard, player: str) -> int:
+    xs, os_, side = zobrist(bb.n)
+    h = 0
+    for i in range(bb.n * bb.n):
+        if bb.x >> i & 1:
+            h ^= xs[i]
+        elif bb.o >> i & 1:
+            h ^= os_[i]
+    return h ^ side if player == "O" else h
+
+
+def _immediate_wins(masks: Tuple[int, ...], mine: int, other: int, k1: int) -> int:
+    wins = 0
+    for m in masks:
+        if other & m:
+            continue
+        if (mine & m).bit_count() == k1:
+            wins |= m & ~mine
+    return wins
+
+
+def _bits(bits: int) -> List[int]:
+    out = []
+    while bits:
+        low = bits & -bits
+        out.append(low.bit_length() - 1)
+        bits ^= low
+    return out
+
+
+class Solver:
+    def __init__(self, bb: BitBoard, player: str, *, deadline: Optional[float] = None):
+        self.n = bb.n
+        self.table: LineTable = line_table(bb.n, bb.k)
+        self.k1 = bb.k - 1
+        self.x0, self.o0 = bb.x, bb.o
+        self.side0 = 0 if player == "X" else 1
+        self.deadline = deadline
+        self.tt: Dict[int, Tuple[int, int, int, int]] = {}   # hash -> (depth, flag, value, move)
+        self.history = [0] * (bb.n * bb.n)
+        self.nodes = 0
+        self.cut = False
+        c = (bb.n - 1) / 2.0
+        # statické pořadí: blíž ke středu dřív
+        self.center_rank = [
+            -(abs(i // bb.n - c) + abs(i % bb.n - c)) for i in range(bb.n * bb.n)
+        ]
+        self.zx, self.zo, self.zside = zobrist(bb.n)
+
+    # ───────────────────────── negamax ─────────────────────────
+
+    def _negamax(self, me: int, opp: int, side: int, h: int, depth: int, ply: int, alpha: int, beta: int) -> Tuple[int, int]:
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % _CLOCK_EVERY == 0 and time.perf_counter() >= self.deadline:
+            raise _Timeout()
+
+        masks = self.table.masks
+        free = self.table.full & ~(me | opp)
+        if not free:
+            return 0, -1
+
+        wins = _immediate_wins(masks, me, opp, self.k1)
+        if wins:
+            return WIN - (ply + 1), (wins & -wins).bit_length() - 1
+
+        if depth <= 0:
+            self.cut = True
+            return 0, -1
+
+        threats = _immediate_wins(masks, opp, me, self.k1)
+        if threats and threats & (threats - 1):
+            # dvě hrozby soupeře naráz – jednu zablokujeme, druhou dohraje
+            return -(WIN - (ply + 2)), (threats & -threats).bit_length() - 1
+
+        key = h ^ self.zside if side else h
+        tt_move = -1
+        entry = self.tt.get(key)
+        if entry is not None:
+            e_depth, flag, val, tt_move = entry
+            if val > _WIN_BOUND:
+                val -= ply
+            elif val < -_WIN_BOUND:
+                val += ply
+            if e_depth >= depth or abs(val) > _WIN_BOUND:
+                if flag == _EXACT:
+                    return val, tt_move
+                if flag == _LOWER and val >= beta:
+                    return val, tt_move
+                if flag == _UPPER and val <= alpha:
+                    return val, tt_move
+
+        moves = _bits(threats if threats else free)
+        hist = self.history
+        rank = self.center_rank
+        moves.sort(key=lambda i: (i != tt_move, -hist[i], -rank[i]))
+
+        alpha0 = alpha
+        best_val = -WIN - 1
+        best_move = moves[0]
+        zs = self.zo if side else self.zx
+        for mv in moves:
+            v, _ = self._negamax(opp, me | (1 << mv), side ^ 1, h ^ zs[mv], depth - 1, ply + 1, -beta, -alpha)
+            v = -v
+            if v > best_val:
+                best_val = v
+                best_move = mv
+            if v > alpha:
+                alpha = v
+            if alpha >= beta:
+                hist[mv] += depth * depth
+                break
+
+        if best_val <= alpha0:
+            flag = _UPPER
+        elif best_val >= beta:
+            flag = _LOWER
+        else:
+            flag = _EXACT
+        stored = best_val
+        if stored > _WIN_BOUND:
+            stored += ply
+        elif stored < -_WIN_BOUND:
+            stored -= ply
+        self.tt[key] = (depth, flag, stored, best_move)
+        return best_val, best_move
+
+    # ───────────────────────── iterativní prohlubování ─────────────────────────
+
+    def solve(self) -> SolveResult:
+        t0 = time.perf_counter()
+        me, opp = (self.x0, self.o0) if self.side0 == 0 else (self.o0, self.x0)
+        h = 0
+        for i in _bits(self.x0):
+            h ^= self.zx[i]
+        for i in _bits(self.o0):
+            h ^= self.zo[i]
+        empties = (self.table.full & ~(me | opp)).bit_count()
+
+        best: Optional[Tuple[int, int, int, bool]] = None   # (value, move, depth, exact)
+        timed_out = False
+        depth = min(2, empties) if empties else 0
+        while True:
+            self.cut = False
+            try:
+                val, mv = self._negamax(me, opp, self.side0, h, depth, 0, -WIN - 1, WIN + 1)
+            except _Timeout:
+                timed_out = True
+                break
+            exact = (not self.cut) or abs(val) > _WIN_BOUND
+            best = (val, mv, depth, exact)
+            if exact or depth >= empties:
+                break
+            depth = min(empties, depth + 2)
+
+        elapsed = time.perf_counter() - t0
+        if best is None:
+            return SolveResult(None, 0, "unknown", None, 0, False, self.nodes, elapsed, timed_out)
+
+        val, mv, depth, exact = best
+        if val > _WIN_BOUND:
+            result, distance = "win", WIN - val
+        elif val < -_WIN_BOUND:
+            result, distance = "loss", WIN + val
+        elif exact:
+            result, distance = "draw", empties
+        else:
+            result, distance = "unknown", None
+        move = divmod(mv, self.n) if mv >= 0 else None
+        return SolveResult(move, val, result, distance, depth, exact, self.nodes, elapsed, timed_out)
+
+
+def solve(bb: BitBoard, player: str, *, deadline: Optional[float] = None) -> SolveResult:
+    return Solver(bb, player, deadline=deadline).solve()
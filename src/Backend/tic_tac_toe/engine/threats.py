@@ -0,0 +1,221 @@
+"""
+Threat-space search pro k-v-řadě: vynucené výhry souvislými hrozbami.
+
+- „čtyřka“ = tah, po kterém má útočník okamžitou výhru (okno s k-1 kameny)
+- VCF (victory by continuous fours): útočník hraje jen čtyřky, obránce
+  musí pokaždé blokovat jediné výherní pole; končí dvojitou hrozbou
+- VCT (victory by continuous threats): útočník smí zahrát i „trojku“ –
+  tah, po kterém by měl VCF, kdyby obránce nic neudělal; obránce pak
+  zkouší všechny relevantní obrany (pole z hrozící VCF sekvence, pole
+  oken přes trojku a vlastní čtyřky). Omezená sada obran je standardní
+  předpoklad threat-space search, výsledek je tedy silná heuristika.
+
+Hledání je omezené počtem uzlů (node budget) – bez nálezu vrací None.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional, Set, Tuple
+
+from ..bitboard import BitBoard, LineTable, line_table
+from ..config import THREAT_NODE_BUDGET, THREAT_VCT_DEPTH
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class ThreatResult:
+    kind: str                          # "vcf" | "vct"
+    sequence: List[Tuple[int, int]]    # střídavě útočník / obránce, první tah útočníka
+    nodes: int
+
+    @property
+    def move(self) -> Tuple[int, int]:
+        return self.sequence[0]
+
+
+def _bits(bits: int) -> List[int]:
+    out = []
+    while bits:
+        low = bits & -bits
+        out.append(low.bit_length() - 1)
+        bits ^= low
+    return out
+
+
+class _ThreatSearch:
+    def __init__(self, table: LineTable, k: int, max_nodes: int):
+        self.table = table
+        self.k = k
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.vcf_fail: Set[Tuple[int, int]] = set()
+        c = (table.n - 1) / 2.0
+        self.rank = [abs(i // table.n - c) + abs(i % table.n - c) for i in range(table.n * table.n)]
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise _BudgetExceeded()
+
+    def _wins(self, mine: int, other: int) -> int:
+        k1 = self.k - 1
+        out = 0
+        for m in self.table.masks:
+            if not other & m and (mine & m).bit_count() == k1:
+                out |= m & ~mine
+        return out
+
+    def _moves_reaching(self, mine: int, other: int, have: int) -> int:
+        """Prázdná pole v oknech bez soupeře, kde má `mine` právě `have` kamenů."""
+        out = 0
+        for m in self.table.masks:
+            if not other & m and (mine & m).bit_count() == have:
+                out |= m & ~mine
+        return out
+
+    def _ordered(self, bits: int) -> List[int]:
+        return sorted(_bits(bits), key=lambda i: self.rank[i])
+
+    # ───────────────────────── VCF ─────────────────────────
+
+    def vcf(self, me: int, opp: int) -> Optional[List[int]]:
+        self._tick()
+        w = self._wins(me, opp)
+        if w:
+            return [(w & -w).bit_length() - 1]
+        if (me, opp) in self.vcf_fail:
+            return None
+
+        ow = self._wins(opp, me)
+        if ow & (ow - 1):
+            self.vcf_fail.add((me, opp))
+            return None
+        cands = self._moves_reaching(me, opp, self.k - 2)
+        if ow:
+            # soupeř hrozí → musíme blokovat, a to čtyřkou
+            cands &= ow
+        for c in self._ordered(cands):
+            line = self.try_four(me, opp, ow, c)
+            if line is not None:
+                return line
+        self.vcf_fail.add((me, opp))
+        return None
+
+    def try_four(self, me: int, opp: int, ow: int, c: int) -> Optional[List[int]]:
+        """Čtyřka na `c` a vynucený blok; vrací celou linii, pokud vede k VCF."""
+        me2 = me | (1 << c)
+        w2 = self._wins(me2, opp)
+        if not w2 or ow & ~(1 << c):
+            return None
+        if w2 & (w2 - 1):
+            return [c]
+        sub = self.vcf(me2, opp | w2)
+        if sub is not None:
+            return [c, w2.bit_length() - 1] + sub
+        return None
+
+    # ───────────────────────── VCT ─────────────────────────
+
+    def vct(self, me: int, opp: int, depth: int) -> Optional[List[int]]:
+        seq = self.vcf(me, opp)
+        if seq is not None:
+            return seq
+        if depth <= 0 or self._wins(opp, me) or self.k < 3:
+            return None
+
+        free = self.table.full & ~(me | opp)
+        cands = self._moves_reaching(me, opp, self.k - 3) & free
+        for c in self._ordered(cands):
+            line = self.try_three(me, opp, c, depth)
+            if line is not None:
+                return line
+        return None
+
+    def try_three(self, me: int, opp: int, c: int, depth: int) -> Optional[List[int]]:
+        """Trojka na `c`: vyhrává, pokud žádná relevantní obrana nezastaví VCT."""
+        self._tick()
+        free = self.table.full & ~(me | opp)
+        me2 = me | (1 << c)
+        threat = self.vcf(me2, opp)
+        if threat is None:
+            return None
+        # relevantní obrany: pole hrozící sekvence, okna přes trojku, vlastní čtyřky
+        defenses = 0
+        for i in threat:
+            defenses |= 1 << i
+        for m in self.table.by_cell[c]:
+            if not opp & m and (me2 & m).bit_count() >= self.k - 2:
+                defenses |= m
+        defenses |= self._moves_reaching(opp, me2, self.k - 2)
+        defenses &= free & ~(1 << c)
+
+        line: Optional[List[int]] = None
+        for d in self._ordered(defenses):
+            sub = self.vct(me2, opp | (1 << d), depth - 1)
+            if sub is None:
+                return None
+            if line is None:
+                line = [d] + sub
+        return [c] + line if line is not None else None
+
+
+def find_forced_win(
+    bb: BitBoard,
+    player: str,
+    *,
+    max_nodes: Optional[int] = None,
+    vct_depth: Optional[int] = None,
+) -> Optional[ThreatResult]:
+    """
+    Vynucená výhra pro `player` (je na tahu) přes VCF, případně VCT.
+    Okamžitá výhra se vrací jako VCF délky 1.
+    """
+    table = line_table(bb.n, bb.k)
+    me, opp = (bb.x, bb.o) if player == "X" else (bb.o, bb.x)
+    s = _ThreatSearch(table, bb.k, THREAT_NODE_BUDGET if max_nodes is None else max_nodes)
+    depth = THREAT_VCT_DEPTH if vct_depth is None else vct_depth
+    try:
+        seq = s.vcf(me, opp)
+        kind = "vcf"
+        if seq is None and depth > 0:
+            seq = s.vct(me, opp, depth)
+            kind = "vct"
+    except _BudgetExceeded:
+        return None
+    if not seq:
+        return None
+    return ThreatResult(kind=kind, sequence=[divmod(i, bb.n) for i in seq], nodes=s.nodes)
+
+
+def forced_win_with(
+    bb: BitBoard,
+    player: str,
+    move: Tuple[int, int],
+    *,
+    max_nodes: Optional[int] = None,
+    vct_depth: Optional[int] = None,
+) -> Optional[ThreatResult]:
+    """Začíná konkrétní tah `move` vynucenou výhru (čtyřkou přes VCF, nebo trojkou přes VCT)?"""
+    table = line_table(bb.n, bb.k)
+    me, opp = (bb.x, bb.o) if player == "X" else (bb.o, bb.x)
+    idx = move[0] * bb.n + move[1]
+    if (me | opp) >> idx & 1:
+        return None
+    s = _ThreatSearch(table, bb.k, THREAT_NODE_BUDGET if max_nodes is None else max_nodes)
+    depth = THREAT_VCT_DEPTH if vct_depth is None else vct_depth
+    try:
+        if s._wins(opp, me) & ~(1 << idx):
+            # soupeř má jinde okamžitou výhru – žádná naše hrozba nestačí
+            return None
+        seq = s.try_four(me, opp, s._wins(opp, me), idx)
+        kind = "vcf"
+        if seq is None and depth > 0:
+            seq = s.try_three(me, opp, idx, depth)
+            kind = "vct"
+    except _BudgetExceeded:
+        return None
+    if not seq:
+        return None
+    return ThreatResult(kind=kind, sequence=[divmod(i, bb.n) for i in seq], nodes=s.nodes)
@@ -0,0 +1,87 @@
+"""
+Transpoziční cache výsledků best-move nad kanonickou (dihedrální) pozicí.
+
+Pozice, které jsou rotací / zrcadlením už analyzované pozice, se zkanonizují
+jednou z 8 transformací čtverce (stejné jako service._diagnose_mapping
++ antidiagonála), tah se uloží v kanonických souřadnicích a při zásahu
+se přemapuje zpět inverzní transformací.
+
+- dihedral_perms(n) -> 8 permutací indexů polí (cache per n)
+- canonicalize(bb) -> (cx, co, t) ; t = index transformace pozice → kanon
+- TranspositionTable – cache.LRUCache pro výsledky hledání (čítače hits/misses)
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from ..bitboard import BitBoard
+from ..cache import LRUCache
+from ..config import TT_CAPACITY
+
+# (r, c) -> (r', c') pro desku n×n
+_TRANSFORMS = (
+    ("identity", lambda r, c, n: (r, c)),
+    ("rot90",    lambda r, c, n: (c, n - 1 - r)),
+    ("rot180",   lambda r, c, n: (n - 1 - r, n - 1 - c)),
+    ("rot270",   lambda r, c, n: (n - 1 - c, r)),
+    ("flipV",    lambda r, c, n: (n - 1 - r, c)),
+    ("flipH",    lambda r, c, n: (r, n - 1 - c)),
+    ("swap",     lambda r, c, n: (c, r)),
+    ("antiSwap", lambda r, c, n: (n - 1 - c, n - 1 - r)),
+)
+
+TRANSFORM_NAMES = tuple(name for name, _ in _TRANSFORMS)
+
+
+@lru_cache(maxsize=None)
+def dihedral_perms(n: int) -> Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]:
+    """Pro každou transformaci dvojice (perm, inverse) indexů polí r * n + c."""
+    out = []
+    for _, f in _TRANSFORMS:
+        perm = [0] * (n * n)
+        inv = [0] * (n * n)
+        for r in range(n):
+            for c in range(n):
+                r2, c2 = f(r, c, n)
+                perm[r * n + c] = r2 * n + c2
+                inv[r2 * n + c2] = r * n + c
+        out.append((tuple(perm), tuple(inv)))
+    return tuple(out)
+
+
+def permute_bits(bits: int, perm: Tuple[int, ...]) -> int:
+    out = 0
+    while bits:
+        low = bits & -bits
+        out |= 1 << perm[low.bit_length() - 1]
+        bits ^= low
+    return out
+
+
+def canonicalize(bb: BitBoard) -> Tuple[int, int, int]:
+    """Nejmenší (x, o) přes všech 8 transformací + index použité transformace."""
+    best: Optional[Tuple[int, int]] = None
+    best_t = 0
+    for t, (perm, _) in enumerate(dihedral_perms(bb.n)):
+        cand = (permute_bits(bb.x, perm), permute_bits(bb.o, perm))
+        if best is None or cand < best:
+            best = cand
+            best_t = t
+    assert best is not None
+    return best[0], best[1], best_t
+
+
+def to_canonical_move(n: int, t: int, r: int, c: int) -> int:
+    return dihedral_perms(n)[t][0][r * n + c]
+
+
+def from_canonical_move(n: int, t: int, idx: int) -> Tuple[int, int]:
+    return divmod(dihedral_perms(n)[t][1][idx], n)
+
+
+class TranspositionTable(LRUCache):
+    """Výsledky hledání podle kanonické pozice (klíče z canonicalize); LRU s čítači."""
+
+
+# Sdílená (process-wide) cache výsledků compute_best_move
+BEST_MOVE_TT = TranspositionTable(TT_CAPACITY)
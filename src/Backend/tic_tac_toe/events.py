@@ -0,0 +1,164 @@
+from __future__ import annotations
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import json
+import threading
+
+from .config import EVENT_LOG_GAMES, EVENT_LOG_SIZE
+
+# Log událostí diváckých her (SSE):
+#   - EventLog = append-only ring buffer jedné hry; každá událost dostane
+#     pořadové číslo (seq od 1, SSE `id:`) a do SSE textu se zakóduje jednou –
+#     všichni odběratelé čtou tytéž řetězce vlastním kurzorem (žádné fronty
+#     a kopie na odběratele)
+#   - odběratel po reconnectu pošle Last-Event-ID a dostane přesně to, co
+#     zmeškal; vypadl-li jeho kurzor z bufferu, read_after hlásí mezeru
+#     a stream pošle čerstvý `state`
+#   - logy her drží omezená LRU (EVENT_LOG_GAMES), i po doběhnutí driveru,
+#     aby šlo navázat i po konci hry
+#   - událost může mít i kompaktní podobu (delta: jen tah / keyframe místo
+#     celé desky), zakódovanou taky jednou; odběratel si volí formát
+#     (FORMATS) a čte jen jeden z textů – u událostí bez delty je to tentýž
+#   - vedle blokujícího wait_after (WSGI vlákno) umí log probudit i asyncio
+#     odběratele (watch → future dokončená přes call_soon_threadsafe), takže
+#     asgi.py obslouží tisíce čekajících diváků z jedné smyčky
+
+
+FORMATS = ("full", "delta")
+
+
+def format_event(event: str, data_obj: dict, event_id: Optional[int] = None) -> str:
+    """Jedna SSE zpráva (volitelně id + event + JSON data)."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return head + f"event: {event}\n" + "data: " + json.dumps(data_obj, ensure_ascii=False) + "\n\n"
+
+
+class EventLog:
+    """Ring buffer událostí jedné hry: (seq, event, SSE text, SSE text delta)."""
+
+    __slots__ = ("_buf", "_cv", "_seq", "_waiters")
+
+    def __init__(self, capacity: int = EVENT_LOG_SIZE):
+        self._buf: deque = deque(maxlen=max(1, int(capacity)))
+        self._cv = threading.Condition()
+        self._seq = 0
+        self._waiters: Dict[asyncio.Future, asyncio.AbstractEventLoop] = {}
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, event: str, data: dict, delta: Optional[Tuple[str, dict]] = None) -> int:
+        """Přidá událost; `delta` = (event, data) její kompaktní podoby pro formát "delta"."""
+        # JSON se kóduje mimo zámek; pod ním se jen přidělí seq (řádek id:)
+        body = format_event(event, data)
+        delta_body = format_event(*delta) if delta is not None else None
+        with self._cv:
+            self._seq += 1
+            seq = self._seq
+            frame = f"id: {seq}\n" + body
+            self._buf.append((seq, event, frame, (f"id: {seq}\n" + delta_body) if delta_body else frame))
+            self._cv.notify_all()
+            waiters, self._waiters = self._waiters, {}
+        if waiters:
+            # jedno probuzení na smyčku (ne na diváka) – tisíce futures vyřídí jeden callback
+            by_loop: Dict[asyncio.AbstractEventLoop, List[asyncio.Future]] = {}
+            for fut, loop in waiters.items():
+                by_loop.setdefault(loop, []).append(fut)
+            for loop, futs in by_loop.items():
+                try:
+                    loop.call_soon_threadsafe(_wake, futs)
+                except RuntimeError:
+                    pass  # smyčka odběratele už neběží
+        return seq
+
+    def read_after(self, cursor: int, fmt: str = "full") -> Tuple[List[Tuple[int, str, str]], bool]:
+        """Události (seq, event, SSE text ve formátu fmt) se seq > cursor a příznak mezery."""
+        with self._cv:
+            return self._read_after(cursor, fmt)
+
+    def _read_after(self, cursor: int, fmt: str = "full") -> Tuple[List[Tuple[int, str, str]], bool]:
+        if not self._buf or cursor >= self._seq:
+            return [], cursor > self._seq
+        first = self._buf[0][0]
+        gap = cursor < first - 1
+        items = self._buf if gap else islice(self._buf, cursor - first + 1, None)
+        col = 3 if fmt == "delta" else 2
+        return [(it[0], it[1], it[col]) for it in items], gap
+
+    def wait_after(self, cursor: int, timeout: float, fmt: str = "full") -> Tuple[List[Tuple[int, str, str]], bool]:
+        """Jako read_after, ale bez nových událostí počká až `timeout` s."""
+        with self._cv:
+            if cursor == self._seq:
+                self._cv.wait(timeout)
+            return self._read_after(cursor, fmt)
+
+    def watch(self, cursor: int, loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Future]:
+        """
+        Asyncio obdoba wait_after: future, kterou dokončí příští publish.
+        None, pokud za kurzorem už něco je (stačí read_after). Volá se ze smyčky `loop`.
+        """
+        with self._cv:
+            if cursor != self._seq:
+                return None
+            fut = loop.create_future()
+            self._waiters[fut] = loop
+            return fut
+
+    def unwatch(self, fut: asyncio.Future) -> None:
+        """Odregistruje future z watch (timeout / odpojení odběratele)."""
+        with self._cv:
+            self._waiters.pop(fut, None)
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+
+def _wake(futs: List[asyncio.Future]) -> None:
+    for fut in futs:
+        if not fut.done():
+            fut.set_result(None)
+
+
+_LOGS: "OrderedDict[str, EventLog]" = OrderedDict()
+_LOGS_LOCK = threading.Lock()
+
+
+def get_log(game_id: str, *, create: bool = True) -> Optional[EventLog]:
+    with _LOGS_LOCK:
+        el = _LOGS.get(game_id)
+        if el is not None:
+            _LOGS.move_to_end(game_id)
+            return el
+        if not create:
+            return None
+        el = _LOGS[game_id] = EventLog()
+        while len(_LOGS) > EVENT_LOG_GAMES:
+            _LOGS.popitem(last=False)
+        return el
+
+
+def publish(game_id: str, event: str, data: dict, delta: Optional[Tuple[str, dict]] = None) -> int:
+    log_ = get_log(game_id)
+    assert log_ is not None
+    return log_.publish(event, data, delta)
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """Hodnota Last-Event-ID / ?lastEventId= → seq, nebo None (chybí / nečíselná)."""
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def stats() -> Dict[str, int]:
+    with _LOGS_LOCK:
+        return {
+            "games": len(_LOGS),
+            "maxGames": EVENT_LOG_GAMES,
+            "events": sum(len(el) for el in _LOGS.values()),
+            "perGame": EVENT_LOG_SIZE,
+        }
@@ -3,8 +3,13 @@ from __future__ import annotations
 from typing import List, Tuple, Dict, Any, Optional, Literal, cast
 from copy import deepcopy
 from collections import defaultdict
+import hashlib
 
 from . import rules
+from .bitboard import BitBoard, ThreatIndex, iter_cells
+from .config import EXPLAIN_CACHE_SIZE
+from .engine.threats import forced_win_with
+from .cache import LRUCache
 
 # Directions: horizontal, vertical, and both diagonals
 DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]  # type: List[Tuple[int, int]]
@@ -123,58 +128,30 @@ def _opponent(mark: str) -> str:
     return "O" if mark == "X" else "X"
 
 
-def _find_opponent_immediate_wins(board: List[List[str]], k: int, opp: str) -> List[Tuple[int, int]]:
+def _find_opponent_immediate_wins(board: List[List[str]], k: int, opp: str,
+                                  threats: Optional[ThreatIndex] = None) -> List[Tuple[int, int]]:
     """
     All empty cells where the opponent wins immediately in one move.
+    With the game's threat index this is a set lookup instead of a window scan.
     """
-    n = len(board)
-    wins = []  # type: List[Tuple[int, int]]
-    for r in range(n):
-        for c in range(n):
-            if board[r][c] != ".":
-                continue
-            b2 = _simulate(board, r, c, opp)
-            term = rules.check_winner(cast(List[List[Literal[".", "X", "O"]]], b2), k)
-            if term == opp:
-                wins.append((r, c))
-    return wins
-
-
-def _creates_double_threat(board: List[List[str]], r: int, c: int, mark: str, k: int) -> bool:
+    if threats is not None:
+        return [divmod(i, threats.n) for i in sorted(threats.wins(opp))]
+    bb = BitBoard.from_lists(board, k)
+    return list(iter_cells(bb.immediate_wins(opp), bb.n))
+
+
+def _creates_double_threat(board: List[List[str]], r: int, c: int, mark: str, k: int,
+                           threats: Optional[ThreatIndex] = None) -> bool:
     """
-    After our move there are at least two independent “win-next-move” threats.
-    A coarse but fast approximation.
+    After our move there are at least two distinct cells that win on the next move
+    (exact – counted over all k-windows of the bitboard).
     """
-    n = len(board)
-    b2 = _simulate(board, r, c, mark)
-    threats = 0
-    for (dr, dc) in DIRECTIONS:
-        # to the "left"
-        left = 0
-        rr, cc = r - dr, c - dc
-        while _in(n, rr, cc) and b2[rr][cc] == mark:
-            left += 1
-            rr -= dr
-            cc -= dc
-        # to the "right"
-        right = 0
-        rr, cc = r + dr, c + dc
-        while _in(n, rr, cc) and b2[rr][cc] == mark:
-            right += 1
-            rr += dr
-            cc += dc
-
-        run = left + 1 + right
-        # “k-1 and at least one open end” ~ we can win next move in this direction
-        ol_r = r - (dr * (left + 1))
-        ol_c = c - (dc * (left + 1))
-        or_r = r + (dr * (right + 1))
-        or_c = c + (dc * (right + 1))
-        open_left = _in(n, ol_r, ol_c) and b2[ol_r][ol_c] == "."
-        open_right = _in(n, or_r, or_c) and b2[or_r][or_c] == "."
-        if run == k - 1 and (open_left or open_right):
-            threats += 1
-    return threats >= 2
+    if threats is not None:
+        return len(threats.wins_after(r, c, mark)) >= 2
+    bb = BitBoard.from_lists(board, k)
+    bb.play(r, c, mark)
+    wins = bb.immediate_wins(mark)
+    return bool(wins & (wins - 1))
 
 
 def build_explanation(
@@ -182,10 +159,15 @@ def build_explanation(
     move: Optional[Tuple[int, int]],
     player: str,
     size: int,
-    k: int
+    k: int,
+    *,
+    threats: Optional[ThreatIndex] = None,
 ) -> Dict[str, Any]:
     """
     Returns explainRich = {'summary': str, 'reasons': [...], 'winningSequence': [...], 'hints': {...}}
+
+    `threats` is the game's ThreatIndex for `board` (service.threat_index); when given,
+    win/block/double-threat checks are lookups instead of board rescans.
     """
     if not move or not isinstance(move, (list, tuple)) or len(move) != 2:
         return {"summary": "No move suggested.", "reasons": [], "winningSequence": [], "hints": {}}
@@ -196,8 +178,11 @@ def build_explanation(
 
     # 1) Immediate win?
     b_win = _simulate(board, r, c, player)
-    term = rules.check_winner(cast(List[List[Literal[".", "X", "O"]]], b_win), k)
-    if term == player:
+    if threats is not None:
+        wins_now = (r * threats.n + c) in threats.wins(player)
+    else:
+        wins_now = rules.check_winner(cast(List[List[Literal[".", "X", "O"]]], b_win), k) == player
+    if wins_now:
         try:
             seq = rules.find_winning_sequence(cast(List[List[Literal[".", "X", "O"]]], b_win), k)
         except Exception:
@@ -211,7 +196,7 @@ def build_explanation(
         }
 
     # 2) Blocks opponent’s immediate win?
-    opp_wins = _find_opponent_immediate_wins(board, k, opp)
+    opp_wins = _find_opponent_immediate_wins(board, k, opp, threats)
     if (r, c) in opp_wins:
         reasons.append({
             "type": "block",
@@ -242,13 +227,24 @@ def build_explanation(
                 "text": txt
             })
 
-    # 4) Double threat?
-    if _creates_double_threat(board, r, c, player, k):
+    # 4) Double threat? Otherwise: does the move start a forced win (VCF/VCT)?
+    if _creates_double_threat(board, r, c, player, k, threats):
         reasons.append({
             "type": "double_threat",
             "text": "Creates a double threat (two ways to win on the next move).",
             "cells": [(r, c)]
         })
+    else:
+        forced = forced_win_with(BitBoard.from_lists(board, k), player, (r, c))
+        if forced is not None:
+            plies = len(forced.sequence)
+            reasons.append({
+                "type": "double_threat",
+                "text": f"Starts a forced win by continuous threats ({forced.kind.upper()}, {plies} plies).",
+                "cells": [(r, c)],
+                "forced": forced.kind,
+                "sequence": [list(mv) for mv in forced.sequence],
+            })
 
     # 5) Center control (soft UX heuristic)
     center = (size - 1) / 2.0
@@ -280,3 +276,71 @@ def build_explanation(
             "distanceFromCenterChebyshev": float(dist),
         }
     }
+
+
+# ───────────────────────── explanation cache ─────────────────────────
+#
+# The same (position, move, player, k) is explained again and again: repeated
+# hints, the stream's final `done`, batch duplicates, every spectator viewer.
+# Results are cached by a short key derived from exactly those inputs. Callers
+# may also defer the work: defer_explanation() only records the inputs and
+# returns the key, resolve_explanation() builds it on first request
+# (GET /explain/<key>). Cached dicts are shared – do not mutate them.
+
+EXPLAIN_MODES = ("full", "lazy", "none")
+
+EXPLAIN_CACHE = LRUCache(EXPLAIN_CACHE_SIZE)
+_DEFERRED = LRUCache(EXPLAIN_CACHE_SIZE)
+
+
+def _board_key(board: Any) -> str:
+    cells = getattr(board, "cells", None)  # PackedBoard
+    if cells is not None:
+        return cells.decode("ascii")
+    return "".join("".join(row) for row in board)
+
+
+def explain_key(board: Any, move: Tuple[int, int], player: str, k: int) -> str:
+    raw = f"{k}|{player}|{int(move[0])},{int(move[1])}|{_board_key(board)}"
+    return hashlib.blake2b(raw.encode("ascii"), digest_size=12).hexdigest()
+
+
+def cached_explanation(
+    board: Any,
+    move: Optional[Tuple[int, int]],
+    player: str,
+    size: int,
+    k: int,
+    *,
+    threats: Optional[ThreatIndex] = None,
+) -> Dict[str, Any]:
+    """build_explanation() behind the LRU keyed by (position, move, player, k)."""
+    if not move or not isinstance(move, (list, tuple)) or len(move) != 2:
+        return build_explanation(board, move, player, size, k)
+    key = explain_key(board, move, player, k)
+    hit = EXPLAIN_CACHE.get(key)
+    if hit is None:
+        hit = build_explanation(board, move, player, size, k, threats=threats)
+        EXPLAIN_CACHE.put(key, hit)
+    return hit
+
+
+def defer_explanation(board: Any, move: Tuple[int, int], player: str, size: int, k: int) -> str:
+    """Remember the inputs only (one string copy); the explanation is built on resolve."""
+    key = explain_key(board, move, player, k)
+    if key not in EXPLAIN_CACHE:
+        _DEFERRED.put(key, (_board_key(board), size, k, (int(move[0]), int(move[1])), player))
+    return key
+
+
+def resolve_explanation(key: str) -> Optional[Dict[str, Any]]:
+    """Explanation for a key from defer_explanation(); None once it fell out of both LRUs."""
+    hit = EXPLAIN_CACHE.get(key)
+    if hit is not None:
+        return hit
+    inputs = _DEFERRED.get(key)
+    if inputs is None:
+        return None
+    cells, n, k, move, player = inputs
+    board = [list(cells[r * n:(r + 1) * n]) for r in range(n)]
+    return cached_explanation(board, move, player, n, k)
@@ -1,13 +1,14 @@
 # src/Backend/react/models/__init__.py
 from .types import GameStatus, PlayerMark
-from .move import Move
+from .move import Move, MoveLog
+from .board import PackedBoard
 from .game import Game
-from .snapshot import BoardSnapshot
+from .snapshot import BoardSnapshot, Timeline
 from .analysis import BestMoveAnalysis
 from .presets import DifficultyPreset
 from .player import Player
 
 __all__ = [
-    "GameStatus","PlayerMark","Move","Game","BoardSnapshot",
+    "GameStatus","PlayerMark","Move","MoveLog","PackedBoard","Game","BoardSnapshot","Timeline",
     "BestMoveAnalysis","DifficultyPreset","Player"
 ]
@@ -0,0 +1,125 @@
+from typing import Iterator, List, Sequence, Union
+
+# Kompaktní deska: bytearray n² buněk (ASCII kód '.', 'X', 'O'), řádek po řádku.
+# Zvenku se chová jako list[list[str]] – board[r][c] čte i zapisuje přes lehký
+# pohled na řádek, iterace vrací řádky/znaky – takže rules, engine i explain
+# s ní pracují beze změny. Pro JSON slouží to_lists().
+
+_EMPTY = ord(".")
+
+
+class _Row:
+    """Pohled na jeden řádek PackedBoard (bez kopie)."""
+
+    __slots__ = ("_cells", "_off", "_n")
+
+    def __init__(self, cells: bytearray, off: int, n: int):
+        self._cells = cells
+        self._off = off
+        self._n = n
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, c: Union[int, slice]):
+        if isinstance(c, slice):
+            return [chr(b) for b in self._cells[self._off:self._off + self._n][c]]
+        if c < 0:
+            c += self._n
+        if not 0 <= c < self._n:
+            raise IndexError("board column out of range")
+        return chr(self._cells[self._off + c])
+
+    def __setitem__(self, c: int, mark: str) -> None:
+        if c < 0:
+            c += self._n
+        if not 0 <= c < self._n:
+            raise IndexError("board column out of range")
+        self._cells[self._off + c] = ord(mark)
+
+    def __iter__(self) -> Iterator[str]:
+        return map(chr, self._cells[self._off:self._off + self._n])
+
+    def count(self, mark: str) -> int:
+        return self._cells.count(ord(mark), self._off, self._off + self._n)
+
+    def index(self, mark: str) -> int:
+        i = self._cells.find(ord(mark), self._off, self._off + self._n)
+        if i < 0:
+            raise ValueError(f"{mark!r} is not in row")
+        return i - self._off
+
+    def __contains__(self, mark: str) -> bool:
+        return self._cells.find(ord(mark), self._off, self._off + self._n) >= 0
+
+    def __eq__(self, other) -> bool:
+        try:
+            return len(other) == self._n and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class PackedBoard:
+    """Deska n×n v jednom bytearray (≈ n² B místo n+1 listů s ukazateli)."""
+
+    __slots__ = ("n", "cells")
+
+    def __init__(self, n: int, cells: Union[bytes, bytearray, None] = None):
+        self.n = n
+        self.cells = bytearray(cells) if cells is not None else bytearray([_EMPTY]) * (n * n)
+        if len(self.cells) != n * n:
+            raise ValueError("board cell count does not match size")
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[str]]) -> "PackedBoard":
+        if isinstance(rows, PackedBoard):
+            return rows.copy()
+        n = len(rows)
+        return cls(n, "".join("".join(row) for row in rows).encode("ascii"))
+
+    @classmethod
+    def from_string(cls, n: int, s: str) -> "PackedBoard":
+        return cls(n, s.encode("ascii"))
+
+    def to_lists(self) -> List[List[str]]:
+        s, n = self.to_string(), self.n
+        return [list(s[r * n:(r + 1) * n]) for r in range(n)]
+
+    def to_string(self) -> str:
+        return self.cells.decode("ascii")
+
+    def copy(self) -> "PackedBoard":
+        return PackedBoard(self.n, self.cells)
+
+    def __deepcopy__(self, memo) -> "PackedBoard":
+        return self.copy()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, r: Union[int, slice]):
+        if isinstance(r, slice):
+            return [self[i] for i in range(*r.indices(self.n))]
+        if r < 0:
+            r += self.n
+        if not 0 <= r < self.n:
+            raise IndexError("board row out of range")
+        return _Row(self.cells, r * self.n, self.n)
+
+    def __iter__(self) -> Iterator[_Row]:
+        for r in range(self.n):
+            yield _Row(self.cells, r * self.n, self.n)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PackedBoard):
+            return self.n == other.n and self.cells == other.cells
+        try:
+            return len(other) == self.n and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PackedBoard({self.to_lists()!r})"
@@ -1,23 +1,24 @@
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Literal
+from dataclasses import dataclass, field, replace
+from typing import Any, Optional, Dict, Literal
 from .types import GameStatus
-from .move import Move
-from .snapshot import BoardSnapshot
+from .board import PackedBoard
+from .move import MoveLog
+from .snapshot import Timeline
 from .player import Player
 
 Mode = Literal["pve", "pvp"]
 
-@dataclass
+@dataclass(slots=True)
 class Game:
     id: str
     size: int
     k_to_win: int
-    board: List[List[str]]        # '.', 'X', 'O'
+    board: PackedBoard            # '.', 'X', 'O' – board[r][c] jako u list[list[str]]
     player: str                   # kdo je na tahu: 'X' nebo 'O'
     status: GameStatus
     winner: Optional[str] = None
-    history: List[Move] = field(default_factory=list)
-    snapshots: List[BoardSnapshot] = field(default_factory=list)  # timeline
+    history: MoveLog = field(default_factory=MoveLog)     # tahy (2 B/tah), čte se jako list[Move]
+    snapshots: Timeline = field(default_factory=Timeline)  # timeline (log tahů + keyframy)
 
     # režim / hráči
     mode: Mode = "pve"
@@ -31,3 +32,53 @@ class Game:
     ended_at: Optional[float] = None    # epoch seconds
     hints_used: int = 0                 # kolikrát bylo zavoláno /best-move na gameId
     difficulty: str = "easy"
+
+    # /play v async režimu: tah AI se počítá na pozadí (ukládá se → přežije restart workeru)
+    ai_pending: bool = False
+
+    # optimistická souběžnost: store přijme uložení jen se stejnou verzí, jakou má uloženou
+    version: int = 0
+
+    # meta posledního tahu AI pro odpověď /play a polling (codec ji ukládá jako "la")
+    _last_ai: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+
+    # bitboard.ThreatIndex – líně staví service.threat_index, apply_move posouvá (neukládá se)
+    threats: Optional[Any] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        # konverzní vrstva: přijme i list[list[str]] / list[Move] (starší volající, testy)
+        if not isinstance(self.board, PackedBoard):
+            self.board = PackedBoard.from_rows(self.board)
+        if not isinstance(self.history, MoveLog):
+            self.history = MoveLog(self.size, self.history)
+        elif not self.history.n:
+            self.history.n = self.size
+        if not isinstance(self.snapshots, Timeline):
+            tl = Timeline(self.size)
+            for snap in self.snapshots:
+                tl.append(snap)
+            self.snapshots = tl
+        if not len(self.snapshots):
+            # výchozí Timeline() nemá ply 0 → deska bez tahů z historie
+            start = self.board.to_lists()
+            for m in self.history:
+                start[m.row][m.col] = "."
+            self.snapshots = Timeline(self.size, start)
+        # osa čte tahy přímo z historie → nemůžou se rozejít
+        self.snapshots.bind(self.history)
+
+    def copy(self) -> "Game":
+        """
+        Nezávislá kopie pro MemoryStore: deska, historie, timeline i ThreatIndex
+        se kopírují, takže úprava jedné kopie nezmění jinou (CAS nad version).
+        """
+        ti = self.threats
+        history = self.history.copy()
+        return replace(
+            self,
+            board=self.board.copy(),
+            history=history,
+            snapshots=self.snapshots.copy(log=history),
+            players=dict(self.players),
+            threats=ti.copy() if ti is not None else None,
+        )
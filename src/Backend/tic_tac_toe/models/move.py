@@ -1,7 +1,73 @@
+from array import array
 from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Union
 
-@dataclass
+@dataclass(slots=True)
 class Move:
     row: int
     col: int
     player: str  # 'X' or 'O'
+
+
+class MoveLog:
+    """
+    Historie tahů jako array('H'): jeden tah = index pole * 2 + (1 pro 'O').
+    2 B na tah místo objektu Move; Move se skládá jen při čtení
+    (indexace, iterace), takže zvenku se log chová jako list[Move].
+    """
+
+    __slots__ = ("n", "_codes")
+
+    def __init__(self, n: int = 0, moves: Iterable[Move] = ()):
+        self.n = n
+        self._codes = array("H")
+        for m in moves:
+            self.append(m)
+
+    def record(self, row: int, col: int, mark: str) -> None:
+        self._codes.append((row * self.n + col) << 1 | (mark == "O"))
+
+    def append(self, m: Move) -> None:
+        mark = getattr(m, "player", None) or getattr(m, "mark", None) or "X"
+        self.record(int(m.row), int(m.col), mark)
+
+    def copy(self) -> "MoveLog":
+        ml = MoveLog(self.n)
+        ml._codes = array("H", self._codes)
+        return ml
+
+    def cell(self, i: int) -> int:
+        """Index pole (row * n + col) i-tého tahu."""
+        return self._codes[i] >> 1
+
+    def mark(self, i: int) -> str:
+        return "O" if self._codes[i] & 1 else "X"
+
+    def _move(self, code: int) -> Move:
+        idx = code >> 1
+        return Move(row=idx // self.n, col=idx % self.n, player="O" if code & 1 else "X")
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self._move(c) for c in self._codes[i]]
+        return self._move(self._codes[i])
+
+    def __iter__(self) -> Iterator[Move]:
+        return map(self._move, self._codes)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MoveLog):
+            return self.n == other.n and self._codes == other._codes
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MoveLog(n={self.n}, moves={list(self)!r})"
+
+    def to_list(self) -> List[Move]:
+        return list(self)
@@ -3,7 +3,7 @@ from typing import Optional, Literal
 
 PlayerKind = Literal["human", "ai"]
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     id: str
     nickname: Optional[str] = None
@@ -1,9 +1,171 @@
 from dataclasses import dataclass
-from typing import List, Optional
-from .move import Move
+from typing import Dict, Iterator, List, Optional, Union, overload
+from .move import Move, MoveLog
 
-@dataclass
+@dataclass(slots=True)
 class BoardSnapshot:
     ply: int                     # pořadí tahu (0..N)
     board: List[List[str]]       # kopie desky po aplikaci tahu
     last_move: Optional[Move]    # tah, který vedl ke snapshotu (None = start)
+
+
+class Timeline:
+    """
+    Časová osa hry (ply 0..N) bez kopie desky po každém tahu.
+
+    Drží jen log tahů (MoveLog, 2 B/tah) a klíčové snímky desky každých
+    `keyframe_every` půltahů (default n²/4 → nejvýš ~5 snímků na hru), takže
+    paměť je O(n²) místo O(n⁴). BoardSnapshot pro libovolný ply se skládá
+    na požádání: nejbližší starší keyframe + dohrání nejvýš n²/4 tahů.
+
+    Navenek se chová jako původní list[BoardSnapshot] (len, indexace,
+    slicing, iterace, append), takže DTO a testy zůstávají beze změny.
+
+    Game osu napojí přes bind() na svou historii: log tahů je pak sdílený
+    (Game.history) a tip + keyframy se z něj dopočítávají líně při čtení,
+    takže osa a historie se nemůžou rozejít.
+    """
+
+    __slots__ = ("n", "_log", "_keyframes", "_tip", "_every", "_synced")
+
+    def __init__(self, n: int = 0, initial: Optional[List[List[str]]] = None, *,
+                 keyframe_every: Optional[int] = None):
+        self.n = n
+        self._log = MoveLog(n)                  # tah ply p (1..N) = _log[p - 1]
+        self._keyframes: Dict[int, bytes] = {}  # ply → deska jako n² bajtů
+        self._tip = bytearray()                 # deska po _synced tazích
+        self._every = keyframe_every
+        self._synced = 0                        # kolik tahů z _log je v _tip/_keyframes
+        if initial is not None:
+            self._start(initial)
+
+    @classmethod
+    def from_moves(cls, n: int, moves: List[Move]) -> "Timeline":
+        """Osa z historie tahů od prázdné desky (codec, přehrání hry)."""
+        tl = cls(n, [["." for _ in range(n)] for _ in range(n)])
+        for m in moves:
+            tl.record(m.row, m.col, _mark_of(m))
+        return tl
+
+    def _start(self, board: List[List[str]]) -> None:
+        self.n = len(board)
+        if not self._every:
+            self._every = max(4, self.n * self.n // 4)
+        self._tip = bytearray("".join("".join(row) for row in board).encode("ascii"))
+        self._keyframes = {0: bytes(self._tip)}
+        self._log = MoveLog(self.n)
+        self._synced = 0
+
+    def _start_empty(self) -> None:
+        self._start([["." for _ in range(self.n)] for _ in range(self.n)])
+
+    def _sync(self) -> None:
+        """Dopočítej tip a keyframy pro tahy přidané do logu od posledního čtení."""
+        log = self._log
+        end = len(log)
+        if self._synced == end:
+            return
+        tip, every = self._tip, self._every
+        for p in range(self._synced, end):
+            tip[log.cell(p)] = ord(log.mark(p))
+            if (p + 1) % every == 0:  # type: ignore[operator]
+                self._keyframes[p + 1] = bytes(tip)
+        self._synced = end
+
+    # ── zápis ──
+
+    def bind(self, log: MoveLog) -> None:
+        """
+        Napoj osu na sdílený log tahů (Game.history). Z osy zůstává jen ply 0,
+        zbytek se odvodí z logu – další tahy stačí zapsat do logu.
+        """
+        if log is self._log:
+            return
+        if not self._keyframes:
+            self._start_empty()
+        start = self._keyframes[0]
+        self._log = log
+        self._tip = bytearray(start)
+        self._keyframes = {0: start}
+        self._synced = 0
+
+    def record(self, row: int, col: int, mark: str) -> None:
+        """Přidej ply po tahu (row, col) značkou `mark` (jen pro nenapojenou osu)."""
+        if not self._keyframes:
+            self._start_empty()
+        self._log.record(row, col, mark)
+        self._sync()
+
+    def append(self, snap: BoardSnapshot) -> None:
+        """Kompatibilita s list[BoardSnapshot]: ply 0 založí osu, další = tah."""
+        lm = snap.last_move
+        if lm is None:
+            self._start(snap.board)
+            return
+        self.record(int(lm.row), int(lm.col), _mark_of(lm))
+
+    def copy(self, log: Optional[MoveLog] = None) -> "Timeline":
+        """
+        Nezávislá kopie (keyframy jsou bytes → sdílí se). `log` = už zkopírovaný
+        log, na který se kopie napojí (Game.copy předá kopii historie).
+        """
+        tl = Timeline.__new__(Timeline)
+        tl.n, tl._every, tl._synced = self.n, self._every, self._synced
+        tl._log = log if log is not None else self._log.copy()
+        tl._keyframes = dict(self._keyframes)
+        tl._tip = bytearray(self._tip)
+        return tl
+
+    # ── čtení ──
+
+    def __len__(self) -> int:
+        return len(self._log) + 1 if self._keyframes else 0
+
+    def board_at(self, ply: int) -> List[List[str]]:
+        """Deska po `ply` půltazích (záporný index jako u listu)."""
+        self._sync()
+        size = len(self)
+        if ply < 0:
+            ply += size
+        if not 0 <= ply < size:
+            raise IndexError("timeline index out of range")
+        if ply == size - 1:
+            cells = bytearray(self._tip)
+        else:
+            base = ply - ply % self._every  # type: ignore[operator]
+            cells = bytearray(self._keyframes[base])
+            log = self._log
+            for p in range(base, ply):
+                cells[log.cell(p)] = ord(log.mark(p))
+        s, n = cells.decode("ascii"), self.n
+        return [list(s[r * n:(r + 1) * n]) for r in range(n)]
+
+    def _snapshot(self, ply: int) -> BoardSnapshot:
+        last = self._log[ply - 1] if ply > 0 else None
+        return BoardSnapshot(ply=ply, board=self.board_at(ply), last_move=last)
+
+    @overload
+    def __getitem__(self, i: int) -> BoardSnapshot: ...
+    @overload
+    def __getitem__(self, i: slice) -> List[BoardSnapshot]: ...
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self._snapshot(p) for p in range(*i.indices(len(self)))]
+        size = len(self)
+        if i < 0:
+            i += size
+        if not 0 <= i < size:
+            raise IndexError("timeline index out of range")
+        return self._snapshot(i)
+
+    def __iter__(self) -> Iterator[BoardSnapshot]:
+        for p in range(len(self)):
+            yield self._snapshot(p)
+
+    def __repr__(self) -> str:
+        return f"Timeline(n={self.n}, plies={len(self)}, keyframes={sorted(self._keyframes)})"
+
+
+def _mark_of(m) -> str:
+    return getattr(m, "player", None) or getattr(m, "mark", None) or "."
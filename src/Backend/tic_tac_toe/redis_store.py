@@ -0,0 +1,222 @@
+"""
+Redis-protocol (RESP2) úložiště her – bez externí knihovny.
+
+- minimální klient nad socketem: kódování příkazů, parsování odpovědí,
+  pipelining (více příkazů jedním sendall, odpovědi čteny za sebou)
+- malý pool spojení (jedno spojení = jedno vlákno najednou)
+- hodnoty = codec.encode_game (kompaktní), TTL přes SET … EX
+- save = compare-and-swap nad Game.version (WATCH/GET/MULTI/SET/EXEC) –
+  souběžný zápis z jiného workeru skončí StaleWriteError, ne přepsáním
+- funguje proti Redis/Valkey/KeyDB i proti lokálnímu resp_server.py
+- rediss:// = spojení přes TLS (ssl.create_default_context, ověření certifikátu)
+"""
+from __future__ import annotations
+import socket
+import ssl
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlparse
+
+from .codec import decode_game, encode_game, peek_version
+from .store import GameStore, StaleWriteError
+
+_CRLF = b"\r\n"
+
+
+class RespError(Exception):
+    """Chybová odpověď serveru (-ERR …)."""
+
+
+def encode_command(*args: Any) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for a in args:
+        if isinstance(a, bytes):
+            b = a
+        elif isinstance(a, str):
+            b = a.encode("utf-8")
+        else:
+            b = str(a).encode("ascii")
+        out.append(b"$%d\r\n%s\r\n" % (len(b), b))
+    return b"".join(out)
+
+
+def read_reply(f) -> Any:
+    """Jedna RESP2 odpověď ze souborového objektu (rb). Chyby se vrací jako RespError."""
+    line = f.readline()
+    if not line:
+        raise ConnectionError("connection closed by server")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode("utf-8")
+    if kind == b"-":
+        return RespError(rest.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        n = int(rest)
+        if n < 0:
+            return None
+        data = f.read(n + 2)
+        return data[:-2]
+    if kind == b"*":
+        n = int(rest)
+        if n < 0:
+            return None
+        return [read_reply(f) for _ in range(n)]
+    raise ConnectionError(f"bad RESP reply: {line[:32]!r}")
+
+
+class RespConnection:
+    def __init__(self, host: str, port: int, *, password: Optional[str] = None, db: int = 0,
+                 timeout: float = 5.0, ssl_context: Optional[ssl.SSLContext] = None):
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if ssl_context is not None:
+            try:
+                sock = ssl_context.wrap_socket(sock, server_hostname=host)
+            except BaseException:
+                sock.close()
+                raise
+        self.sock = sock
+        self.file = self.sock.makefile("rb")
+        if password:
+            self.execute("AUTH", password)
+        if db:
+            self.execute("SELECT", db)
+
+    def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """Pošli všechny příkazy naráz a přečti odpovědi (RespError se vrací, nehází)."""
+        self.sock.sendall(b"".join(encode_command(*c) for c in commands))
+        return [read_reply(self.file) for _ in commands]
+
+    def execute(self, *args: Any) -> Any:
+        reply = self.pipeline([args])[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def close(self) -> None:
+        try:
+            self.file.close()
+        finally:
+            self.sock.close()
+
+
+def parse_url(url: str) -> Tuple[str, int, Optional[str], int]:
+    u = urlparse(url)
+    db = 0
+    if u.path and u.path.strip("/"):
+        db = int(u.path.strip("/"))
+    password = unquote(u.password) if u.password else None
+    return u.hostname or "127.0.0.1", u.port or 6379, password, db
+
+
+class RedisStore(GameStore):
+    def __init__(self, url: str, *, ttl_sec: int, prefix: str = "ttt:game:", pool_size: int = 8):
+        self.url = url
+        self.host, self.port, self._password, self.db = parse_url(url)
+        self._ssl = ssl.create_default_context() if urlparse(url).scheme == "rediss" else None
+        self.ttl_sec = ttl_sec
+        self.prefix = prefix
+        self._pool: List[RespConnection] = []
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+
+    # ───────────────────────── spojení ─────────────────────────
+
+    @contextmanager
+    def _conn(self) -> Iterator[RespConnection]:
+        with self._lock:
+            conn = self._pool.pop() if self._pool else None
+        if conn is None:
+            conn = RespConnection(self.host, self.port, password=self._password, db=self.db,
+                                  ssl_context=self._ssl)
+        try:
+            yield conn
+        except BaseException:
+            # jakákoli výjimka (i StaleWriteError / RespError) = stav spojení neznámý
+            # (rozpracovaný WATCH, nedočtená odpověď) → zavřít, do poolu nevracet
+            conn.close()
+            raise
+        with self._lock:
+            if len(self._pool) < self._pool_size:
+                self._pool.append(conn)
+                return
+        conn.close()
+
+    def _key(self, game_id: str) -> str:
+        return self.prefix + game_id
+
+    # ───────────────────────── GameStore ─────────────────────────
+
+    def get(self, game_id: str) -> Optional[object]:
+        with self._conn() as c:
+            blob = c.execute("GET", self._key(game_id))
+        return decode_game(blob) if blob is not None else None
+
+    def save(self, game: object) -> None:
+        gid = game.id  # type: ignore[attr-defined]
+        key = self._key(gid)
+        version = int(getattr(game, "version", 0) or 0)
+        blob = encode_game(game, version=version + 1)  # type: ignore[arg-type]
+        with self._conn() as c:
+            _, stored = c.pipeline([("WATCH", key), ("GET", key)])
+            if isinstance(stored, RespError):
+                c.execute("UNWATCH")
+                raise stored
+            actual = peek_version(stored) if stored is not None else version
+            if actual != version:
+                c.execute("UNWATCH")
+                raise StaleWriteError(gid, version, actual)
+            replies = c.pipeline([("MULTI",), ("SET", key, blob, "EX", self.ttl_sec), ("EXEC",)])
+        for r in replies:
+            if isinstance(r, RespError):
+                raise r
+        if replies[-1] is None:
+            # klíč se změnil mezi WATCH a EXEC → transakce zahozena
+            raise StaleWriteError(gid, version, -1)
+        game.version = version + 1  # type: ignore[attr-defined]
+
+    def delete(self, game_id: str) -> bool:
+        with self._conn() as c:
+            return bool(c.execute("DEL", self._key(game_id)))
+
+    def get_many(self, game_ids: Iterable[str]) -> List[Optional[object]]:
+        keys = [self._key(gid) for gid in game_ids]
+        if not keys:
+            return []
+        with self._conn() as c:
+            blobs = c.execute("MGET", *keys)
+        return [decode_game(b) if b is not None else None for b in blobs]
+
+    def save_many(self, games: Iterable[object]) -> None:
+        """Hromadný zápis jednou dávkou – bez CAS (import/seed, ne souběžné tahy)."""
+        cmds = [("SET", self._key(g.id), encode_game(g), "EX", self.ttl_sec) for g in games]  # type: ignore[attr-defined]
+        if not cmds:
+            return
+        with self._conn() as c:
+            replies = c.pipeline(cmds)
+        for r in replies:
+            if isinstance(r, RespError):
+                raise r
+
+    def clear(self) -> None:
+        with self._conn() as c:
+            cursor = b"0"
+            while True:
+                cursor, keys = c.execute("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 500)
+                if keys:
+                    c.execute("DEL", *keys)
+                if cursor in (b"0", "0"):
+                    break
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "host": self.host, "port": self.port, "db": self.db,
+                "ttlSec": self.ttl_sec, "poolIdle": len(self._pool)}
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._pool = self._pool, []
+        for c in conns:
+            c.close()
@@ -0,0 +1,265 @@
+"""
+Lokální „stand-in“ Redis server (podmnožina RESP2) pro testy a vývoj.
+
+Umí přesně to, co potřebuje redis_store.RedisStore:
+PING, AUTH, SELECT, GET, SET [EX|PX] [NX|XX], MGET, DEL, EXISTS,
+EXPIRE, TTL, SCAN … MATCH, DBSIZE, FLUSHDB a transakce
+WATCH/UNWATCH/MULTI/EXEC/DISCARD (optimistický zámek přes revize klíčů).
+
+Spuštění pro víc gunicorn workerů bez skutečného Redisu:
+    python -m tic_tac_toe.resp_server --port 6380
+    TTT_STORE_URL=redis://127.0.0.1:6380/0 gunicorn app:app -w 4
+"""
+from __future__ import annotations
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .redis_store import RespError, read_reply
+
+_OK = "OK"
+
+
+def _encode_reply(v: Any) -> bytes:
+    if v is None:
+        return b"$-1\r\n"
+    if isinstance(v, RespError):
+        return b"-" + str(v).encode("utf-8") + b"\r\n"
+    if isinstance(v, str):
+        return b"+" + v.encode("utf-8") + b"\r\n"
+    if isinstance(v, bool):
+        return b":%d\r\n" % int(v)
+    if isinstance(v, int):
+        return b":%d\r\n" % v
+    if isinstance(v, bytes):
+        return b"$%d\r\n%s\r\n" % (len(v), v)
+    if isinstance(v, list):
+        return b"*%d\r\n" % len(v) + b"".join(_encode_reply(x) for x in v)
+    raise TypeError(f"cannot encode {type(v)!r}")
+
+
+class _Data:
+    """Sdílená data serveru: db -> key -> (value, expire_at | None)."""
+
+    def __init__(self):
+        self.dbs: Dict[int, Dict[bytes, Tuple[bytes, Optional[float]]]] = {}
+        self.revs: Dict[Tuple[int, bytes], int] = {}   # (db, klíč) -> počet zápisů (pro WATCH)
+        self.lock = threading.Lock()
+
+    def db(self, idx: int) -> Dict[bytes, Tuple[bytes, Optional[float]]]:
+        return self.dbs.setdefault(idx, {})
+
+    def touch(self, idx: int, key: bytes) -> None:
+        self.revs[(idx, key)] = self.revs.get((idx, key), 0) + 1
+
+    def rev(self, idx: int, key: bytes) -> int:
+        return self.revs.get((idx, key), 0)
+
+    @staticmethod
+    def alive(item: Optional[Tuple[bytes, Optional[float]]], now: float) -> bool:
+        return item is not None and (item[1] is None or item[1] > now)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_Server"
+
+    def handle(self) -> None:
+        self.db_index = 0
+        self.watched: Dict[Tuple[int, bytes], int] = {}
+        self.queued: Optional[List[List[bytes]]] = None   # None = mimo MULTI
+        while True:
+            try:
+                cmd = read_reply(self.rfile)
+            except (ConnectionError, OSError, ValueError):
+                return
+            if not isinstance(cmd, list) or not cmd:
+                return
+            try:
+                reply = self.dispatch([bytes(a) for a in cmd])
+            except (ValueError, IndexError):
+                reply = RespError("ERR syntax error")
+            try:
+                self.wfile.write(_encode_reply(reply))
+                self.wfile.flush()
+            except OSError:
+                return
+
+    def dispatch(self, args: List[bytes]) -> Any:
+        name = args[0].upper().decode("ascii", "replace")
+        data = self.server.data
+        if name == "MULTI":
+            if self.queued is not None:
+                return RespError("ERR MULTI calls can not be nested")
+            self.queued = []
+            return _OK
+        if name == "DISCARD":
+            if self.queued is None:
+                return RespError("ERR DISCARD without MULTI")
+            self.queued, self.watched = None, {}
+            return _OK
+        if name == "EXEC":
+            if self.queued is None:
+                return RespError("ERR EXEC without MULTI")
+            queued, self.queued = self.queued, None
+            watched, self.watched = self.watched, {}
+            with data.lock:
+                if any(data.rev(*wk) != rev for wk, rev in watched.items()):
+                    return None
+                return [self.execute(a[0].upper().decode("ascii", "replace"), a) for a in queued]
+        if name == "WATCH":
+            if self.queued is not None:
+                return RespError("ERR WATCH inside MULTI is not allowed")
+            with data.lock:
+                for k in args[1:]:
+                    self.watched[(self.db_index, k)] = data.rev(self.db_index, k)
+            return _OK
+        if name == "UNWATCH":
+            self.watched = {}
+            return _OK
+        if self.queued is not None:
+            self.queued.append(args)
+            return "QUEUED"
+        with data.lock:
+            return self.execute(name, args)
+
+    def execute(self, name: str, args: List[bytes]) -> Any:
+        """Jeden příkaz nad daty (volající drží data.lock)."""
+        data = self.server.data
+        now = time.time()
+        db = data.db(self.db_index)
+        if name == "PING":
+            return "PONG"
+        if name == "AUTH":
+            return _OK
+        if name == "SELECT":
+            self.db_index = int(args[1])
+            return _OK
+        if name == "GET":
+            item = db.get(args[1])
+            return item[0] if data.alive(item, now) else None
+        if name == "MGET":
+            out = []
+            for k in args[1:]:
+                item = db.get(k)
+                out.append(item[0] if data.alive(item, now) else None)
+            return out
+        if name == "SET":
+            key, val = args[1], args[2]
+            exp: Optional[float] = None
+            nx = xx = False
+            i = 3
+            while i < len(args):
+                opt = args[i].upper()
+                if opt == b"EX":
+                    exp = now + int(args[i + 1]); i += 2
+                elif opt == b"PX":
+                    exp = now + int(args[i + 1]) / 1000.0; i += 2
+                elif opt == b"NX":
+                    nx = True; i += 1
+                elif opt == b"XX":
+                    xx = True; i += 1
+                else:
+                    return RespError("ERR syntax error")
+            exists = data.alive(db.get(key), now)
+            if (nx and exists) or (xx and not exists):
+                return None
+            db[key] = (val, exp)
+            data.touch(self.db_index, key)
+            return _OK
+        if name == "DEL":
+            removed = 0
+            for k in args[1:]:
+                if db.pop(k, None) is not None:
+                    data.touch(self.db_index, k)
+                    removed += 1
+            return removed
+        if name == "EXISTS":
+            return sum(1 for k in args[1:] if data.alive(db.get(k), now))
+        if name == "EXPIRE":
+            item = db.get(args[1])
+            if not data.alive(item, now):
+                return 0
+            db[args[1]] = (item[0], now + int(args[2]))  # type: ignore[index]
+            data.touch(self.db_index, args[1])
+            return 1
+        if name == "TTL":
+            item = db.get(args[1])
+            if not data.alive(item, now):
+                return -2
+            return -1 if item[1] is None else int(item[1] - now)  # type: ignore[index]
+        if name == "SCAN":
+            pattern = "*"
+            for i in range(2, len(args) - 1):
+                if args[i].upper() == b"MATCH":
+                    pattern = args[i + 1].decode("utf-8")
+            keys = [k for k, item in db.items()
+                    if data.alive(item, now) and fnmatch.fnmatchcase(k.decode("utf-8", "replace"), pattern)]
+            return [b"0", keys]
+        if name == "DBSIZE":
+            return sum(1 for item in db.values() if data.alive(item, now))
+        if name == "FLUSHDB":
+            for k in db:
+                data.touch(self.db_index, k)
+            db.clear()
+            return _OK
+        return RespError(f"ERR unknown command '{name}'")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, addr):
+        super().__init__(addr, _Handler)
+        self.data = _Data()
+
+
+class LocalRespServer:
+    """Server ve vlákně na pozadí: `with LocalRespServer() as srv: srv.url`."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = _Server((host, port))
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    def start(self) -> "LocalRespServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="resp-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LocalRespServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m tic_tac_toe.resp_server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=6380)
+    args = ap.parse_args(argv)
+    srv = _Server((args.host, args.port))
+    print(f"RESP stand-in listening on redis://{args.host}:{args.port}/0", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,16 +7,21 @@ Funkce:
 - is_legal_move(board, r, c) -> bool
 - apply_move(board, r, c, player) -> new_board (copy)
 - find_winning_sequence(board, k) -> [{"row": r, "col": c}, ...] | []
+- find_winning_sequence_at(board, r, c, k) -> totéž, ale jen přes linie tahu (r, c)
 - check_winner(board, k) -> "X" | "O" | "draw" | None
 """
 from typing import Optional, Literal, List, Dict, cast
 from copy import deepcopy
 
+from .bitboard import BitBoard
+
 Cell   = Literal[".", "X", "O"]
 Player = Literal["X", "O"]
 Winner = Literal["X", "O", "draw"]
 Board  = List[List[Cell]]
 
+_DIRS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
 class RulesError(ValueError):
     pass
 
@@ -79,45 +84,40 @@ def find_winning_sequence(board: Board, k: int) -> List[Dict[str, int]]:
     Vrací seznam dictů {"row": r, "col": c} v pořadí od začátku linie.
     Pokud existuje delší souvislá linie (>k), vrátí prvních k buněk od
     kanonického začátku (tj. tam, kde předchozí v opačném směru není stejný kámen).
+
+    Tenký adaptér nad bitboardem (předpočítané masky linií pro (size, k)).
+    """
+    return BitBoard.from_lists(board, k).winning_sequence()
+
+def find_winning_sequence_at(board: Board, r: int, c: int, k: int) -> List[Dict[str, int]]:
+    """
+    Lokální kontrola po tahu na (r, c): projde jen 4 linie přes tento kámen,
+    tj. O(k) místo skenu celé desky. Kontrakt výstupu stejný jako
+    find_winning_sequence (prvních k buněk od kanonického začátku řady).
     """
     n = len(board)
-    dirs = [(0, 1), (1, 0), (1, 1), (1, -1)]
-    for r in range(n):
-        for c in range(n):
-            mark = board[r][c]
-            if mark == ".":
-                continue
-            for dr, dc in dirs:
-                # Začátek linie = v opačném směru není stejná značka
-                pr, pc = r - dr, c - dc
-                if 0 <= pr < n and 0 <= pc < n and board[pr][pc] == mark:
-                    continue
-                seq: List[Dict[str, int]] = []
-                rr, cc = r, c
-                while 0 <= rr < n and 0 <= cc < n and board[rr][cc] == mark:
-                    seq.append({"row": rr, "col": cc})
-                    if len(seq) == k:
-                        return seq
-                    rr += dr
-                    cc += dc
+    mark = board[r][c]
+    if mark == ".":
+        return []
+    for dr, dc in _DIRS:
+        # couvni na začátek souvislé řady
+        sr, sc = r, c
+        while 0 <= sr - dr < n and 0 <= sc - dc < n and board[sr - dr][sc - dc] == mark:
+            sr -= dr
+            sc -= dc
+        seq: List[Dict[str, int]] = []
+        rr, cc = sr, sc
+        while 0 <= rr < n and 0 <= cc < n and board[rr][cc] == mark:
+            seq.append({"row": rr, "col": cc})
+            if len(seq) == k:
+                return seq
+            rr += dr
+            cc += dc
     return []
 
 def check_winner(board: Board, k: int) -> Optional[Winner]:
     """
-    Preferuje výsledek z find_winning_sequence (vrací přesné souřadnice).
-    Pokud žádná výherní sekvence neexistuje, rozliší 'draw' vs None (running).
+    Vítěz podle masek linií; bez výhry rozliší 'draw' (plná deska)
+    vs None (running).
     """
-    seq = find_winning_sequence(board, k)
-    if seq:
-        r0, c0 = seq[0]["row"], seq[0]["col"]
-        v: Cell = board[r0][c0]
-        if v in ("X", "O"):
-            # pro typový checker zúžíme z Cell ("."|"X"|"O") na Literal["X","O"]
-            return cast(Literal["X", "O"], v)
-        # teoreticky nedosažitelné (sekvence nikdy nezačíná ".")
-        raise AssertionError("Winning sequence cannot start with '.'")
-
-    # bez výhry: je plno?
-    n = len(board)
-    empty = any(board[r][c] == "." for r in range(n) for c in range(n))
-    return None if empty else "draw"
+    return cast(Optional[Winner], BitBoard.from_lists(board, k).winner())
@@ -1,20 +1,31 @@
 from __future__ import annotations
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, Iterable, Tuple, Literal
+import json
+import logging
+import queue
 import random
+import threading
 import time
 
 from .models.game import Game
-from .models.move import Move
-from .models.snapshot import BoardSnapshot
+from .models.board import PackedBoard
+from .models.move import MoveLog
+from .models.snapshot import Timeline
 from .models.player import Player
 
 from . import rules
-from . import store as mem_store
-from .adapter import compute_best_move
-
-# In-memory fallback
-_MEM: Dict[str, Game] = {}
+from .bitboard import BitBoard, ThreatIndex, first_cell
+from . import store as game_store
+from .adapter import compute_best_move, ponder_replies
+from .config import (
+    AI_QUEUE_MAX, AI_WORKERS, PONDER, PONDER_BUDGET_MS, PONDER_MAX_GAMES, RESPONSE_CACHE_SIZE,
+    THREAT_DIFFICULTIES,
+)
+from .cache import LRUCache
+from .engine.threats import find_forced_win
+
+log = logging.getLogger(__name__)
 
 # ───────────────────────── constants ─────────────────────────
 SIZE_MIN, SIZE_MAX = 3, 8
@@ -24,25 +35,11 @@ K_MIN,   K_MAX     = 3, 5
 # ───────────────────────── storage helpers ─────────────────────────
 
 def _store_get(game_id: str) -> Optional[Game]:
-    if hasattr(mem_store, "get"):
-        return mem_store.get(game_id)
-    if hasattr(mem_store, "load"):
-        return mem_store.load(game_id)
-    if hasattr(mem_store, "get_game"):
-        return mem_store.get_game(game_id)
-    return _MEM.get(game_id)
+    return game_store.get_store().get(game_id)  # type: ignore[return-value]
 
 
 def _store_save(game: Game) -> None:
-    if hasattr(mem_store, "save"):
-        mem_store.save(game); return
-    if hasattr(mem_store, "put"):
-        mem_store.put(game.id, game); return
-    if hasattr(mem_store, "set"):
-        mem_store.set(game.id, game); return
-    if hasattr(mem_store, "save_game"):
-        mem_store.save_game(game); return
-    _MEM[game.id] = game
+    game_store.get_store().save(game)
 
 
 # ───────────────────────── utils ─────────────────────────
@@ -51,8 +48,8 @@ def _make_id() -> str:
     return f"{int(time.time() * 1000)}-{random.randint(1000, 9999)}"
 
 
-def _empty_board(n: int):
-    return [["." for _ in range(n)] for _ in range(n)]
+def _empty_board(n: int) -> PackedBoard:
+    return PackedBoard(n)
 
 
 def _normalize_mode(m: Optional[str]) -> str:
@@ -157,16 +154,14 @@ def _legal_moves(board: list[list[str]]) -> Iterable[Tuple[int, int]]:
                 yield (r, c)
 
 
-def _winning_move(board: list[list[str]], mark: str, k: int) -> Optional[Tuple[int, int]]:
-    """Najdi okamžitou výhru pro `mark` (1 tah)."""
-    for r, c in _legal_moves(board):
-        board[r][c] = mark
-        try:
-            if rules.check_winner(board, k) == mark:
-                return (r, c)
-        finally:
-            board[r][c] = "."
-    return None
+def _winning_move(
+    board: list[list[str]], mark: str, k: int, threats: Optional[ThreatIndex] = None,
+) -> Optional[Tuple[int, int]]:
+    """Najdi okamžitou výhru pro `mark` (1 tah) – první v row-major pořadí."""
+    if threats is not None:
+        return threats.first_win(mark)
+    bb = BitBoard.from_lists(board, k)
+    return first_cell(bb.immediate_wins(mark), bb.n)
 
 
 def _diagnose_mapping(board: list[list[str]], move: Tuple[int, int]) -> Dict[str, Tuple[int, int]]:
@@ -198,6 +193,36 @@ def _assert_turn_consistency(board: list[list[str]], player: str, start_mark: st
     )
 
 
+def _forced_ai_move(
+    board: list[list[str]],
+    ai_mark: str,
+    human_mark: str,
+    k: int,
+    difficulty: str,
+    threats: Optional[ThreatIndex] = None,
+) -> Optional[Tuple[int, int]]:
+    """
+    Tah, o kterém se nediskutuje (win-now, block-now, VCF/VCT); jinak None.
+    S `threats` (index hrozeb hry) jsou win/block-now jen lookup.
+    """
+    # 1) win-now
+    m = _winning_move(board, ai_mark, k, threats)
+    if m and _legal(board, *m):
+        return m
+
+    # 2) block-now
+    m = _winning_move(board, human_mark, k, threats)
+    if m and _legal(board, *m):
+        return m
+
+    # 2b) vynucená výhra souvislými hrozbami (přesnější a levnější než rollouty)
+    if difficulty in THREAT_DIFFICULTIES:
+        tr = find_forced_win(BitBoard.from_lists(board, k), ai_mark)
+        if tr is not None and _legal(board, *tr.move):
+            return tr.move
+    return None
+
+
 def _pick_ai_move_safe(
     board: list[list[str]],
     ai_mark: str,
@@ -206,21 +231,18 @@ def _pick_ai_move_safe(
     k: int,
     difficulty: str,
     precomputed_engine_move: Optional[Tuple[int, int]] = None,
+    threats: Optional[ThreatIndex] = None,
 ) -> Tuple[int, int]:
     """
     Bezpečný výběr tahu:
       1) vyhraj hned,
       2) zablokuj soupeřovu okamžitou výhru,
+      2b) zahraj vynucenou výhru ze threat-space search (VCF/VCT) – medium/hard,
       3) použij engine (pokud je předpočítaný, použij ten),
       3a) pokud engine vrátí nelegální souřadnice, oprav mapping, jinak první volné pole.
     """
-    # 1) win-now
-    m = _winning_move(board, ai_mark, k)
-    if m:
-        return m
-
-    # 2) block-now
-    m = _winning_move(board, human_mark, k)
+    # 1) – 2b) vynucené tahy
+    m = _forced_ai_move(board, ai_mark, human_mark, k, difficulty, threats)
     if m:
         return m
 
@@ -258,12 +280,19 @@ def _status_and_winner_for(g: Game) -> tuple[str, Optional[str]]:
     Normalizuj top-level status ('running' | 'win' | 'draw') a winner ('X'|'O'|None)
     z reálného stavu desky (nezávisle na tom, co je v g.status/g.winner).
     """
-    term = rules.check_winner(g.board, g.k_to_win)
+    status, winner, _ = _terminal_info(g)
+    return status, winner
+
+
+def _terminal_info(g: Game) -> tuple[str, Optional[str], list[dict]]:
+    """(status, winner, winningSequence) z jediného bitboardu – bez opakovaného skenu desky."""
+    bb = BitBoard.from_lists(g.board, g.k_to_win)
+    term = bb.winner()
     if term in ("X", "O"):
-        return "win", term
+        return "win", term, bb.winning_sequence()
     if term == "draw":
-        return "draw", None
-    return "running", None
+        return "draw", None, []
+    return "running", None, []
 
 
 # ───────────────────────── public store API ─────────────────────────
@@ -276,6 +305,23 @@ def save_game(game: Game) -> None:
     _store_save(game)
 
 
+def threat_index(g: Game) -> ThreatIndex:
+    """
+    Index hrozeb hry (okamžité výhry X/O jako lookup). Drží se na g.threats
+    a apply_move ho posouvá o tah; neodpovídá-li desce (hra ze store, deska
+    upravená mimo apply_move), postaví se znovu.
+    """
+    ti = g.threats
+    if ti is None or ti.k != g.k_to_win or ti.cells != g.board.cells:
+        ti = g.threats = ThreatIndex.from_board(g.board, g.k_to_win)
+    return ti
+
+
+def game_lock(game_id: str):
+    """`with game_lock(id):` – načti → uprav → ulož jedné hry bez proložení s jiným vláknem."""
+    return game_store.game_lock(game_id)
+
+
 # ───────────────────────── DTO ─────────────────────────
 
 def _move_to_dict(m: Any) -> dict:
@@ -288,18 +334,26 @@ def _move_to_dict(m: Any) -> dict:
     }
 
 
-def to_dto(g: Game) -> dict:
-    snaps = [{"ply": int(getattr(s, "ply", 0))} for s in getattr(g, "snapshots", [])]
-    hints = int(getattr(g, "hints_used", 0))
+def _board_lists(board: Any) -> list:
+    """Deska pro JSON: PackedBoard → list[list[str]] (konverzní vrstva modelu)."""
+    return board.to_lists() if isinstance(board, PackedBoard) else board
+
 
-    # --- timeElapsedMs: od startu do teď, resp. do ended_at ---
+def _elapsed_ms(g: Game) -> int:
+    """Od startu do teď, resp. do ended_at."""
     t0 = float(getattr(g, "created_at", 0) or 0.0)
     t1 = float(getattr(g, "ended_at", 0) or 0.0)
-    now = time.time()
-    if t0 > 0:
-        elapsed_ms = int(((t1 if (t1 and t1 >= t0) else now) - t0) * 1000)
-    else:
-        elapsed_ms = 0
+    if t0 <= 0:
+        return 0
+    return int(((t1 if (t1 and t1 >= t0) else time.time()) - t0) * 1000)
+
+
+def to_dto(g: Game, *, winning_seq: Optional[list] = None) -> dict:
+    # ply = pořadí na časové ose → bez skládání desek jednotlivých snapshotů
+    snaps = [{"ply": p} for p in range(len(getattr(g, "snapshots", ())))]
+    hints = int(getattr(g, "hints_used", 0))
+
+    elapsed_ms = _elapsed_ms(g)
 
     # --- players (pro FE: id, nickname, kind) ---
     px = g.players.get("X") if g.players else None
@@ -318,14 +372,15 @@ def to_dto(g: Game) -> dict:
     }
 
     # NEW: spočti výherní postupku (prázdné pole pokud není výhra)
-    winning_seq = _winning_sequence_for(g)
+    if winning_seq is None:
+        winning_seq = _winning_sequence_for(g)
 
     return {
         "id": g.id,
         "size": g.size,
         "k_to_win": g.k_to_win,
         "goal": g.k_to_win,          # alias očekávaný některými testy
-        "board": g.board,
+        "board": _board_lists(g.board),
         "player": g.player,
         "status": g.status,
         "winner": g.winner,
@@ -340,8 +395,13 @@ def to_dto(g: Game) -> dict:
         "hints_used": hints,     # snake_case kvůli starším testům
         "moves": len(g.history),
         "timeElapsedMs": elapsed_ms,
+        # stabilní v rámci verze: klient si z nich odpočítává čas i mezi 304 odpověďmi
+        "createdAt": int(float(g.created_at or 0) * 1000),
+        "endedAt": int(float(g.ended_at) * 1000) if g.ended_at else None,
         "difficulty": g.difficulty,
         "winningSequence": winning_seq,  # ← NEW (uvnitř "game")
+        "version": int(getattr(g, "version", 0) or 0),
+        "aiPending": bool(getattr(g, "ai_pending", False)),
     }
 
 
@@ -351,17 +411,20 @@ def to_response(g: Game) -> dict:
     - "game": ... (stávající DTO, nově i s game.winningSequence)
     - top-level "status" | "winner" | "winningSequence" (pro snadné čtení na FE)
     - pokud poslední /play zahrnul autoplay bota, přidej "ai" a "aiMove"
+    - tah AI se teprve počítá na pozadí → top-level "aiPending": true
     """
-    status, winner = _status_and_winner_for(g)
-    winning_seq = _winning_sequence_for(g)
+    status, winner, winning_seq = _terminal_info(g)
 
     ret = {
-        "game": to_dto(g),
+        "game": to_dto(g, winning_seq=winning_seq),
         "status": status,
         "winner": winner,
         "winningSequence": winning_seq,
     }
 
+    if getattr(g, "ai_pending", False):
+        ret["aiPending"] = True
+
     ai = getattr(g, "_last_ai", None)
     if isinstance(ai, dict) and "move" in ai:
         ret["ai"] = ai
@@ -447,8 +510,8 @@ def new_game(
         player=sm,
         status="running",
         winner=None,
-        history=[],
-        snapshots=[],
+        history=MoveLog(size),
+        snapshots=Timeline(size, board),
         mode=mode_norm,
         start_mark=sm,
         human_mark=hm,
@@ -460,12 +523,6 @@ def new_game(
         difficulty=diff,
     )
 
-    g.snapshots.append(BoardSnapshot(
-        ply=0,
-        board=deepcopy(g.board),
-        last_move=None
-    ))
-
     # Autoplay prvního tahu, pokud začíná AI (PvE) a start není random
     if (
         g.mode == "pve"
@@ -476,75 +533,83 @@ def new_game(
         ai_mark = g.player
         human   = "O" if ai_mark == "X" else "X"
         # bezpečný výběr prvního AI tahu
-        r, c = _pick_ai_move_safe(g.board, ai_mark, human, g.size, g.k_to_win, g.difficulty)
+        r, c = _pick_ai_move_safe(g.board, ai_mark, human, g.size, g.k_to_win, g.difficulty,
+                                  threats=threat_index(g))
         g = apply_move(g, r, c)
+        start_ponder(g)
 
     save_game(g)
     return g
 
 
+# ───────────────────────── cache odpovědí (ETag) ─────────────────────────
+#
+# Polling /status a /state: odpověď se serializuje jednou na verzi hry
+# (každé uložení verzi zvýší). Jediné pole, které se mění i bez tahu, je
+# game.timeElapsedMs – v cache je JSON rozdělený kolem jeho hodnoty a ta se
+# při čtení doplní čerstvá. ETag proto identifikuje stav hry (id + verze).
+
+RESPONSE_CACHE = LRUCache(RESPONSE_CACHE_SIZE)
+
+_ELAPSED_KEY = b'"timeElapsedMs":'
+_ELAPSED_MARK = -987654321012345
+
+
+def response_etag(g: Game) -> str:
+    # posílá se jako slabý ETag (W/"…"): tělo nese živé timeElapsedMs, takže
+    # odpovědi téže verze jsou sémanticky, ne bajtově shodné
+    return f"{g.id}-v{int(getattr(g, 'version', 0) or 0)}"
+
+
+def cached_response(g: Game) -> tuple[str, bytes]:
+    """(etag, JSON to_response) – z cache pro danou verzi, timeElapsedMs vždy aktuální."""
+    etag = response_etag(g)
+    parts = RESPONSE_CACHE.get(etag)
+    if parts is None:
+        body = to_response(g)
+        body["game"]["timeElapsedMs"] = _ELAPSED_MARK
+        raw = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        head, _, tail = raw.partition(_ELAPSED_KEY + str(_ELAPSED_MARK).encode("ascii"))
+        parts = (head + _ELAPSED_KEY, tail)
+        RESPONSE_CACHE.put(etag, parts)
+    head, tail = parts
+    return etag, head + str(_elapsed_ms(g)).encode("ascii") + tail
+
+
 # ───────────────────────── game updates ─────────────────────────
 
 def apply_move(g: Game, row: int, col: int) -> Game:
     # (volitelně) jednoduchý guard – pokud bys chtěla tvrdší validaci zde:
     # if g.board[row][col] != ".": raise ValueError("Cell already occupied")
 
+    # skutečný tah → spekulativní hledání pro tuto hru už nemá smysl
+    cancel_ponder(g.id)
+
     mark = g.player
     g.board[row][col] = mark
-
-    try:
-        g.history.append(Move(row=row, col=col, mark=mark))
-    except TypeError:
+    if g.threats is not None:
         try:
-            g.history.append(Move(row=row, col=col, player=mark))
-        except Exception:
-            class _MoveLite:
-                __slots__ = ("row", "col", "mark")
-                def __init__(self, r, c, m): self.row, self.col, self.mark = r, c, m
-            g.history.append(_MoveLite(row, col, mark))
-
-    term = rules.check_winner(g.board, g.k_to_win)
+            g.threats.play(row, col, mark)
+        except ValueError:
+            g.threats = None  # index neodpovídal desce → příště se postaví znovu
+
+    # timeline čte tahy z historie a desku pro ply skládá na požádání → jeden zápis
+    g.history.record(row, col, mark)
+
+    # výhru může způsobit jen právě položený kámen → stačí 4 linie přes (row, col)
+    if rules.find_winning_sequence_at(g.board, row, col, g.k_to_win):
+        term = mark
+    elif len(g.history) >= g.size * g.size:
+        term = "draw"
+    else:
+        term = None
     if term is None:
-        next_player = "O" if g.player == "X" else "X"
-        try:
-            lm = Move(row=row, col=col, mark=mark)
-        except TypeError:
-            try:
-                lm = Move(row=row, col=col, player=mark)
-            except Exception:
-                class _MoveLite:
-                    __slots__ = ("row", "col", "mark")
-                    def __init__(self, r, c, m): self.row, self.col, self.mark = r, c, m
-                lm = _MoveLite(row, col, mark)
-
-        g.snapshots.append(BoardSnapshot(
-            ply=len(g.history),
-            board=deepcopy(g.board),
-            last_move=lm,
-        ))
-        g.player = next_player
+        g.player = "O" if g.player == "X" else "X"
     else:
         g.status = "win" if term in ("X", "O") else "draw"
         g.winner = term if g.status == "win" else None
         g.ended_at = time.time()
 
-        try:
-            lm = Move(row=row, col=col, mark=mark)
-        except TypeError:
-            try:
-                lm = Move(row=row, col=col, player=mark)
-            except Exception:
-                class _MoveLite:
-                    __slots__ = ("row", "col", "mark")
-                    def __init__(self, r, c, m): self.row, self.col, self.mark = r, c, m
-                lm = _MoveLite(row, col, mark)
-
-        g.snapshots.append(BoardSnapshot(
-            ply=len(g.history),
-            board=deepcopy(g.board),
-            last_move=lm,
-        ))
-
     save_game(g)
     return g
 
@@ -565,32 +630,21 @@ def _is_ai_turn(g: Game) -> bool:
     )
 
 
-def maybe_ai_autoplay(g: Game, *, difficulty: str | None = None) -> Game:
+def _choose_ai_move(
+    board: Any, ai_mark: str, human_mark: str, size: int, k: int, diff: str,
+    threats: Optional[ThreatIndex] = None,
+) -> Tuple[int, int, int, int]:
     """
-    Pokud je po hráčově tahu na řadě AI, spočítá nejlepší tah a ihned ho provede.
-    Vrací aktualizovanou hru (stejnou referenci).
-    Dočasně uloží meta-info do g._last_ai, aby ho API mohlo vrátit v odpovědi /play.
-    Zaručí bezpečnost tahu (win/block/legality) i v případě zvláštností enginu.
+    Výpočet tahu AI bez zásahu do hry: (row, col, rollouts, elapsedMs).
+    Pracuje jen s deskou, takže může běžet nad kopií mimo zámek hry.
     """
-    if not _is_ai_turn(g):
-        return g
-
-    diff = _normalize_difficulty(difficulty or getattr(g, "difficulty", "easy") or "easy")
-
-    # kontrola konzistence (odhalí rozhozené start/player/paritu)
-    _assert_turn_consistency(g.board, g.player, g.start_mark)
-
-    current_player = g.player
-    human_mark = g.human_mark
-    ai_mark = "O" if human_mark == "X" else "X"
-
     # 1) zavoláme engine kvůli statistikám + návrhu tahu
     engine_move: Optional[Tuple[int, int]] = None
     rollouts = 0
     elapsed_ms = 0
     try:
         t0 = time.perf_counter()
-        bm = compute_best_move(g.board, ai_mark, g.size, g.k_to_win, difficulty=diff)
+        bm = compute_best_move(board, ai_mark, size, k, difficulty=diff)
         elapsed_ms = int((time.perf_counter() - t0) * 1000)
 
         if isinstance(bm, dict):
@@ -603,8 +657,8 @@ def maybe_ai_autoplay(g: Game, *, difficulty: str | None = None) -> Game:
 
             stats = bm.get("stats") or {}
             # robustně vytáhni rollouts (podpora různých klíčů)
-            for k in ("rollouts", "n_rollouts", "iterations", "sims"):
-                v = stats.get(k)
+            for k_ in ("rollouts", "n_rollouts", "iterations", "sims"):
+                v = stats.get(k_)
                 if v is not None:
                     try:
                         rollouts = int(v)
@@ -618,26 +672,291 @@ def maybe_ai_autoplay(g: Game, *, difficulty: str | None = None) -> Game:
     # 2) bezpečně zvol tah (win/block/legality + mapping),
     #    s preferencí engine_move pokud je k dispozici
     r, c = _pick_ai_move_safe(
-        g.board, ai_mark, human_mark, g.size, g.k_to_win, diff,
-        precomputed_engine_move=engine_move
+        board, ai_mark, human_mark, size, k, diff,
+        precomputed_engine_move=engine_move, threats=threats,
     )
+    return r, c, rollouts, elapsed_ms
+
 
-    # 3) aplikuj tah a ulož metadata pro odpověď
+def _apply_ai_move(g: Game, r: int, c: int, *, diff: str, rollouts: int, elapsed_ms: int) -> Game:
+    """Provede spočtený tah AI, uloží hru a meta pro odpověď do g._last_ai."""
+    current_player = g.player
+    g.ai_pending = False
+    # meta se nastaví před uložením v apply_move → má ji i uložená kopie (polling po async tahu)
+    g._last_ai = {
+        "move": [r, c],
+        "difficulty": diff,
+        "rollouts": rollouts,     # ← nyní předáváme skutečné rollouts (pokud je engine dal)
+        "elapsedMs": elapsed_ms,  # ← vždy máme čas volání engine (0 pouze při chybě)
+        "player": current_player,
+        "size": g.size,
+        "kToWin": g.k_to_win,
+    }
     try:
         g = apply_move(g, r, c)
-        g._last_ai = {
-            "move": [r, c],
-            "difficulty": diff,
-            "rollouts": rollouts,     # ← nyní předáváme skutečné rollouts (pokud je engine dal)
-            "elapsedMs": elapsed_ms,  # ← vždy máme čas volání engine (0 pouze při chybě)
-            "player": current_player,
-            "size": g.size,
-            "kToWin": g.k_to_win,
-        }
     except Exception:
         # i kdyby selhalo (nemělo by), ulož aspoň stav hry
+        g._last_ai = None
+        save_game(g)
+        return g
+    start_ponder(g)
+    return g
+
+
+def maybe_ai_autoplay(g: Game, *, difficulty: str | None = None) -> Game:
+    """
+    Pokud je po hráčově tahu na řadě AI, spočítá nejlepší tah a ihned ho provede.
+    Vrací aktualizovanou hru (stejnou referenci).
+    Dočasně uloží meta-info do g._last_ai, aby ho API mohlo vrátit v odpovědi /play.
+    Zaručí bezpečnost tahu (win/block/legality) i v případě zvláštností enginu.
+    """
+    if not _is_ai_turn(g):
+        return g
+
+    diff = _normalize_difficulty(difficulty or getattr(g, "difficulty", "easy") or "easy")
+
+    # kontrola konzistence (odhalí rozhozené start/player/paritu)
+    _assert_turn_consistency(g.board, g.player, g.start_mark)
+
+    human_mark = g.human_mark
+    ai_mark = "O" if human_mark == "X" else "X"
+
+    r, c, rollouts, elapsed_ms = _choose_ai_move(g.board, ai_mark, human_mark, g.size, g.k_to_win, diff,
+                                                 threat_index(g))
+    return _apply_ai_move(g, r, c, diff=diff, rollouts=rollouts, elapsed_ms=elapsed_ms)
+
+
+# ───────────────────────── asynchronní tah AI ─────────────────────────
+#
+# /play s async: lidský tah se uloží s příznakem ai_pending a odpověď odejde
+# hned; tah AI spočítá omezený pool vláken. Výpočet běží nad kopií desky
+# mimo zámek hry (zámek se drží jen na načtení a na zápis výsledku), takže
+# /status, /state ani další požadavky na hru na engine nečekají. Výsledek
+# zvedne verzi hry (ETag polling ho uvidí) a dostanou ho i posluchači
+# add_ai_listener (SSE /ai/events).
+
+_AI_POOL: Optional[ThreadPoolExecutor] = None
+_AI_LOCK = threading.Lock()
+_AI_INFLIGHT: set[str] = set()
+_AI_LISTENERS: Dict[str, list] = {}
+
+
+def _ai_pool() -> ThreadPoolExecutor:
+    global _AI_POOL
+    with _AI_LOCK:
+        if _AI_POOL is None:
+            _AI_POOL = ThreadPoolExecutor(max_workers=max(1, AI_WORKERS), thread_name_prefix="ttt-ai")
+        return _AI_POOL
+
+
+def ai_jobs_stats() -> dict:
+    with _AI_LOCK:
+        return {"workers": max(1, AI_WORKERS), "queueMax": AI_QUEUE_MAX, "inflight": len(_AI_INFLIGHT)}
+
+
+def add_ai_listener(game_id: str, q: "queue.Queue") -> None:
+    with _AI_LOCK:
+        _AI_LISTENERS.setdefault(game_id, []).append(q)
+
+
+def remove_ai_listener(game_id: str, q: "queue.Queue") -> None:
+    with _AI_LOCK:
+        subs = _AI_LISTENERS.get(game_id)
+        if subs and q in subs:
+            subs.remove(q)
+            if not subs:
+                del _AI_LISTENERS[game_id]
+
+
+def _notify_ai(game_id: str, payload: dict) -> None:
+    with _AI_LOCK:
+        subs = list(_AI_LISTENERS.get(game_id, ()))
+    for q in subs:
+        try:
+            q.put_nowait(payload)
+        except queue.Full:
+            pass
+
+
+def _submit_ai_job(game_id: str) -> bool:
+    """Zařadí výpočet tahu AI; False pokud už běží nebo je fronta plná."""
+    with _AI_LOCK:
+        if game_id in _AI_INFLIGHT or len(_AI_INFLIGHT) >= AI_QUEUE_MAX:
+            return False
+        _AI_INFLIGHT.add(game_id)
+    try:
+        _ai_pool().submit(_ai_job, game_id)
+    except RuntimeError:
+        # pool se vypíná (konec procesu)
+        with _AI_LOCK:
+            _AI_INFLIGHT.discard(game_id)
+        return False
+    return True
+
+
+def request_ai_move(g: Game) -> bool:
+    """
+    Naplánuje tah AI na pozadí (volající drží game_lock a hru má načtenou).
+    True → hra je uložená s ai_pending a tah dorazí později;
+    False → pool je plný, volající má táhnout synchronně (maybe_ai_autoplay).
+    """
+    if not _is_ai_turn(g):
+        return False
+    # job se zařadí před uložením: na zámek hry, který volající drží, stejně počká
+    if not _submit_ai_job(g.id):
+        return False
+    g.ai_pending = True
+    g._last_ai = None
+    try:
+        save_game(g)
+    except Exception:
+        # job po odemčení nenajde ai_pending a skončí naprázdno
+        g.ai_pending = False
+        raise
+    return True
+
+
+def ensure_ai_move(g: Game) -> None:
+    """Polling: hra čeká na AI, ale tady žádný výpočet neběží (restart, jiný worker) → zařaď."""
+    if getattr(g, "ai_pending", False):
+        _submit_ai_job(g.id)
+
+
+def _clear_ai_pending(game_id: str) -> None:
+    # nevalidní pozice apod.: bez příznaku by ji každý polling zařadil znovu
+    try:
+        with game_lock(game_id):
+            g = get_game(game_id)
+            if g is not None and g.ai_pending:
+                g.ai_pending = False
+                save_game(g)
+    except Exception:
+        log.exception("cannot clear ai_pending for game %s", game_id)
+
+
+def _ai_job(game_id: str) -> None:
+    retry = False
+    try:
+        # 1) snímek pozice pod zámkem
+        with game_lock(game_id):
+            g = get_game(game_id)
+            if g is None or not g.ai_pending:
+                return
+            if not _is_ai_turn(g):
+                g.ai_pending = False
+                save_game(g)
+                return
+            _assert_turn_consistency(g.board, g.player, g.start_mark)
+            ply = len(g.history)
+            board = g.board.copy()
+            threats = threat_index(g).copy()
+            human_mark = g.human_mark
+            ai_mark = "O" if human_mark == "X" else "X"
+            size, k = g.size, g.k_to_win
+            diff = _normalize_difficulty(g.difficulty)
+
+        # 2) engine bez zámku
+        r, c, rollouts, elapsed_ms = _choose_ai_move(board, ai_mark, human_mark, size, k, diff, threats)
+
+        # 3) zápis jen nad stejnou pozicí; jiné uložení (nápověda → hints_used) tah nezahodí
+        with game_lock(game_id):
+            g = get_game(game_id)
+            if g is None or not g.ai_pending:
+                return
+            if len(g.history) != ply or g.board.cells != board.cells:
+                # pozice se změnila a AI je pořád na tahu → spočítat znovu
+                retry = True
+                return
+            g = _apply_ai_move(g, r, c, diff=diff, rollouts=rollouts, elapsed_ms=elapsed_ms)
+            payload = to_response(g)
+        _notify_ai(game_id, payload)
+    except game_store.StaleWriteError:
+        # tah uložil jiný proces (sdílený Redis) → jeho výsledek platí
         pass
+    except Exception:
+        log.exception("async AI move failed for game %s", game_id)
+        _clear_ai_pending(game_id)
     finally:
-        save_game(g)
+        with _AI_LOCK:
+            _AI_INFLIGHT.discard(game_id)
+        if retry:
+            _submit_ai_job(game_id)
+
+
+# ───────────────────────── pondering ─────────────────────────
+#
+# TTT_PONDER=1: po tahu AI jedno vlákno na pozadí předpočítá tahy AI pro
+# nejpravděpodobnější odpovědi člověka (adapter.ponder_replies) do
+# BEST_MOVE_TT; další maybe_ai_autoplay pak většinou jen čte z cache.
+# Skutečný tah (apply_move) přemýšlení nad danou hrou zruší.
+
+_PONDER_POOL: Optional[ThreadPoolExecutor] = None
+_PONDER_LOCK = threading.Lock()
+_PONDER_SESSIONS: Dict[str, threading.Event] = {}
+_PONDER_STATS = {"started": 0, "cancelled": 0, "skipped": 0, "searched": 0, "cached": 0}
+
+
+def _ponder_pool() -> ThreadPoolExecutor:
+    global _PONDER_POOL
+    with _PONDER_LOCK:
+        if _PONDER_POOL is None:
+            # jedno vlákno: přemýšlení nesmí ubírat CPU skutečným požadavkům víc než jedním jádrem
+            _PONDER_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ttt-ponder")
+        return _PONDER_POOL
+
+
+def ponder_stats() -> dict:
+    with _PONDER_LOCK:
+        return {"enabled": PONDER, "active": len(_PONDER_SESSIONS), **_PONDER_STATS}
+
+
+def cancel_ponder(game_id: str) -> None:
+    if not _PONDER_SESSIONS:
+        return
+    with _PONDER_LOCK:
+        ev = _PONDER_SESSIONS.pop(game_id, None)
+        if ev is not None:
+            ev.set()
+            _PONDER_STATS["cancelled"] += 1
+
+
+def start_ponder(g: Game, *, force: bool = False) -> bool:
+    """Naplánuje přemýšlení nad hrou, kde je na tahu člověk (PvE); False = nic nespuštěno."""
+    if not (PONDER or force):
+        return False
+    if g.mode != "pve" or g.status != "running" or g.player != g.human_mark:
+        return False
+    ai_mark = "O" if g.human_mark == "X" else "X"
+    ev = threading.Event()
+    with _PONDER_LOCK:
+        old = _PONDER_SESSIONS.pop(g.id, None)
+        if old is not None:
+            old.set()
+        if len(_PONDER_SESSIONS) >= PONDER_MAX_GAMES:
+            _PONDER_STATS["skipped"] += 1
+            return False
+        _PONDER_SESSIONS[g.id] = ev
+        _PONDER_STATS["started"] += 1
+    _ponder_pool().submit(
+        _ponder_job, g.id, ev, g.board.to_lists(), g.human_mark, ai_mark,
+        g.size, g.k_to_win, _normalize_difficulty(g.difficulty),
+    )
+    return True
 
-    return g
+
+def _ponder_job(game_id: str, ev: threading.Event, board: list, human_mark: str, ai_mark: str,
+                size: int, k: int, diff: str) -> None:
+    try:
+        if ev.is_set():
+            return
+        res = ponder_replies(board, human_mark, ai_mark, size, k, difficulty=diff,
+                             cancel=ev, budget_ms=PONDER_BUDGET_MS)
+        with _PONDER_LOCK:
+            _PONDER_STATS["searched"] += res["searched"]
+            _PONDER_STATS["cached"] += res["cached"]
+    except Exception:
+        log.exception("pondering failed for game %s", game_id)
+    finally:
+        with _PONDER_LOCK:
+            if _PONDER_SESSIONS.get(game_id) is ev:
+                del _PONDER_SESSIONS[game_id]
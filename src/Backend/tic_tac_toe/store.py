@@ -1,42 +1,280 @@
 from __future__ import annotations
-from typing import Optional, Dict, Tuple
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import heapq
+import threading
 import time
+import zlib
 
-# In-memory store s TTL (snadná výměna za Redis)
-_MEM: Dict[str, Tuple[object, float]] = {}
-_TTL_SEC = 2 * 60 * 60  # 2 hodiny
+from .config import STORE_SHARDS, STORE_TTL_SEC, STORE_URL
+
+# Úložiště her: rozhraní + implementace vybraná přes TTT_STORE_URL
+#   memory://                  – procesní dict s TTL (default, jeden worker)
+#   redis://[:heslo@]host:port/db – sdílené mezi workery/hosty (redis_store.py)
+#
+# Souběžnost:
+#   - game_lock(id) serializuje read-modify-write jedné hry v rámci procesu
+#     (zámky jsou po shardech → různé hry o zámek nesoupeří)
+#   - save() je compare-and-swap nad Game.version: uloží se jen, pokud má
+#     hra stejnou verzi jako záznam ve store, jinak StaleWriteError
+#     (chytí i souběh mezi workery, kam procesní zámek nedosáhne)
+
+
+class StaleWriteError(Exception):
+    """Ukládaná hra vychází ze zastaralé verze (mezitím ji uložil někdo jiný)."""
+
+    def __init__(self, game_id: str, expected: int, actual: int):
+        super().__init__(f"stale write for game {game_id}: version {expected}, stored {actual}")
+        self.game_id = game_id
+        self.expected = expected
+        self.actual = actual
+
+
+def _shard_of(game_id: str, shards: int) -> int:
+    # crc32 je stabilní mezi procesy (na rozdíl od hash() s PYTHONHASHSEED)
+    return zlib.crc32(game_id.encode("utf-8")) % shards
+
+
+class GameStore(ABC):
+    """Rozhraní úložiště her (hodnoty = Game, klíč = game.id)."""
+
+    ttl_sec: int = STORE_TTL_SEC
+
+    @abstractmethod
+    def get(self, game_id: str) -> Optional[object]:
+        ...
+
+    @abstractmethod
+    def save(self, game: object) -> None:
+        """Ulož hru (CAS nad game.version); po úspěchu se game.version zvýší o 1."""
+
+    @abstractmethod
+    def delete(self, game_id: str) -> bool:
+        ...
+
+    def get_many(self, game_ids: Iterable[str]) -> List[Optional[object]]:
+        return [self.get(gid) for gid in game_ids]
+
+    def save_many(self, games: Iterable[object]) -> None:
+        for g in games:
+            self.save(g)
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__}
+
+    def set_ttl(self, seconds: int) -> None:
+        """Možnost přepnout TTL (min 60s)."""
+        self.ttl_sec = max(60, int(seconds))
+
+    def close(self) -> None:
+        pass
+
+
+class _Shard:
+    """Jeden shard MemoryStore: vlastní dict, halda expirací a zámek."""
+
+    __slots__ = ("mem", "heap", "lock", "evictions")
+
+    def __init__(self):
+        self.mem: Dict[str, Tuple[object, float, int]] = {}   # id -> (hra, expire_at, verze)
+        self.heap: List[Tuple[float, str]] = []
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def purge_expired(self, now: float) -> None:
+        heap, mem = self.heap, self.mem
+        while heap and heap[0][0] < now:
+            exp, gid = heapq.heappop(heap)
+            item = mem.get(gid)
+            # jen pokud záznam v haldě odpovídá aktuální expiraci (jinak je zastaralý)
+            if item is not None and item[1] == exp:
+                del mem[gid]
+                self.evictions += 1
+        if len(heap) > 2 * len(mem) + 64:
+            self.heap = [(item[1], gid) for gid, item in mem.items()]
+            heapq.heapify(self.heap)
+
+
+class MemoryStore(GameStore):
+    """
+    In-memory store s TTL – hry se drží jako objekty (bez serializace), ale
+    save i get pracují s kopií (Game.copy): každý čtenář dostane vlastní
+    instanci, takže CAS nad version pozná i zastaralou kopii z téhož procesu.
+
+    Hry jsou rozdělené do shardů podle id; každý shard má vlastní zámek,
+    takže operace nad různými hrami na sebe (skoro) nečekají.
+
+    Expirace přes min-haldu (expire_at, game_id) v každém shardu: operace
+    odebere jen prošlé položky z vrcholu haldy → amortizovaně O(log n) místo
+    průchodu celého dictu. Přeuložení hry nechá v haldě starý záznam, který
+    se při výběru přeskočí (líné mazání); halda se občas zkompaktní.
+    """
+
+    def __init__(self, ttl_sec: int = STORE_TTL_SEC, shards: int = STORE_SHARDS):
+        self.ttl_sec = ttl_sec
+        self._shards = [_Shard() for _ in range(max(1, int(shards)))]
+
+    def _shard(self, game_id: str) -> _Shard:
+        return self._shards[_shard_of(game_id, len(self._shards))]
+
+    @property
+    def evictions(self) -> int:
+        return sum(sh.evictions for sh in self._shards)
+
+    def sweep(self) -> None:
+        """Odstraň prošlé hry (lze volat i z periodického úklidu)."""
+        now = _now()
+        for sh in self._shards:
+            with sh.lock:
+                sh.purge_expired(now)
+
+    def get(self, game_id: str) -> Optional[object]:
+        sh = self._shard(game_id)
+        with sh.lock:
+            sh.purge_expired(_now())
+            item = sh.mem.get(game_id)
+            if not item:
+                return None
+            return item[0].copy()
+
+    def save(self, game: object) -> None:
+        gid = game.id  # type: ignore[attr-defined]
+        version = int(getattr(game, "version", 0) or 0)
+        sh = self._shard(gid)
+        with sh.lock:
+            now = _now()
+            sh.purge_expired(now)
+            item = sh.mem.get(gid)
+            if item is not None and item[2] != version:
+                raise StaleWriteError(gid, version, item[2])
+            exp = now + self.ttl_sec
+            game.version = version + 1  # type: ignore[attr-defined]
+            sh.mem[gid] = (game.copy(), exp, version + 1)  # type: ignore[attr-defined]
+            heapq.heappush(sh.heap, (exp, gid))
+
+    def delete(self, game_id: str) -> bool:
+        sh = self._shard(game_id)
+        with sh.lock:
+            return sh.mem.pop(game_id, None) is not None
+
+    def clear(self) -> None:
+        for sh in self._shards:
+            with sh.lock:
+                sh.mem.clear()
+                sh.heap.clear()
+                sh.evictions = 0
+
+    def __len__(self) -> int:
+        return sum(len(sh.mem) for sh in self._shards)
+
+    def stats(self) -> dict:
+        self.sweep()
+        return {
+            "backend": "memory",
+            "live": len(self),
+            "evictions": self.evictions,
+            "heapSize": sum(len(sh.heap) for sh in self._shards),
+            "shards": len(self._shards),
+            "ttlSec": self.ttl_sec,
+        }
 
 
 def _now() -> float:
     return time.time()
 
 
-def _purge_expired() -> None:
-    now = _now()
-    dead = [k for k, (_, exp) in _MEM.items() if exp < now]
-    for k in dead:
-        _MEM.pop(k, None)
+# ───────────────────────── zámky her ─────────────────────────
+
+class _LockTable:
+    """
+    Procesní zámky her: RLock na hru, vzniká při prvním použití a zaniká,
+    jakmile ho nikdo nedrží ani na něj nečeká (počítadlo referencí).
+    Tabulka je rozdělená do shardů, aby si vlákna nad různými hrami
+    nepřekážela ani při zakládání/rušení zámků.
+    """
+
+    def __init__(self, shards: int = STORE_SHARDS):
+        self._shards: List[Tuple[threading.Lock, Dict[str, list]]] = [
+            (threading.Lock(), {}) for _ in range(max(1, int(shards)))
+        ]
+
+    @contextmanager
+    def hold(self, game_id: str) -> Iterator[None]:
+        guard, table = self._shards[_shard_of(game_id, len(self._shards))]
+        with guard:
+            entry = table.get(game_id)
+            if entry is None:
+                entry = table[game_id] = [threading.RLock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    table.pop(game_id, None)
+
+    def __len__(self) -> int:
+        return sum(len(t) for _, t in self._shards)
+
+
+_LOCKS = _LockTable()
+
+
+def game_lock(game_id: str):
+    """`with game_lock(id):` – výhradní read-modify-write jedné hry (reentrantní)."""
+    return _LOCKS.hold(game_id)
+
+
+def create_store(url: Optional[str] = None) -> GameStore:
+    """Store podle URL (memory:// | redis://…)."""
+    url = (url or STORE_URL or "memory://").strip()
+    if url.startswith(("redis://", "rediss://")):
+        from .redis_store import RedisStore
+        return RedisStore(url, ttl_sec=STORE_TTL_SEC)
+    if url.startswith("memory://") or not url:
+        return MemoryStore()
+    raise ValueError(f"Unsupported TTT_STORE_URL: {url}")
+
+
+_STORE: Optional[GameStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> GameStore:
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = create_store()
+    return _STORE
+
+
+def use_store(store: GameStore) -> GameStore:
+    """Přepni aktivní store (testy, app factory); vrací předchozí."""
+    global _STORE
+    with _STORE_LOCK:
+        prev = _STORE if _STORE is not None else create_store()
+        _STORE = store
+    return prev
+
 
+# ── zpětně kompatibilní modulové API ──
 
 def get(game_id: str) -> Optional[object]:
-    _purge_expired()
-    item = _MEM.get(game_id)
-    if not item:
-        return None
-    game, exp = item
-    if exp < _now():
-        _MEM.pop(game_id, None)
-        return None
-    return game
+    return get_store().get(game_id)
 
 
 def save(game: object) -> None:
-    _purge_expired()
-    expire_at = _now() + _TTL_SEC
-    _MEM[game.id] = (game, expire_at)
+    get_store().save(game)
 
 
 def set_ttl(seconds: int) -> None:
     """Možnost přepnout TTL (min 60s)."""
-    global _TTL_SEC
-    _TTL_SEC = max(60, int(seconds))
+    get_store().set_ttl(seconds)
@@ -0,0 +1,117 @@
+import http.client
+import socket
+import threading
+import time
+
+import pytest
+
+import tic_tac_toe as ttt
+from tic_tac_toe import asgi
+from tic_tac_toe import service as svc
+
+
+@pytest.fixture()
+def server():
+    with asgi.AsyncEventServer(asgi.app) as srv:
+        yield srv
+
+
+def _new_spectator(client, delay_ms=0):
+    body = {"size": 3, "kToWin": 3, "difficulty": "easy", "moveDelayMs": delay_ms}
+    r = client.post("/api/tictactoe/spectator/new", json=body)
+    assert r.status_code == 200
+    return r.get_json()["gameId"]
+
+
+def _get(srv, path, headers=None):
+    conn = http.client.HTTPConnection(srv.host, srv.port, timeout=20)
+    conn.request("GET", path, headers=headers or {})
+    resp = conn.getresponse()
+    return resp, resp.read().decode("utf-8")
+
+
+def _frames(text):
+    out = []
+    for block in text.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in lines:
+            out.append((int(lines["id"]) if "id" in lines else None, lines["event"]))
+    return out
+
+
+def test_stream_until_end(client, server):
+    gid = _new_spectator(client, delay_ms=20)
+    resp, text = _get(server, f"{asgi.EVENTS_PATH}?gameId={gid}")
+    assert resp.status == 200 and resp.getheader("content-type") == "text/event-stream"
+    frames = _frames(text)
+    assert frames[0][1] == "state" and frames[-1][1] == "end"
+    moves = [seq for seq, e in frames if e == "move"]
+    assert moves == list(range(frames[0][0] + 1, frames[-1][0]))
+    assert svc.get_game(gid).status in ("win", "draw")
+
+
+def test_last_event_id_resume(client, server):
+    gid = _new_spectator(client)
+    resp, text = _get(server, f"{asgi.EVENTS_PATH}?gameId={gid}&lastEventId=0")
+    full = _frames(text)
+    assert [seq for seq, _ in full] == list(range(1, len(full) + 1))
+    _, text = _get(server, f"{asgi.EVENTS_PATH}?gameId={gid}", headers={"Last-Event-ID": "2"})
+    resumed = _frames(text)
+    assert resumed[0][0] == 3 and resumed[-1][1] == "end" and "state" not in [e for _, e in resumed]
+
+
+def test_errors(client, server):
+    resp, text = _get(server, f"{asgi.EVENTS_PATH}?gameId={_new_spectator(client)}&format=xml")
+    assert resp.status == 400
+    resp, text = _get(server, asgi.EVENTS_PATH)
+    assert resp.status == 400 and "BadRequest" in text
+    resp, text = _get(server, f"{asgi.EVENTS_PATH}?gameId=nope")
+    assert resp.status == 404
+    resp, _ = _get(server, "/api/tictactoe/meta")
+    assert resp.status == 404
+
+
+def test_idle_connections_do_not_cost_threads(client, server):
+    gid = _new_spectator(client, delay_ms=60_000)
+    threads_before = threading.active_count()
+    socks = []
+    try:
+        for _ in range(200):
+            s = socket.create_connection((server.host, server.port))
+            s.sendall(f"GET {asgi.EVENTS_PATH}?gameId={gid} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+            socks.append(s)
+        deadline = time.time() + 10
+        while asgi.stats()["connections"] < 200 and time.time() < deadline:
+            time.sleep(0.02)
+        assert asgi.stats()["connections"] == 200
+        # snímky obsluhuje sdílený executor smyčky; per-spojení vlákna nevznikají
+        assert threading.active_count() <= threads_before + 40
+        # všichni čekající dostanou další tah jedním publish z vlákna driveru
+        ttt.events.publish(gid, "move", {"row": 0, "col": 0})
+        for s in socks[:5]:
+            s.settimeout(5)
+            buf = b""
+            while b"event: move" not in buf:
+                chunk = s.recv(65536)
+                assert chunk
+                buf += chunk
+    finally:
+        for s in socks:
+            s.close()
+        ttt._SPECTATOR_REG[gid].stop.set()
+    deadline = time.time() + 10
+    while asgi.stats()["connections"] and time.time() < deadline:
+        time.sleep(0.02)
+    assert asgi.stats()["connections"] == 0
+
+
+def test_finished_game_replays_log_without_driver(client, server, monkeypatch):
+    gid = _new_spectator(client)
+    _get(server, f"{asgi.EVENTS_PATH}?gameId={gid}")
+    assert svc.get_game(gid).status in ("win", "draw")
+    started = []
+    monkeypatch.setattr(ttt, "_start_driver", lambda *a, **kw: started.append(a))
+    _, text = _get(server, f"{asgi.EVENTS_PATH}?gameId={gid}", headers={"Last-Event-ID": "2"})
+    resumed = _frames(text)
+    assert resumed[0][0] == 3 and resumed[-1][1] == "end"
+    assert started == []
@@ -0,0 +1,47 @@
+URL = "/api/tictactoe/best-move/batch"
+
+
+def _pos(board, player="X", difficulty="easy"):
+    return {"board": [list(r) for r in board], "player": player, "size": len(board),
+            "kToWin": 3, "difficulty": difficulty}
+
+
+# X vyhraje na (0, 2); druhá deska je tatáž pozice otočená o 90° (výhra na (2, 2))
+WIN = ["XX.", ".O.", "..O"]
+WIN_ROT = ["..X", ".OX", "O.."]
+OPEN = ["X..", "...", "..."]
+
+
+def test_batch_dedupes_symmetric_positions_and_keeps_order(client):
+    r = client.post(URL, json={"positions": [
+        _pos(WIN, difficulty="hard"),
+        _pos(OPEN, player="O"),
+        _pos(WIN_ROT, difficulty="hard"),
+        _pos(WIN, difficulty="hard"),
+    ], "timeBudgetMs": 2000})
+    assert r.status_code == 200
+    j = r.get_json()
+    res = j["results"]
+    assert [x["move"] for x in (res[0], res[2], res[3])] == [[0, 2], [2, 2], [0, 2]]
+    assert res[2]["stats"]["dedupe"] == "symmetric" and res[2]["stats"]["dedupeOf"] == 0
+    assert res[3]["stats"]["dedupe"] == "identical"
+    assert res[1]["move"] != [0, 0] and "dedupe" not in res[1]["stats"]
+    assert j["meta"]["count"] == 4 and j["meta"]["unique"] == 2
+    assert j["meta"]["elapsedMs"] <= 2000 + 500
+
+
+def test_batch_reports_invalid_positions_in_place(client):
+    terminal = _pos(["XXX", "OO.", "..."], player="O")
+    r = client.post(URL, json=[_pos(OPEN, player="O"), {"board": [], "size": 3, "kToWin": 3}, terminal])
+    assert r.status_code == 200
+    res = r.get_json()["results"]
+    assert "move" in res[0]
+    assert res[1]["error"]["code"] == "InvalidInput"
+    assert res[2]["error"]["code"] == "GameOver" and res[2]["error"]["meta"]["winner"] == "X"
+
+
+def test_batch_limits(client):
+    assert client.post(URL, json={"positions": []}).status_code == 400
+    too_many = [_pos(OPEN, player="O")] * 1000
+    r = client.post(URL, json={"positions": too_many})
+    assert r.status_code == 400 and r.get_json()["error"]["meta"]["max"] >= 1
@@ -0,0 +1,59 @@
+import json
+
+
+def _events(resp):
+    """Rozparsuj SSE tělo na [(event, data)]."""
+    out = []
+    for block in resp.get_data(as_text=True).split("\n\n"):
+        ev, data = None, None
+        for line in block.splitlines():
+            if line.startswith("event: "):
+                ev = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+        if ev:
+            out.append((ev, data))
+    return out
+
+
+def test_stream_emits_progress_then_done(client):
+    board = [["." for _ in range(7)] for _ in range(7)]
+    r = client.post("/api/tictactoe/best-move/stream", json={
+        "board": board, "size": 7, "kToWin": 5, "player": "X",
+        "difficulty": "hard", "intervalMs": 50,
+    })
+    assert r.status_code == 200
+    assert r.headers["Content-Type"].startswith("text/event-stream")
+    events = _events(r)
+    kinds = [e for e, _ in events]
+    assert kinds[-1] == "done" and kinds.count("done") == 1
+    assert "progress" in kinds
+    progress = [d for e, d in events if e == "progress"]
+    assert all(len(p["move"]) == 2 and "score" in p for p in progress)
+    assert [p["rollouts"] for p in progress] == sorted(p["rollouts"] for p in progress)
+    done = events[-1][1]
+    assert done["stats"]["rollouts"] >= progress[-1]["rollouts"]
+    assert "explainRich" in done and "analysis" in done
+
+
+def test_stream_forced_move_is_immediate(client):
+    board = [["X", "X", "."], ["O", "O", "."], [".", ".", "."]]
+    r = client.get("/api/tictactoe/best-move/stream", query_string={
+        "board": json.dumps(board), "size": 3, "kToWin": 3, "player": "X",
+    })
+    events = _events(r)
+    assert [e for e, _ in events] == ["done"]
+    assert events[0][1]["move"] == [0, 2]
+
+
+def test_stream_by_game_id_and_errors(client):
+    gid = client.post("/api/tictactoe/new", json={"size": 3, "kToWin": 3}).get_json()["game"]["id"]
+    r = client.get("/api/tictactoe/best-move/stream", query_string={"gameId": gid})
+    events = _events(r)
+    assert events[-1][0] == "done"
+    r0, c0 = events[-1][1]["move"]
+    assert 0 <= r0 < 3 and 0 <= c0 < 3
+
+    assert client.get("/api/tictactoe/best-move/stream", query_string={"gameId": "nope"}).status_code == 404
+    r = client.post("/api/tictactoe/best-move/stream", json={"board": [["."]], "size": 1, "kToWin": 3})
+    assert r.status_code == 400
@@ -0,0 +1,45 @@
+from tic_tac_toe.explain import EXPLAIN_CACHE, build_explanation
+
+BOARD = [
+    ["X", "X", ".", "."],
+    ["O", "O", ".", "."],
+    [".", ".", ".", "."],
+    [".", ".", ".", "."],
+]
+
+
+def _best_move(client, **extra):
+    body = {"board": BOARD, "player": "X", "size": 4, "kToWin": 3, "difficulty": "easy", **extra}
+    r = client.post("/api/tictactoe/best-move", json=body)
+    assert r.status_code == 200
+    return r.get_json()
+
+
+def test_full_is_default_and_cached(client):
+    a = _best_move(client)
+    hits = EXPLAIN_CACHE.hits
+    b = _best_move(client)
+    assert a["explainRich"] == b["explainRich"] == build_explanation(BOARD, a["move"], "X", 4, 3)
+    assert a["explainRich"]["reasons"][0]["type"] == "win_now"
+    assert EXPLAIN_CACHE.hits > hits
+
+
+def test_none_skips_explanation(client):
+    body = _best_move(client, explain="none")
+    assert "explainRich" not in body and "explainKey" not in body
+    assert body["move"] == [0, 2] and body["explain"]
+
+
+def test_lazy_returns_key_resolved_on_demand(client):
+    body = _best_move(client, explain="lazy")
+    assert "explainRich" not in body and body["explainUrl"].endswith(body["explainKey"])
+    r = client.get(body["explainUrl"])
+    assert r.status_code == 200
+    assert r.get_json()["explainRich"] == build_explanation(BOARD, body["move"], "X", 4, 3)
+    assert client.get("/api/tictactoe/explain/deadbeef").status_code == 404
+
+
+def test_batch_honours_mode(client):
+    pos = {"board": BOARD, "player": "X", "size": 4, "kToWin": 3, "difficulty": "easy"}
+    r = client.post("/api/tictactoe/best-move/batch", json={"positions": [pos, pos], "explain": "none"})
+    assert all("explainRich" not in res for res in r.get_json()["results"])
@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+
+from tic_tac_toe import service as svc
+
+
+def _new_pve(client, size=5, k=4):
+    body = {"size": size, "kToWin": k, "mode": "pve", "humanMark": "X", "startMark": "X", "difficulty": "easy"}
+    return client.post("/api/tictactoe/new", json=body).get_json()["game"]["id"]
+
+
+def _wait_ai(client, gid, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        body = client.get(f"/api/tictactoe/status/{gid}").get_json()
+        if not body["game"]["aiPending"]:
+            return body
+        time.sleep(0.02)
+    raise AssertionError("AI move did not arrive")
+
+
+def test_async_play_returns_pending_then_ai_moves(client, monkeypatch):
+    gid = _new_pve(client)
+    release = threading.Event()
+    orig = svc._choose_ai_move
+
+    def slow_choose(*a, **kw):
+        release.wait(5.0)
+        return orig(*a, **kw)
+
+    monkeypatch.setattr(svc, "_choose_ai_move", slow_choose)
+
+    r = client.post("/api/tictactoe/play", json={"gameId": gid, "row": 2, "col": 2, "async": True})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["aiPending"] is True and body["game"]["aiPending"] is True
+    assert "aiMove" not in body and body["game"]["moves"] == 1 and body["game"]["player"] == "O"
+
+    # během výpočtu: polling nečeká na engine a další tah člověka je odmítnut
+    st = client.get(f"/api/tictactoe/status/{gid}")
+    assert st.status_code == 200 and st.get_json()["game"]["aiPending"] is True
+    etag = st.headers["ETag"]
+    r2 = client.post("/api/tictactoe/play", json={"gameId": gid, "row": 0, "col": 0})
+    assert r2.status_code == 409 and r2.get_json()["error"]["code"] == "AiPending"
+
+    release.set()
+    done = _wait_ai(client, gid)
+    assert done["game"]["moves"] == 2 and done["game"]["player"] == "X"
+    assert done["aiMove"] == done["ai"]["move"] and done["game"]["history"][1]["mark"] == "O"
+    assert client.get(f"/api/tictactoe/status/{gid}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_sync_play_unchanged_by_default(client):
+    gid = _new_pve(client, 3, 3)
+    body = client.post("/api/tictactoe/play", json={"gameId": gid, "row": 1, "col": 1}).get_json()
+    assert "aiPending" not in body and body["game"]["aiPending"] is False
+    assert body["game"]["moves"] == 2 and body["aiMove"]
+
+
+def test_ai_events_stream_delivers_move(client):
+    gid = _new_pve(client, 3, 3)
+    client.post("/api/tictactoe/play", json={"gameId": gid, "row": 1, "col": 1, "async": True})
+    r = client.get(f"/api/tictactoe/ai/events?gameId={gid}")
+    text = r.get_data(as_text=True)
+    event = next(line for line in text.splitlines() if line.startswith("event:")).split(":", 1)[1].strip()
+    data = json.loads(next(line for line in text.splitlines() if line.startswith("data:")).split(":", 1)[1])
+    # tah mohl doběhnout ještě před připojením → "state", jinak "ai"
+    assert event in ("ai", "state")
+    assert data["game"]["moves"] == 2 and data["game"]["aiPending"] is False
+
+
+def test_pending_survives_lost_job(client, monkeypatch):
+    gid = _new_pve(client, 3, 3)
+    # simulace restartu: hra uložená s ai_pending, ale výpočet se nikdy nespustil
+    monkeypatch.setattr(svc, "_submit_ai_job", lambda game_id: True)
+    client.post("/api/tictactoe/play", json={"gameId": gid, "row": 0, "col": 0, "async": True})
+    assert svc.get_game(gid).ai_pending
+    monkeypatch.undo()
+    done = _wait_ai(client, gid)
+    assert done["game"]["aiPending"] is False and done["game"]["moves"] == 2
+
+
+def test_unrelated_save_during_search_keeps_ai_move(client, monkeypatch):
+    gid = _new_pve(client, 3, 3)
+    release = threading.Event()
+    orig = svc._choose_ai_move
+
+    entered = threading.Event()
+
+    def slow_choose(*a, **kw):
+        entered.set()
+        release.wait(5.0)
+        return orig(*a, **kw)
+
+    monkeypatch.setattr(svc, "_choose_ai_move", slow_choose)
+    client.post("/api/tictactoe/play", json={"gameId": gid, "row": 1, "col": 1, "async": True})
+    assert entered.wait(5.0)
+    # nápověda během výpočtu uloží hru (hints_used → nová verze), pozice se nemění
+    with svc.game_lock(gid):
+        g = svc.get_game(gid)
+        g.hints_used += 1
+        svc.save_game(g)
+    release.set()
+    # bez pollingu /status (ten by job zařadil znovu) – tah musí dopsat už první job
+    deadline = time.time() + 10
+    while svc.get_game(gid).ai_pending and time.time() < deadline:
+        time.sleep(0.02)
+    g = svc.get_game(gid)
+    assert not g.ai_pending and len(g.history) == 2 and g.hints_used == 1
+
+
+def test_failed_submit_falls_back_to_sync(client, monkeypatch):
+    gid = _new_pve(client, 3, 3)
+    monkeypatch.setattr(svc, "_submit_ai_job", lambda game_id: False)
+    body = client.post("/api/tictactoe/play", json={"gameId": gid, "row": 1, "col": 1, "async": True}).get_json()
+    assert "aiPending" not in body and body["aiMove"] and body["game"]["moves"] == 2
+    assert svc.get_game(gid).ai_pending is False
@@ -0,0 +1,68 @@
+import json
+
+import tic_tac_toe as ttt
+from tic_tac_toe import service as svc
+
+
+def _events(text):
+    out = []
+    for block in text.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in lines:
+            out.append((int(lines["id"]) if "id" in lines else None, lines["event"], json.loads(lines["data"])))
+    return out
+
+
+def _new_spectator(client, size=4, k=3, delay_ms=15):
+    body = {"size": size, "kToWin": k, "difficulty": "easy", "moveDelayMs": delay_ms, "explain": "none"}
+    r = client.post("/api/tictactoe/spectator/new", json=body)
+    assert r.status_code == 200
+    return r.get_json()["gameId"]
+
+
+def test_delta_stream_replays_to_final_board(client, monkeypatch):
+    monkeypatch.setattr(ttt, "SPECTATOR_KEYFRAME_EVERY", 3)
+    gid = _new_spectator(client)
+    text = client.get(f"/api/tictactoe/spectator/events?gameId={gid}&format=delta").get_data(as_text=True)
+    evs = _events(text)
+    seq0, name, first = evs[0]
+    assert name == "keyframe" and first["gameId"] == gid
+
+    # klient: keyframe → deska, move → položit kámen; ply musí navazovat
+    n = first["size"]
+    board, ply = list(first["board"]), first["ply"]
+    assert len(board) == n * n
+    keyframes = 0
+    for seq, name, data in evs[1:]:
+        assert seq == seq0 + 1
+        seq0 = seq
+        if name == "end":
+            break
+        assert data["ply"] == ply + 1 and "stats" not in data
+        board[data["row"] * n + data["col"]] = data["player"]
+        ply = data["ply"]
+        if name == "keyframe":
+            keyframes += 1
+            assert data["ply"] % 3 == 0 and "".join(board) == data["board"]
+        else:
+            assert name == "move" and "board" not in data
+    g = svc.get_game(gid)
+    assert "".join(board) == g.board.to_string() and ply == len(g.history)
+    assert keyframes == len(g.history) // 3 - first["ply"] // 3
+
+
+def test_delta_resume_and_full_format_unchanged(client):
+    gid = _new_spectator(client, size=3, delay_ms=0)
+    full = _events(client.get(f"/api/tictactoe/spectator/events?gameId={gid}&lastEventId=0").get_data(as_text=True))
+    delta = _events(client.get(f"/api/tictactoe/spectator/events?gameId={gid}&format=delta",
+                               headers={"Last-Event-ID": "0"}).get_data(as_text=True))
+    # stejné seq i pořadí, jen jiné tělo
+    assert [s for s, _, _ in full] == [s for s, _, _ in delta]
+    assert all("board" in d for _, e, d in full if e == "move")
+    assert delta[-1] == full[-1] and delta[-1][1] == "end"
+
+
+def test_unknown_format_rejected(client):
+    gid = _new_spectator(client, size=3, delay_ms=0)
+    r = client.get(f"/api/tictactoe/spectator/events?gameId={gid}&format=xml")
+    assert r.status_code == 400
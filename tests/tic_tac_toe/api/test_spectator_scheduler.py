@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+
+import tic_tac_toe as ttt
+from tic_tac_toe import service as svc
+
+
+def _new_spectator(client, delay_ms=0):
+    body = {"size": 3, "kToWin": 3, "difficulty": "easy", "moveDelayMs": delay_ms}
+    r = client.post("/api/tictactoe/spectator/new", json=body)
+    assert r.status_code == 200
+    return r.get_json()["gameId"]
+
+
+def _wait_done(gids, timeout=20.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if not any(gid in ttt._SPECTATOR_REG for gid in gids):
+            return
+        time.sleep(0.02)
+    raise AssertionError("spectator games did not finish")
+
+
+def test_many_games_share_constant_thread_count(client):
+    gids = [_new_spectator(client) for _ in range(30)]
+    names = [t.name for t in threading.enumerate() if t.name.startswith("ttt-spectator")]
+    assert len(names) <= ttt._SPECTATOR_SCHED.workers + 1
+    _wait_done(gids)
+    for gid in gids:
+        assert svc.get_game(gid).status in ("win", "draw")
+
+
+def test_delay_and_events_until_end(client):
+    gid = _new_spectator(client, delay_ms=40)
+    t0 = time.time()
+    text = client.get(f"/api/tictactoe/spectator/events?gameId={gid}").get_data(as_text=True)
+    events = [line.split(":", 1)[1].strip() for line in text.splitlines() if line.startswith("event:")]
+    assert events[0] == "state" and events[-1] == "end" and events.count("end") == 1
+    data = [json.loads(line.split(":", 1)[1]) for line in text.splitlines() if line.startswith("data:")]
+    moves = svc.get_game(gid).history
+    # mezi tahy se čeká delay_ms (první tah je hned)
+    assert time.time() - t0 >= 0.04 * (len(moves) - 2)
+    assert data[-1]["status"] in ("win", "draw")
+
+
+def test_stop_ends_driver(client):
+    gid = _new_spectator(client, delay_ms=300)
+    ttt._SPECTATOR_REG[gid].stop.set()
+    # zastavený driver se v dalším termínu uklidí bez dalšího tahu
+    _wait_done([gid], timeout=3.0)
+    assert len(svc.get_game(gid).history) <= 1
+
+
+def _frames(text):
+    out = []
+    for block in text.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in lines:
+            out.append((int(lines["id"]) if "id" in lines else None, lines["event"]))
+    return out
+
+
+def test_last_event_id_resumes_without_gap(client):
+    gid = _new_spectator(client)
+    _wait_done([gid])
+    full = _frames(client.get(f"/api/tictactoe/spectator/events?gameId={gid}&lastEventId=0").get_data(as_text=True))
+    assert [e for _, e in full].count("move") == len(svc.get_game(gid).history)
+    assert [seq for seq, _ in full] == list(range(1, len(full) + 1))
+
+    # navázání za 2. událostí: bez snímku, přesně zbytek
+    r = client.get(f"/api/tictactoe/spectator/events?gameId={gid}", headers={"Last-Event-ID": "2"})
+    resumed = _frames(r.get_data(as_text=True))
+    assert resumed[0][0] == 3 and resumed[-1][1] == "end"
+    assert "state" not in [e for _, e in resumed]
+
+
+def test_reconnect_after_driver_finished(client):
+    gid = _new_spectator(client)
+    _wait_done([gid])
+    text = client.get(f"/api/tictactoe/spectator/events?gameId={gid}").get_data(as_text=True)
+    assert [e for _, e in _frames(text)] == ["state", "end"]
+
+
+def _blocking_picker(monkeypatch, during):
+    orig = svc._pick_ai_move_safe
+
+    def picker(*a, **kw):
+        t = threading.Thread(target=during)
+        t.start()
+        t.join(timeout=2.0)
+        return orig(*a, **kw)
+
+    monkeypatch.setattr(svc, "_pick_ai_move_safe", picker)
+
+
+def test_step_searches_without_holding_the_game_lock(client, monkeypatch):
+    g = svc.new_game(size=3, k_to_win=3, start_mark="X", mode="pvp")
+    got = threading.Event()
+
+    def read_state():
+        with svc.game_lock(g.id):  # jiné vlákno (/state, nápověda) se ke hře dostane během hledání
+            got.set()
+
+    _blocking_picker(monkeypatch, read_state)
+    assert ttt._spectator_step(ttt._SpectatorGame(g.id, 0, "easy", "none"))
+    assert got.is_set()
+    assert len(svc.get_game(g.id).history) == 1
+
+
+def test_step_discards_move_when_game_changed_during_search(client, monkeypatch):
+    g = svc.new_game(size=3, k_to_win=3, start_mark="X", mode="pvp")
+
+    def play_elsewhere():
+        with svc.game_lock(g.id):
+            svc.apply_move(svc.get_game(g.id), 1, 1)
+
+    _blocking_picker(monkeypatch, play_elsewhere)
+    assert ttt._spectator_step(ttt._SpectatorGame(g.id, 0, "easy", "none"))
+    # spočtený tah patřil ke starému stavu → nepoužije se, další krok počítá znovu
+    moves = svc.get_game(g.id).history
+    assert [(m.row, m.col) for m in moves] == [(1, 1)]
+
+
+def test_reconnect_to_finished_game_does_not_restart_driver(client, monkeypatch):
+    gid = _new_spectator(client)
+    _wait_done([gid])
+    started = []
+    monkeypatch.setattr(ttt, "_start_driver", lambda *a, **kw: started.append(a))
+    text = client.get(f"/api/tictactoe/spectator/events?gameId={gid}").get_data(as_text=True)
+    assert [e for _, e in _frames(text)] == ["state", "end"]
+
+    # kurzor za posledním `end` → nic k přehrání, jen koncový stav
+    last = ttt.events.get_log(gid).last_seq
+    text = client.get(f"/api/tictactoe/spectator/events?gameId={gid}",
+                      headers={"Last-Event-ID": str(last)}).get_data(as_text=True)
+    assert _frames(text) == [(None, "end")]
+    assert started == [] and gid not in ttt._SPECTATOR_REG
@@ -0,0 +1,51 @@
+from tic_tac_toe import service as svc
+
+
+def _new(client):
+    return client.post("/api/tictactoe/new", json={"size": 3, "kToWin": 3, "mode": "pvp"}).get_json()["game"]["id"]
+
+
+def test_status_etag_and_304(client):
+    gid = _new(client)
+    r1 = client.get(f"/api/tictactoe/status/{gid}")
+    assert r1.status_code == 200 and r1.headers["ETag"]
+    etag = r1.headers["ETag"]
+    body = r1.get_json()
+    assert body["game"]["id"] == gid and isinstance(body["game"]["timeElapsedMs"], int)
+    # tělo nese živý čas → slabý validátor; čas lze dopočítat z neměnného createdAt
+    assert etag.startswith('W/"')
+    assert body["game"]["createdAt"] > 0 and body["game"]["endedAt"] is None
+
+    r2 = client.get(f"/api/tictactoe/status/{gid}", headers={"If-None-Match": etag})
+    assert r2.status_code == 304 and r2.data == b""
+    r3 = client.get(f"/api/tictactoe/state?gameId={gid}", headers={"If-None-Match": etag})
+    assert r3.status_code == 304
+
+    # tah → nová verze → nový ETag a plná odpověď
+    client.post("/api/tictactoe/play", json={"gameId": gid, "row": 0, "col": 0})
+    r4 = client.get(f"/api/tictactoe/status/{gid}", headers={"If-None-Match": etag})
+    assert r4.status_code == 200 and r4.headers["ETag"] != etag
+    assert r4.get_json()["game"]["board"][0][0] == "X"
+
+
+def test_cached_body_matches_to_response(client):
+    gid = _new(client)
+    for r, c in [(0, 0), (1, 1), (0, 1), (2, 2), (0, 2)]:
+        client.post("/api/tictactoe/play", json={"gameId": gid, "row": r, "col": c})
+    hits = svc.RESPONSE_CACHE.hits
+    a = client.get(f"/api/tictactoe/status/{gid}").get_json()
+    b = client.get(f"/api/tictactoe/status/{gid}").get_json()
+    assert svc.RESPONSE_CACHE.hits > hits
+    expected = svc.to_response(svc.get_game(gid))
+    assert a == b == expected
+    assert a["status"] == "win" and a["winner"] == "X" and len(a["winningSequence"]) == 3
+
+
+def test_response_cache_is_plain_lru_in_engine_stats(client):
+    from tic_tac_toe.cache import LRUCache
+    from tic_tac_toe.engine import TranspositionTable
+
+    assert isinstance(svc.RESPONSE_CACHE, LRUCache)
+    assert not isinstance(svc.RESPONSE_CACHE, TranspositionTable)
+    stats = client.get("/api/tictactoe/engine/stats").get_json()
+    assert stats["responseCache"]["capacity"] == svc.RESPONSE_CACHE.capacity
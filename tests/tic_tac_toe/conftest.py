@@ -28,6 +28,8 @@ if str(repo_root) not in sys.path:
 # ───────────────────────── imports after path setup ─────────────────────────
 from app import app as flask_app  # src/Backend/app.py musí exportovat `app`
 from tic_tac_toe import service as svc
+from tic_tac_toe import store as game_store
+from tic_tac_toe.engine import BEST_MOVE_TT
 
 
 @pytest.fixture(scope="session")
@@ -48,6 +50,9 @@ def _reset_store():
             svc._MEM.clear()
     except Exception:
         pass
+    game_store.get_store().clear()
+    # sdílená transpoziční cache enginu – ať se výsledky nepropíjí mezi testy
+    BEST_MOVE_TT.clear()
     yield
 
 
@@ -0,0 +1,76 @@
+import random
+
+from tic_tac_toe.bitboard import BitBoard, line_table, iter_cells
+from tic_tac_toe.rules import find_winning_sequence, check_winner
+
+
+def _naive_immediate_wins(board, k, mark):
+    n = len(board)
+    out = []
+    for r in range(n):
+        for c in range(n):
+            if board[r][c] != ".":
+                continue
+            board[r][c] = mark
+            if any(
+                all(
+                    0 <= r0 + dr * i < n and 0 <= c0 + dc * i < n
+                    and board[r0 + dr * i][c0 + dc * i] == mark
+                    for i in range(k)
+                )
+                for r0 in range(n) for c0 in range(n)
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1))
+            ):
+                out.append((r, c))
+            board[r][c] = "."
+    return out
+
+
+def test_line_table_counts():
+    # 3x3, k=3: 3 řádky + 3 sloupce + 2 diagonály
+    assert len(line_table(3, 3).masks) == 8
+    # 8x8, k=5: 4 pozice v řadě * 8 * 2 (→, ↓) + 4*4 * 2 (diagonály)
+    assert len(line_table(8, 5).masks) == 4 * 8 * 2 + 4 * 4 * 2
+
+
+def test_roundtrip_and_winner():
+    board = [
+        ["X", "O", "."],
+        [".", "X", "O"],
+        [".", ".", "X"],
+    ]
+    bb = BitBoard.from_lists(board, 3)
+    assert bb.to_lists() == board
+    assert bb.winner() == "X"
+    assert bb.winning_sequence() == [{"row": 0, "col": 0}, {"row": 1, "col": 1}, {"row": 2, "col": 2}]
+
+
+def test_draw_and_running():
+    full = [["X", "O", "X"], ["X", "O", "O"], ["O", "X", "X"]]
+    assert check_winner(full, 3) == "draw"
+    assert check_winner([["." for _ in range(4)] for _ in range(4)], 3) is None
+
+
+def test_anti_diagonal_longer_run_returns_canonical_start():
+    board = [["." for _ in range(5)] for _ in range(5)]
+    for i in range(4):
+        board[i][4 - i] = "O"
+    seq = find_winning_sequence(board, 3)
+    assert seq == [{"row": 0, "col": 4}, {"row": 1, "col": 3}, {"row": 2, "col": 2}]
+
+
+def test_immediate_wins_match_naive_scan():
+    rng = random.Random(7)
+    for n, k in ((3, 3), (4, 3), (5, 4), (6, 4), (8, 5)):
+        for _ in range(30):
+            board = [["." for _ in range(n)] for _ in range(n)]
+            cells = [(r, c) for r in range(n) for c in range(n)]
+            rng.shuffle(cells)
+            for i, (r, c) in enumerate(cells[: rng.randint(0, n * n // 2)]):
+                board[r][c] = "X" if i % 2 == 0 else "O"
+            bb = BitBoard.from_lists(board, k)
+            if bb.winner() is not None:
+                continue
+            for mark in ("X", "O"):
+                got = list(iter_cells(bb.immediate_wins(mark), n))
+                assert got == _naive_immediate_wins(board, k, mark)
@@ -0,0 +1,92 @@
+import pytest
+
+from tic_tac_toe.adapter import compute_best_move
+from tic_tac_toe.bitboard import BitBoard
+from tic_tac_toe.engine import OpeningBook, book_lookup, build_book, reset_books, solve
+from tic_tac_toe.engine.book import main as book_cli
+
+
+@pytest.fixture()
+def book_dir(tmp_path):
+    build_book(3, 3, plies=3, directory=str(tmp_path))
+    reset_books(str(tmp_path))
+    yield tmp_path
+    reset_books()
+
+
+def test_book_file_is_sorted_and_complete(book_dir):
+    book = OpeningBook(str(book_dir / "book_3x3.bin"))
+    try:
+        # pro každého začínajícího: prázdná + 3 kanonické první tahy + 12 kanonických odpovědí
+        assert len(book) == 2 * 16
+        keys = [book._key_at(i) for i in range(len(book))]
+        assert keys == sorted(keys)
+    finally:
+        book.close()
+
+
+def test_lookup_is_symmetric_and_matches_solver(book_dir):
+    corners = [(0, 0), (0, 2), (2, 0), (2, 2)]
+    for r, c in corners:
+        board = [["." for _ in range(3)] for _ in range(3)]
+        board[r][c] = "X"
+        bb = BitBoard.from_lists(board, 3)
+        entry = book_lookup(bb, "O")
+        assert entry is not None
+        assert entry.result == "draw"
+        # O musí odpovědět středem – jediný neprohrávající tah
+        assert entry.move == (1, 1)
+        assert solve(bb, "O").result == "draw"
+
+
+def test_positions_outside_book_miss(book_dir):
+    board = [["X", "O", "X"], [".", ".", "."], [".", ".", "."]]
+    assert book_lookup(BitBoard.from_lists(board, 3), "O") is None
+    assert book_lookup(BitBoard.from_lists([["."] * 4 for _ in range(4)], 4), "X") is None
+
+
+def test_compute_best_move_answers_from_book(book_dir):
+    board = [["." for _ in range(3)] for _ in range(3)]
+    board[2][0] = "X"
+    out = compute_best_move(board, "O", 3, 3, difficulty="hard")
+    assert out["stats"].get("book") is True
+    assert out["move"] == [1, 1]
+    # explicitní engine knihovnu obchází
+    out = compute_best_move(board, "O", 3, 3, difficulty="hard", engine="solver")
+    assert "book" not in out["stats"]
+
+
+def test_side_to_move_is_part_of_the_key(tmp_path):
+    # startMark O: při shodném počtu kamenů je na tahu O, ne X
+    build_book(3, 3, plies=5, directory=str(tmp_path))
+    reset_books(str(tmp_path))
+    try:
+        board = [["X", "X", "."], ["O", "O", "."], [".", ".", "."]]
+        bb = BitBoard.from_lists(board, 3)
+        assert book_lookup(bb, "O").move == (1, 2)
+        assert book_lookup(bb, "X").move == (0, 2)
+        out = compute_best_move(board, "O", 3, 3, difficulty="hard")
+        assert out["move"] == [1, 2]
+        # O začíná na prázdné desce → záznam existuje i pro O na tahu
+        assert book_lookup(BitBoard.from_lists([["."] * 3 for _ in range(3)], 3), "O") is not None
+    finally:
+        reset_books()
+
+
+def test_startmark_o_game_uses_correct_side(tmp_path, client):
+    build_book(3, 3, plies=5, directory=str(tmp_path))
+    reset_books(str(tmp_path))
+    try:
+        body = {"size": 3, "kToWin": 3, "mode": "pvp", "startMark": "O"}
+        gid = client.post("/api/tictactoe/new", json=body).get_json()["game"]["id"]
+        for r, c in [(1, 0), (0, 0), (1, 1), (0, 1)]:     # O, X, O, X → O na tahu
+            assert client.post("/api/tictactoe/play", json={"gameId": gid, "row": r, "col": c}).status_code == 200
+        hint = client.post("/api/tictactoe/best-move", json={"gameId": gid}).get_json()
+        assert hint["move"] == [1, 2]
+    finally:
+        reset_books()
+
+
+def test_cli_builds_into_directory(tmp_path):
+    assert book_cli(["build", "--plies", "2", "--sizes", "3", "--out", str(tmp_path)]) == 0
+    assert (tmp_path / "book_3x3.bin").exists()
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from tic_tac_toe.events import EventLog, parse_last_event_id
+
+
+def test_publish_assigns_sequence_and_encodes_once():
+    el = EventLog(8)
+    assert el.publish("move", {"row": 1}) == 1
+    assert el.publish("end", {"status": "win"}) == 2
+    items, gap = el.read_after(0)
+    assert not gap and [seq for seq, _, _ in items] == [1, 2]
+    assert items[0][2].startswith("id: 1\nevent: move\ndata: ")
+    assert el.read_after(1)[0][0][1] == "end"
+    assert el.read_after(2) == ([], False)
+
+
+def test_ring_buffer_reports_gap():
+    el = EventLog(3)
+    for i in range(5):
+        el.publish("move", {"i": i})
+    items, gap = el.read_after(1)
+    assert gap and [seq for seq, _, _ in items] == [3, 4, 5]
+    items, gap = el.read_after(2)
+    assert not gap and [seq for seq, _, _ in items] == [3, 4, 5]
+    # kurzor z budoucnosti (jiný log, restart) = mezera
+    assert el.read_after(99) == ([], True)
+
+
+def test_wait_after_wakes_on_publish():
+    el = EventLog(4)
+    threading.Timer(0.05, el.publish, args=("move", {})).start()
+    t0 = time.perf_counter()
+    items, gap = el.wait_after(0, timeout=5.0)
+    assert items and not gap and time.perf_counter() - t0 < 2.0
+    assert el.wait_after(1, timeout=0.01) == ([], False)
+
+
+def test_parse_last_event_id():
+    assert parse_last_event_id("17") == 17
+    assert parse_last_event_id(None) is None
+    assert parse_last_event_id("") is None
+    assert parse_last_event_id("abc") is None
+
+
+def test_watch_future_resolved_from_other_thread():
+    import asyncio
+
+    el = EventLog(8)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        assert el.watch(0, loop) is not None
+        fut = el.watch(0, loop)
+        threading.Timer(0.05, el.publish, args=("move", {"row": 0})).start()
+        await asyncio.wait_for(fut, timeout=2.0)
+        # po publish je za kurzorem událost → watch už nečeká
+        assert el.watch(0, loop) is None
+        fut = el.watch(1, loop)
+        el.unwatch(fut)
+        el.publish("end", {})
+        await asyncio.sleep(0.01)
+        assert not fut.done()
+
+    asyncio.run(main())
+
+
+def test_delta_encoding_shares_seq_and_falls_back_to_full():
+    el = EventLog(8)
+    el.publish("move", {"board": [["X"]], "row": 0}, ("move", {"row": 0}))
+    el.publish("end", {"status": "win"})
+    full, _ = el.read_after(0)
+    delta, _ = el.read_after(0, "delta")
+    assert [s for s, _, _ in delta] == [s for s, _, _ in full] == [1, 2]
+    assert "board" in full[0][2] and "board" not in delta[0][2]
+    # událost bez delty je v obou formátech tentýž text
+    assert delta[1][2] is full[1][2]
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from tic_tac_toe.adapter import compute_best_move, EngineTimeout
+from tic_tac_toe.bitboard import BitBoard
+from tic_tac_toe.engine import mcts_search
+
+
+def test_mcts_takes_immediate_win():
+    board = [
+        ["X", "X", "."],
+        ["O", "O", "."],
+        [".", ".", "."],
+    ]
+    res = mcts_search(BitBoard.from_lists(board, 3), "X", rollouts=2000, rng=random.Random(1))
+    assert res.move == (0, 2)
+    assert res.score > 0.5
+
+
+def test_mcts_honours_rollout_budget():
+    bb = BitBoard.from_lists([["." for _ in range(5)] for _ in range(5)], 4)
+    res = mcts_search(bb, "X", rollouts=300, rng=random.Random(2))
+    assert res.rollouts == 300
+    assert res.nodes == 301
+    assert sum(v for v, _ in res.visits.values()) == 300
+
+
+def test_compute_best_move_reports_real_stats():
+    board = [["." for _ in range(4)] for _ in range(4)]
+    r = compute_best_move(board, "X", 4, 3, difficulty="medium", engine="mcts")
+    st = r["stats"]
+    assert st["rollouts"] == 2000
+    assert st["treeSize"] > 1
+    assert st["rolloutsPerSec"] > 0
+    assert st["timedOut"] is False
+
+
+def test_compute_best_move_time_cap():
+    board = [["." for _ in range(8)] for _ in range(8)]
+    with pytest.raises(EngineTimeout):
+        compute_best_move(board, "X", 8, 5, difficulty="medium", time_cap_ms=0)
+
+    r = compute_best_move(board, "X", 8, 5, difficulty="hard", time_cap_ms=30)
+    assert r["stats"]["timedOut"] is True
+    assert 0 < r["stats"]["rollouts"] < 8000
+    assert board[r["move"][0]][r["move"][1]] == "."
@@ -0,0 +1,45 @@
+import copy
+import json
+
+from tic_tac_toe import rules
+from tic_tac_toe import service as svc
+from tic_tac_toe.models import Game, Move, MoveLog, PackedBoard
+
+
+def test_packed_board_behaves_like_nested_lists():
+    rows = [[".", "X", "."], ["O", ".", "."], [".", ".", "X"]]
+    b = PackedBoard.from_rows(rows)
+    assert len(b) == 3 and b == rows and b[1][0] == "O" and b[-1][-1] == "X"
+    assert [list(r) for r in b] == rows and b[0][:] == rows[0]
+    assert b[0].count("X") == 1 and "O" in b[1]
+    b2 = copy.deepcopy(b)
+    b2[2][0] = "O"
+    assert b[2][0] == "." and b2[2][0] == "O"
+    assert rules.check_winner(b, 3) is None
+    assert b.to_lists() == rows and b.to_string() == ".X.O....X"
+
+
+def test_move_log_encodes_moves_as_ints():
+    log = MoveLog(5, [Move(0, 0, "X"), Move(4, 3, "O")])
+    log.record(2, 2, "X")
+    assert len(log) == 3 and log._codes.itemsize == 2
+    assert log[1] == Move(4, 3, "O") and log[-1] == Move(2, 2, "X")
+    assert log == [Move(0, 0, "X"), Move(4, 3, "O"), Move(2, 2, "X")]
+    assert (log.cell(1), log.mark(1)) == (23, "O")
+
+
+def test_game_is_slotted_and_converts_plain_inputs():
+    g = Game(id="g", size=3, k_to_win=3, board=[["."] * 3 for _ in range(3)], player="X",
+             status="running", history=[Move(1, 1, "X")])
+    assert not hasattr(g, "__dict__")
+    assert isinstance(g.board, PackedBoard) and isinstance(g.history, MoveLog)
+    assert g.history[0] == Move(1, 1, "X")
+
+
+def test_dto_is_plain_json():
+    g = svc.new_game(size=4, k_to_win=3, start_mark="X", mode="pvp")
+    for r, c in [(0, 0), (1, 1), (0, 1)]:
+        g = svc.apply_move(g, r, c)
+    dto = json.loads(json.dumps(svc.to_dto(g)))
+    assert dto["board"][0] == ["X", "X", ".", "."] and dto["board"][1][1] == "O"
+    assert [(m["row"], m["col"], m["mark"]) for m in dto["history"]] == [(0, 0, "X"), (1, 1, "O"), (0, 1, "X")]
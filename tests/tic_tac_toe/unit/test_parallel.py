@@ -0,0 +1,45 @@
+from tic_tac_toe.bitboard import BitBoard
+from tic_tac_toe.engine import root_parallel_search, shutdown_pool
+
+
+def test_root_parallel_splits_budget_and_merges_visits():
+    board = [
+        ["X", "X", ".", "."],
+        ["O", "O", ".", "."],
+        [".", ".", ".", "."],
+        [".", ".", ".", "."],
+    ]
+    try:
+        res = root_parallel_search(BitBoard.from_lists(board, 3), "X", rollouts=1200, workers=2)
+    finally:
+        shutdown_pool()
+    assert res.rollouts == 1200
+    assert sum(v for v, _ in res.visits.values()) == 1200
+    assert res.move == (0, 2)
+
+
+def test_single_worker_falls_back_to_in_process_search():
+    bb = BitBoard.from_lists([["." for _ in range(3)] for _ in range(3)], 3)
+    res = root_parallel_search(bb, "X", rollouts=200, workers=1)
+    assert res.rollouts == 200
+    assert res.move is not None
+
+
+def test_concurrent_shutdown_after_get_pool_does_not_break_split(monkeypatch):
+    from tic_tac_toe.engine import parallel
+
+    orig = parallel._get_pool_sized
+
+    def racy(workers=None):
+        pool, w = orig(workers)
+        shutdown_pool()  # jiné vlákno vypnulo pool hned po jeho získání (_POOL_WORKERS = 0)
+        return pool, w
+
+    monkeypatch.setattr(parallel, "_get_pool_sized", racy)
+    bb = BitBoard.from_lists([["." for _ in range(3)] for _ in range(3)], 3)
+    try:
+        res = root_parallel_search(bb, "X", rollouts=200, workers=2)
+    finally:
+        shutdown_pool()
+    # žádné ZeroDivisionError: vypnutý pool → fallback na jednoprocesové hledání
+    assert res.rollouts == 200 and res.move is not None
@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+
+from tic_tac_toe.bitboard import BitBoard, line_table
+from tic_tac_toe.engine import mcts_search
+from tic_tac_toe.engine.mcts import X, O, _empties, playout
+from tic_tac_toe.engine.playout_np import batch_playouts
+
+
+def test_single_empty_cell_is_deterministic():
+    # X dohraje poslední pole a uzavře diagonálu
+    bb = BitBoard.from_lists([["X", "O", "O"], ["O", "X", "X"], ["X", "O", "."]], 3)
+    empties = _empties(line_table(3, 3), bb.x, bb.o)
+    res = batch_playouts(3, 3, bb.x, bb.o, X, empties, 32, np.random.default_rng(0))
+    assert res.shape == (32,) and (res == X).all()
+
+    bb = BitBoard.from_lists([["X", "O", "X"], ["X", "O", "O"], ["O", "X", "."]], 3)
+    empties = _empties(line_table(3, 3), bb.x, bb.o)
+    res = batch_playouts(3, 3, bb.x, bb.o, X, empties, 8, np.random.default_rng(0))
+    assert (res == -1).all()
+
+
+def test_outcome_distribution_matches_scalar_playout():
+    for n, k in ((3, 3), (6, 4)):
+        table = line_table(n, k)
+        empties = _empties(table, 0, 0)
+        rng = random.Random(3)
+        scalar = [playout(table, 0, 0, X, empties, rng) for _ in range(4000)]
+        batch = batch_playouts(n, k, 0, 0, X, empties, 4000, np.random.default_rng(3))
+        for v in (X, O, -1):
+            assert abs(scalar.count(v) / 4000 - float((batch == v).mean())) < 0.04
+
+
+def test_first_completed_line_wins():
+    # O hraje první a má hotové tři ze čtyř; X by také dokončil – rozhoduje pořadí
+    board = [
+        ["O", "O", "O", ".", "."],
+        ["X", "X", "X", ".", "."],
+        [".", ".", ".", ".", "."],
+        [".", ".", ".", ".", "."],
+        [".", ".", ".", ".", "."],
+    ]
+    bb = BitBoard.from_lists(board, 4)
+    table = line_table(5, 4)
+    empties = _empties(table, bb.x, bb.o)
+    res = batch_playouts(5, 4, bb.x, bb.o, O, empties, 2000, np.random.default_rng(1))
+    rng = random.Random(1)
+    scalar = [playout(table, bb.x, bb.o, O, empties, rng) for _ in range(2000)]
+    assert abs(float((res == O).mean()) - scalar.count(O) / 2000) < 0.05
+
+
+def test_mcts_with_leaf_batches_finds_the_win():
+    board = [["." for _ in range(7)] for _ in range(7)]
+    for c in range(4):
+        board[3][c + 1] = "X"
+    board[0][0] = board[6][6] = board[0][6] = "O"
+    res = mcts_search(BitBoard.from_lists(board, 5), "X", rollouts=4000, playout_batch=64,
+                      rng=random.Random(0))
+    assert res.move in {(3, 0), (3, 5)}
+    assert res.rollouts >= 4000
+
+
+def test_leaf_batches_do_not_shrink_the_tree():
+    bb = BitBoard.from_lists([["." for _ in range(7)] for _ in range(7)], 5)
+    plain = mcts_search(bb, "X", rollouts=300, rng=random.Random(4))
+    batched = mcts_search(bb, "X", rollouts=300, playout_batch=32, rng=random.Random(4))
+    # rozpočet = iterace stromu → dávkový režim expanduje aspoň tolik uzlů
+    assert batched.iterations == plain.iterations == 300
+    assert batched.nodes >= plain.nodes
+    assert batched.rollouts == 300 * 32
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from tic_tac_toe import service as svc
+from tic_tac_toe.adapter import compute_best_move, ponder_replies
+
+
+def _board(n, moves):
+    b = [["." for _ in range(n)] for _ in range(n)]
+    for r, c, m in moves:
+        b[r][c] = m
+    return b
+
+
+def test_pondered_reply_is_served_from_cache():
+    board = _board(6, [(2, 2, "X"), (3, 3, "O")])
+    res = ponder_replies(board, "X", "O", 6, 4, difficulty="medium",
+                         cancel=threading.Event(), budget_ms=20000, replies=2)
+    # zrcadlově symetrické odpovědi sdílí kanonickou pozici → druhá je už „cached“
+    assert not res["cancelled"] and res["searched"] + res["cached"] == 2 and len(res["predicted"]) == 2
+
+    r, c = res["predicted"][0]
+    board[r][c] = "X"
+    bm = compute_best_move(board, "O", 6, 4, difficulty="medium")
+    assert bm["stats"].get("cached") is True
+
+
+def test_cancelled_ponder_stops_and_stores_nothing():
+    ev = threading.Event()
+    ev.set()
+    board = _board(6, [(2, 2, "X"), (3, 3, "O")])
+    t0 = time.perf_counter()
+    res = ponder_replies(board, "X", "O", 6, 4, difficulty="hard",
+                         cancel=ev, budget_ms=20000)
+    assert res["cancelled"] and res["searched"] == 0
+    assert time.perf_counter() - t0 < 1.0
+
+
+def test_real_move_cancels_session(client):
+    body = {"size": 6, "kToWin": 4, "mode": "pve", "humanMark": "X", "startMark": "X", "difficulty": "hard"}
+    gid = client.post("/api/tictactoe/new", json=body).get_json()["game"]["id"]
+    g = svc.get_game(gid)
+    g.board[0][0] = "X"
+    g.board[5][5] = "O"
+    assert svc.start_ponder(g, force=True)
+    ev = svc._PONDER_SESSIONS[gid]
+    svc.apply_move(g, 1, 1)
+    assert ev.is_set() and gid not in svc._PONDER_SESSIONS
@@ -0,0 +1,47 @@
+from tic_tac_toe.adapter import compute_best_move
+from tic_tac_toe.bitboard import BitBoard
+from tic_tac_toe.engine import solve
+
+
+def _empty(n):
+    return [["." for _ in range(n)] for _ in range(n)]
+
+
+def test_empty_3x3_is_a_draw():
+    sr = solve(BitBoard.from_lists(_empty(3), 3), "X")
+    assert sr.exact
+    assert sr.result == "draw"
+    assert sr.distance == 9
+
+
+def test_4x4_k3_is_a_first_player_win():
+    sr = solve(BitBoard.from_lists(_empty(4), 3), "X")
+    assert sr.result == "win"
+    assert sr.distance is not None and sr.distance <= 7
+
+
+def test_finds_double_threat_and_forced_block():
+    fork = [["X", "O", "."], [".", "X", "."], [".", ".", "O"]]
+    sr = solve(BitBoard.from_lists(fork, 3), "X")
+    assert sr.result == "win" and sr.distance == 3
+
+    must_block = [["X", "O", "X"], [".", "O", "."], [".", ".", "."]]
+    sr = solve(BitBoard.from_lists(must_block, 3), "X")
+    assert sr.move == (2, 1)
+    assert sr.result == "draw"
+
+
+def test_losing_side_reports_loss_with_distance():
+    # O je na tahu a X má dvojitou hrozbu
+    board = [["X", "X", "."], ["X", "O", "."], [".", ".", "O"]]
+    sr = solve(BitBoard.from_lists(board, 3), "O")
+    assert sr.result == "loss"
+    assert sr.distance == 2
+
+
+def test_adapter_auto_uses_solver_on_small_boards():
+    r = compute_best_move(_empty(3), "X", 3, 3, difficulty="hard")
+    assert r["solve"] == {"result": "draw", "distance": 9, "depth": 9, "exact": True}
+    assert r["score"] == 0.0
+    r = compute_best_move(_empty(8), "X", 8, 5, difficulty="medium", time_cap_ms=2000)
+    assert "solve" not in r
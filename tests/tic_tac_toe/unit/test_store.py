@@ -0,0 +1,294 @@
+import copy
+import threading
+
+import pytest
+
+from tic_tac_toe import service as svc
+from tic_tac_toe import store as game_store
+from tic_tac_toe.codec import CodecError, decode_game, encode_game
+from tic_tac_toe.redis_store import RedisStore, RespConnection
+from tic_tac_toe.resp_server import LocalRespServer
+
+
+def _played_game():
+    g = svc.new_game(size=4, k_to_win=3, start_mark="X", human_mark="X", mode="pvp",
+                     turn_timer_s=0, difficulty="medium",
+                     players={"X": {"nickname": "Ada"}, "O": {"nickname": "Bob"}})
+    for r, c in [(0, 0), (1, 1), (0, 1), (2, 2)]:
+        g = svc.apply_move(g, r, c)
+    return g
+
+
+@pytest.fixture()
+def resp_server():
+    with LocalRespServer() as srv:
+        yield srv
+
+
+def test_codec_roundtrip_rebuilds_snapshots():
+    g = _played_game()
+    blob = encode_game(g)
+    assert len(blob) < 400
+    g2 = decode_game(blob)
+    assert svc.to_dto(g2) | {"timeElapsedMs": 0} == svc.to_dto(g) | {"timeElapsedMs": 0}
+    assert [s.ply for s in g2.snapshots] == [s.ply for s in g.snapshots]
+    assert [s.board for s in g2.snapshots] == [s.board for s in g.snapshots]
+    with pytest.raises(CodecError):
+        decode_game(b"{}")
+
+
+def test_codec_roundtrip_keeps_last_ai_meta():
+    g = _played_game()
+    assert decode_game(encode_game(g))._last_ai is None
+    g._last_ai = {"move": [3, 3], "difficulty": "medium", "rollouts": 2000, "elapsedMs": 12,
+                  "player": "X", "size": 4, "kToWin": 3}
+    g2 = decode_game(encode_game(g))
+    assert g2._last_ai == g._last_ai
+    assert svc.to_response(g2)["aiMove"] == [3, 3]
+
+
+def test_memory_store_ttl_and_delete():
+    st = game_store.MemoryStore(ttl_sec=60)
+    g = _played_game()
+    st.save(g)
+    got = st.get(g.id)
+    assert got is not g and got.board == g.board and got.version == g.version
+    assert st.stats()["live"] == 1
+    assert st.delete(g.id) and st.get(g.id) is None
+
+
+def test_redis_store_against_standin(resp_server):
+    st = RedisStore(resp_server.url, ttl_sec=120)
+    games = [_played_game() for _ in range(3)]
+    games[1].id += "-b"
+    games[2].id += "-c"
+    st.save_many(games)
+    got = st.get_many([g.id for g in games] + ["missing"])
+    assert [x.id if x else None for x in got] == [g.id for g in games] + [None]
+    assert got[0].board == games[0].board and got[0].history == games[0].history
+
+    conn = RespConnection(resp_server.host, resp_server.port)
+    assert 0 < conn.execute("TTL", "ttt:game:" + games[0].id) <= 120
+    # pipelining: jedna dávka, odpovědi v pořadí
+    assert conn.pipeline([("PING",), ("EXISTS", "ttt:game:" + games[0].id), ("GET", "nope")]) == ["PONG", 1, None]
+    conn.close()
+
+    assert st.delete(games[0].id) and st.get(games[0].id) is None
+    st.clear()
+    assert st.get(games[1].id) is None
+    st.close()
+
+
+def test_games_are_shared_between_workers(resp_server, client):
+    # dva „workery“ = dvě nezávislé instance store nad stejným serverem
+    worker_a = RedisStore(resp_server.url, ttl_sec=120)
+    worker_b = RedisStore(resp_server.url, ttl_sec=120)
+    prev = game_store.use_store(worker_a)
+    try:
+        gid = client.post("/api/tictactoe/new", json={"size": 3, "kToWin": 3, "mode": "pvp"}).get_json()["game"]["id"]
+        game_store.use_store(worker_b)
+        r = client.post("/api/tictactoe/play", json={"gameId": gid, "row": 1, "col": 1})
+        assert r.status_code == 200
+        game_store.use_store(worker_a)
+        game = client.get(f"/api/tictactoe/status/{gid}").get_json()["game"]
+        assert game["board"][1][1] == "X" and game["player"] == "O"
+        assert [s["ply"] for s in game["snapshots"]] == [0, 1]
+    finally:
+        game_store.use_store(prev)
+        worker_a.close()
+        worker_b.close()
+
+
+def test_memory_store_expires_via_heap(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(game_store, "_now", lambda: clock[0])
+    st = game_store.MemoryStore(ttl_sec=60)
+    games = []
+    for i in range(5):
+        g = _played_game()
+        g.id = f"g{i}"
+        games.append(g)
+        st.save(g)
+        clock[0] += 10          # g0 vyprší v 1060, g4 v 1100
+
+    # g0 se přeuloží → nová expirace, starý záznam v haldě se přeskočí
+    clock[0] = 1055.0
+    st.save(games[0])
+    clock[0] = 1085.0           # prošly g1 (1070) a g2 (1080); g3 (1090) ještě žije
+    assert st.get("g1") is None and st.get("g2") is None
+    assert st.get("g0").id == "g0" and st.get("g3").id == "g3"
+    s = st.stats()
+    assert s["live"] == 3 and s["evictions"] == 2
+
+    clock[0] = 2000.0
+    st.sweep()
+    assert len(st) == 0 and st.stats()["evictions"] == 5
+
+
+def test_memory_store_heap_is_compacted(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(game_store, "_now", lambda: clock[0])
+    # nic nevyprší → zastaralé záznamy musí zmizet kompakcí, ne expirací
+    st = game_store.MemoryStore(ttl_sec=10**6)
+    g = _played_game()
+    for _ in range(1000):
+        clock[0] += 1
+        st.save(g)
+    assert len(st) == 1
+    assert st.stats()["heapSize"] <= 2 * len(st) + 65
+
+
+def test_engine_stats_exposes_store(client):
+    client.post("/api/tictactoe/new", json={"size": 3, "kToWin": 3})
+    j = client.get("/api/tictactoe/engine/stats").get_json()
+    assert j["store"]["backend"] == "memory"
+    assert j["store"]["live"] >= 1 and "evictions" in j["store"]
+
+
+def test_memory_store_rejects_stale_copy():
+    st = game_store.MemoryStore(ttl_sec=60, shards=4)
+    g = _played_game()
+    g.version = 0
+    st.save(g)
+    assert g.version == 1
+    stale = copy.deepcopy(g)
+    st.save(g)                       # někdo jiný mezitím uložil → verze 2
+    with pytest.raises(game_store.StaleWriteError):
+        st.save(stale)
+    assert st.get(g.id).version == g.version == 2
+
+
+def test_memory_store_copies_are_independent():
+    st = game_store.MemoryStore(ttl_sec=60, shards=4)
+    g = _played_game()
+    g.version = 0
+    st.save(g)
+    a, b = st.get(g.id), st.get(g.id)
+    assert a is not b and a.board is not b.board
+    a.board[3][3] = "X"
+    a.hints_used += 1
+    st.save(a)
+    assert b.version == 1 and b.board[3][3] == "."
+    with pytest.raises(game_store.StaleWriteError):
+        st.save(b)
+    assert st.get(g.id).hints_used == a.hints_used and st.get(g.id).board[3][3] == "X"
+
+
+def test_service_get_game_returns_fresh_copy(client):
+    gid = client.post("/api/tictactoe/new", json={"size": 3, "kToWin": 3}).get_json()["game"]["id"]
+    a, b = svc.get_game(gid), svc.get_game(gid)
+    assert a is not b
+    a.hints_used += 1
+    svc.save_game(a)
+    assert b.version == a.version - 1
+    with pytest.raises(game_store.StaleWriteError):
+        svc.save_game(b)
+
+
+def test_redis_store_compare_and_swap(resp_server):
+    worker_a = RedisStore(resp_server.url, ttl_sec=120)
+    worker_b = RedisStore(resp_server.url, ttl_sec=120)
+    try:
+        g = _played_game()
+        g.version = 0
+        worker_a.save(g)
+        copy_a, copy_b = worker_a.get(g.id), worker_b.get(g.id)
+        assert copy_a.version == copy_b.version == 1
+        copy_b.hints_used += 1
+        worker_b.save(copy_b)
+        copy_a.hints_used += 5
+        with pytest.raises(game_store.StaleWriteError):
+            worker_a.save(copy_a)
+        assert worker_a.get(g.id).hints_used == copy_b.hints_used
+    finally:
+        worker_a.close()
+        worker_b.close()
+
+
+def test_redis_conflict_does_not_leak_connections(resp_server, monkeypatch):
+    st = RedisStore(resp_server.url, ttl_sec=120, pool_size=2)
+    opened, closed = [], []
+    orig_init, orig_close = RespConnection.__init__, RespConnection.close
+    monkeypatch.setattr(RespConnection, "__init__",
+                        lambda self, *a, **kw: (opened.append(self), orig_init(self, *a, **kw))[1])
+    monkeypatch.setattr(RespConnection, "close", lambda self: (closed.append(self), orig_close(self))[1])
+    try:
+        g = _played_game()
+        g.version = 0
+        st.save(g)
+        for _ in range(5):
+            stale = st.get(g.id)
+            stale.version -= 1
+            with pytest.raises(game_store.StaleWriteError):
+                st.save(stale)
+        # každé spojení je buď v poolu, nebo zavřené
+        assert set(opened) == set(closed) | set(st._pool)
+        assert st.get(g.id).version == 1
+    finally:
+        st.close()
+
+
+def test_rediss_url_wraps_connections_in_tls(resp_server):
+    import ssl
+
+    assert RedisStore(resp_server.url, ttl_sec=60)._ssl is None
+    tls = RedisStore(resp_server.url.replace("redis://", "rediss://"), ttl_sec=60)
+    assert isinstance(tls._ssl, ssl.SSLContext) and tls._ssl.check_hostname
+
+    wrapped = []
+
+    class PlainContext:  # stand-in server umí jen čisté TCP → zaznamenej obalení a vrať socket
+        def wrap_socket(self, sock, server_hostname=None):
+            wrapped.append(server_hostname)
+            return sock
+
+    tls._ssl = PlainContext()
+    try:
+        g = _played_game()
+        tls.save(g)
+        assert tls.get(g.id).board == g.board
+    finally:
+        tls.close()
+    assert wrapped == [resp_server.host]
+
+
+def test_game_store_is_abstract():
+    class Partial(game_store.GameStore):
+        def get(self, game_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_game_lock_serializes_concurrent_play(client):
+    gid = client.post("/api/tictactoe/new", json={"size": 5, "kToWin": 5, "mode": "pvp"}).get_json()["game"]["id"]
+    cells = [(r, c) for r in range(5) for c in range(5)][:12]
+    barrier = threading.Barrier(len(cells))
+    codes = []
+
+    def play(rc):
+        barrier.wait()
+        r = client.post("/api/tictactoe/play", json={"gameId": gid, "row": rc[0], "col": rc[1]})
+        codes.append(r.status_code)
+
+    threads = [threading.Thread(target=play, args=(rc,)) for rc in cells]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    game = client.get(f"/api/tictactoe/status/{gid}").get_json()["game"]
+    history = game["history"]
+    # každý tah v historii je na desce právě jednou a značky se střídají
+    assert len(history) == sum(cell != "." for row in game["board"] for cell in row)
+    assert [m["mark"] for m in history] == ["X", "O"] * (len(history) // 2) + ["X"] * (len(history) % 2)
+    assert all(game["board"][m["row"]][m["col"]] == m["mark"] for m in history)
+    assert game["version"] == 1 + len(history)
+
+
+def test_game_lock_is_reentrant_and_released():
+    with game_store.game_lock("a"):
+        with game_store.game_lock("a"):
+            pass
+    assert len(game_store._LOCKS) == 0
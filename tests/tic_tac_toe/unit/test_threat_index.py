@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from tic_tac_toe import service as svc
+from tic_tac_toe.bitboard import BitBoard, ThreatIndex
+from tic_tac_toe.explain import build_explanation
+
+
+@pytest.mark.parametrize("n,k", [(3, 3), (5, 4), (7, 5), (8, 5)])
+def test_index_matches_bitboard_scan(n, k):
+    rng = random.Random(n * 10 + k)
+    for _ in range(20):
+        ti = ThreatIndex(n, k)
+        bb = BitBoard(n, k)
+        cells = list(range(n * n))
+        rng.shuffle(cells)
+        for ply, i in enumerate(cells[: rng.randrange(1, n * n)]):
+            mark = "X" if ply % 2 == 0 else "O"
+            r, c = divmod(i, n)
+            ti.play(r, c, mark)
+            bb.play(r, c, mark)
+            for m in ("X", "O"):
+                assert ti.wins_bits(m) == bb.immediate_wins(m)
+        # wins_after = výherní pole po hypotetickém tahu, bez změny indexu
+        for i in cells:
+            r, c = divmod(i, n)
+            if ti.cells[i] != ord("."):
+                continue
+            after = bb.copy()
+            after.play(r, c, "X")
+            expected = {j for j in range(n * n) if after.immediate_wins("X") >> j & 1}
+            assert ti.wins_after(r, c, "X") == expected
+
+
+def test_occupied_cell_rejected():
+    ti = ThreatIndex(3, 3)
+    ti.play(1, 1, "X")
+    with pytest.raises(ValueError):
+        ti.play(1, 1, "O")
+
+
+def test_game_index_follows_apply_move_and_rebuilds_when_stale(client):
+    gid = client.post("/api/tictactoe/new", json={"size": 5, "kToWin": 4, "mode": "pvp"}).get_json()["game"]["id"]
+    g = svc.get_game(gid)
+    ti = svc.threat_index(g)
+    for r, c in [(0, 0), (4, 4), (0, 1), (4, 3), (0, 2)]:
+        svc.apply_move(g, r, c)
+    assert svc.threat_index(g) is ti and ti.first_win("X") == (0, 3)
+    assert svc._winning_move(g.board, "O", 4, ti) is None
+
+    # deska změněná mimo apply_move → nový index
+    g.board[3][3] = "O"
+    assert svc.threat_index(g) is not ti
+
+
+def test_explanation_same_with_and_without_index():
+    board = [list(row) for row in ["XX.O.", "..O..", ".O...", "X....", "....."]]
+    ti = ThreatIndex.from_board(board, 4)
+    for move in [(0, 2), (3, 1), (4, 4), (1, 1)]:
+        assert build_explanation(board, move, "X", 5, 4, threats=ti) == build_explanation(board, move, "X", 5, 4)
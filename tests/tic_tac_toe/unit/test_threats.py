@@ -0,0 +1,94 @@
+import random
+
+from tic_tac_toe.bitboard import BitBoard
+from tic_tac_toe.engine import find_forced_win, forced_win_with, solve
+from tic_tac_toe.explain import build_explanation
+from tic_tac_toe.service import _pick_ai_move_safe
+
+
+def _empty(n):
+    return [["." for _ in range(n)] for _ in range(n)]
+
+
+def _board(n, xs, os_):
+    b = _empty(n)
+    for r, c in xs:
+        b[r][c] = "X"
+    for r, c in os_:
+        b[r][c] = "O"
+    return b
+
+
+def _replay(board, k, player, seq):
+    """Zahraj sekvenci (útočník / obránce střídavě) a vrať vítěze."""
+    bb = BitBoard.from_lists(board, k)
+    other = "O" if player == "X" else "X"
+    for i, (r, c) in enumerate(seq):
+        bb.play(r, c, player if i % 2 == 0 else other)
+    w = bb.immediate_wins(player)
+    if bb.winner() is None and w:
+        # sekvence končí dvojitou hrozbou – dohraj libovolnou
+        idx = (w & -w).bit_length() - 1
+        bb.play(idx // bb.n, idx % bb.n, player)
+    return bb.winner()
+
+
+def test_open_three_becomes_open_four():
+    board = _board(9, [(4, 2), (4, 3), (4, 4)], [(0, 0), (8, 8)])
+    tr = find_forced_win(BitBoard.from_lists(board, 5), "X")
+    assert tr is not None and tr.kind == "vcf"
+    assert tr.move in {(4, 1), (4, 5)}
+    assert _replay(board, 5, "X", tr.sequence) == "X"
+
+
+def test_vct_sequence_is_legal_and_wins():
+    # žádná čtyřka nevede k VCF, ale trojka na (3, 4) už obránce neudrží
+    xs = [(2, 2), (3, 2), (5, 2), (2, 5), (3, 5), (4, 4)]
+    os_ = [(1, 2), (6, 2), (1, 5), (0, 0), (8, 8), (0, 8)]
+    board = _board(9, xs, os_)
+    tr = find_forced_win(BitBoard.from_lists(board, 5), "X")
+    assert tr is not None and tr.kind == "vct" and len(tr.sequence) >= 3
+    cells = [tuple(mv) for mv in tr.sequence]
+    assert len(set(cells)) == len(cells)
+    assert all(board[r][c] == "." for r, c in cells)
+    assert _replay(board, 5, "X", tr.sequence) == "X"
+
+
+def test_no_forced_win_on_quiet_board():
+    board = _board(9, [(4, 4)], [(3, 3)])
+    assert find_forced_win(BitBoard.from_lists(board, 5), "X") is None
+    assert find_forced_win(BitBoard.from_lists(board, 5), "X", max_nodes=1) is None
+
+
+def test_claimed_wins_agree_with_exact_solver():
+    rng = random.Random(7)
+    checked = 0
+    for _ in range(300):
+        n, k = 4, rng.choice([3, 4])
+        bb = BitBoard(n, k, 0, 0)
+        side = "X"
+        for _ in range(rng.randrange(0, 8)):
+            free = [i for i in range(n * n) if not (bb.x | bb.o) >> i & 1]
+            i = rng.choice(free)
+            bb.play(i // n, i % n, side)
+            side = "O" if side == "X" else "X"
+        if bb.winner() is not None or bb.empty() == 0:
+            continue
+        tr = find_forced_win(bb, side)
+        if tr is None:
+            continue
+        checked += 1
+        assert solve(bb, side).result == "win"
+    assert checked > 10
+
+
+def test_ai_plays_forced_win_and_explain_reports_it():
+    board = _board(9, [(4, 2), (4, 3), (4, 4)], [(0, 0), (8, 8)])
+    move = _pick_ai_move_safe(board, "X", "O", 9, 5, "medium")
+    assert move in {(4, 1), (4, 5)}
+
+    tr = forced_win_with(BitBoard.from_lists(board, 5), "X", move)
+    assert tr is not None and tr.move == move
+
+    ex = build_explanation(board, move, "X", 9, 5)
+    assert any(r["type"] == "double_threat" for r in ex["reasons"])
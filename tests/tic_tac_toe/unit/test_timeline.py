@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from tic_tac_toe import service as svc
+from tic_tac_toe.models.snapshot import BoardSnapshot, Timeline
+
+
+def _naive_boards(n, moves):
+    board = [["."] * n for _ in range(n)]
+    out = [[row[:] for row in board]]
+    for r, c, m in moves:
+        board[r][c] = m
+        out.append([row[:] for row in board])
+    return out
+
+
+def test_every_ply_rebuilds_from_keyframes():
+    n = 8
+    rng = random.Random(7)
+    cells = [(r, c) for r in range(n) for c in range(n)]
+    rng.shuffle(cells)
+    moves = [(r, c, "XO"[i % 2]) for i, (r, c) in enumerate(cells)]
+
+    tl = Timeline(n, [["."] * n for _ in range(n)])
+    for r, c, m in moves:
+        tl.record(r, c, m)
+
+    expected = _naive_boards(n, moves)
+    assert len(tl) == n * n + 1
+    assert [s.board for s in tl] == expected
+    assert tl[-1].board == expected[-1] and tl[-2].board == expected[-2]
+    assert [s.ply for s in tl[10:13]] == [10, 11, 12]
+    last = tl[5].last_move
+    assert (last.row, last.col, last.player) == moves[4]
+    assert tl[0].last_move is None
+    # O(n²): jen hrstka keyframů místo desky na každý tah
+    assert len(tl._keyframes) <= 5
+    with pytest.raises(IndexError):
+        tl[n * n + 1]
+
+
+def test_list_compatible_append():
+    tl = Timeline()
+    tl.append(BoardSnapshot(ply=0, board=[["."] * 3 for _ in range(3)], last_move=None))
+    assert len(tl) == 1 and tl.n == 3
+    tl.record(1, 1, "X")
+    assert tl[1].board[1][1] == "X" and tl[0].board[1][1] == "."
+
+
+def test_game_snapshots_follow_history():
+    g = svc.new_game(size=4, k_to_win=4, start_mark="X", mode="pvp")
+    for r, c in [(0, 0), (1, 1), (0, 1), (2, 2), (3, 3)]:
+        g = svc.apply_move(g, r, c)
+    assert len(g.snapshots) == 1 + len(g.history)
+    assert g.snapshots[-1].board == g.board
+    assert [s["ply"] for s in svc.to_dto(g)["snapshots"]] == list(range(6))
+
+
+def test_game_without_snapshots_builds_timeline_from_board():
+    from tic_tac_toe.models.game import Game
+    from tic_tac_toe.models.move import Move
+
+    board = [["."] * 3 for _ in range(3)]
+    board[0][0] = "X"
+    g = Game(id="t", size=3, k_to_win=3, board=board, player="O",
+             status="running", history=[Move(0, 0, "X")])
+    assert len(g.snapshots) == 2 and g.snapshots[0].board[0][0] == "."
+    g = svc.apply_move(g, 1, 1)
+    assert len(g.snapshots) == 3
+    assert g.snapshots[-1].board == g.board
+
+
+def test_timeline_is_derived_from_history():
+    g = svc.new_game(size=4, k_to_win=4, start_mark="X", mode="pvp")
+    g = svc.apply_move(g, 0, 0)
+    assert g.snapshots._log is g.history
+    c = g.copy()
+    assert c.snapshots._log is c.history
+    c.history.record(1, 1, "O")
+    assert len(c.snapshots) == 3 and c.snapshots[-1].board[1][1] == "O"
+    assert len(g.snapshots) == 2
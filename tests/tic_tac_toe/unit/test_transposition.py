@@ -0,0 +1,74 @@
+from tic_tac_toe.adapter import compute_best_move
+from tic_tac_toe.bitboard import BitBoard
+from tic_tac_toe.engine import BEST_MOVE_TT, TranspositionTable, canonicalize
+from tic_tac_toe.engine.transposition import dihedral_perms, permute_bits
+
+
+def _rot90(board):
+    n = len(board)
+    out = [["." for _ in range(n)] for _ in range(n)]
+    for r in range(n):
+        for c in range(n):
+            out[c][n - 1 - r] = board[r][c]
+    return out
+
+
+def test_all_eight_transforms_are_permutations():
+    for n in (3, 4, 5):
+        perms = dihedral_perms(n)
+        assert len(perms) == 8
+        assert len({p for p, _ in perms}) == 8
+        for perm, inv in perms:
+            assert sorted(perm) == list(range(n * n))
+            assert all(inv[perm[i]] == i for i in range(n * n))
+
+
+def test_symmetric_positions_share_canonical_form():
+    board = [
+        ["X", ".", ".", "."],
+        [".", "O", ".", "."],
+        [".", ".", ".", "."],
+        [".", ".", "X", "."],
+    ]
+    seen = set()
+    b = board
+    for _ in range(4):
+        cx, co, t = canonicalize(BitBoard.from_lists(b, 3))
+        seen.add((cx, co))
+        perm = dihedral_perms(4)[t][0]
+        bb = BitBoard.from_lists(b, 3)
+        assert (permute_bits(bb.x, perm), permute_bits(bb.o, perm)) == (cx, co)
+        b = _rot90(b)
+    assert len(seen) == 1
+
+
+def test_lru_eviction_and_counters():
+    tt = TranspositionTable(capacity=2)
+    tt.put("a", 1)
+    tt.put("b", 2)
+    assert tt.get("a") == 1      # a je teď nejčerstvější
+    tt.put("c", 3)               # vypadne b
+    assert tt.get("b") is None
+    assert tt.get("c") == 3
+    st = tt.stats()
+    assert (st["hits"], st["misses"], st["evictions"], st["size"]) == (2, 1, 1, 2)
+
+
+def test_best_move_is_mapped_back_through_transform():
+    BEST_MOVE_TT.clear()
+    board = [
+        ["X", "X", ".", "."],
+        ["O", "O", ".", "."],
+        [".", ".", ".", "."],
+        [".", ".", ".", "."],
+    ]
+    first = compute_best_move(board, "X", 4, 3, difficulty="medium")
+    assert first["move"] == [0, 2]
+    assert not first["stats"].get("cached")
+
+    rotated = _rot90(board)
+    second = compute_best_move(rotated, "X", 4, 3, difficulty="medium")
+    assert second["stats"]["cached"] is True
+    # (0, 2) po rotaci o 90° → (2, 3)
+    assert second["move"] == [2, 3]
+    assert BEST_MOVE_TT.stats()["hits"] == 1
@@ -13,3 +13,20 @@ def test_diag5_returns_seq_len_5():
     assert seq[0] == {"row": 0, "col": 0}
     assert seq[-1] == {"row": 4, "col": 4}
     assert check_winner(board, 5) == "X"
+
+
+def test_winning_sequence_at_matches_full_scan():
+    from tic_tac_toe.rules import find_winning_sequence_at
+    board = [
+        ['.','.','.','O','.'],
+        ['.','.','O','.','.'],
+        ['X','O','X','X','.'],
+        ['O','.','.','.','.'],
+        ['.','.','.','.','.'],
+    ]
+    # poslední tah O na (2,1) dokončil ↙ diagonálu délky 4
+    seq = find_winning_sequence_at(board, 2, 1, 4)
+    assert seq == find_winning_sequence(board, 4)
+    assert seq[0] == {"row": 0, "col": 3}
+    # tah, který nic neuzavřel
+    assert find_winning_sequence_at(board, 2, 3, 4) == []